@@ -161,6 +161,19 @@ else:
     }
 
 
+# https://docs.djangoproject.com/en/dev/topics/cache/#database-caching
+# Cache versions (select lists, reference registry) and building snapshots are
+# shared by all web and worker processes, so they live in the database. The
+# table is created by the `pages` migrations.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+        "OPTIONS": {"MAX_ENTRIES": 20000},
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -222,6 +235,9 @@ STORAGES = {
 # https://whitenoise.readthedocs.io/en/latest/django.html#WHITENOISE_KEEP_ONLY_HASHED_FILES
 WHITENOISE_KEEP_ONLY_HASHED_FILES = True
 
+# Sync journals and cached raw responses of the EPD catalogue loaders
+EPD_SYNC_DIR = Path(os.environ.get("EPD_SYNC_DIR", BASE_DIR / "epd_sync"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/stable/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -1,13 +1,21 @@
 from django import forms
-from django.contrib import admin
-from django.db.models import Q, Prefetch
-from django.http import HttpResponse
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
 
 from .models.epd import MaterialCategory, EPD, Impact, EPDImpact, Label, EPDLabel
 from .models.assembly import Assembly, AssemblyCategory, AssemblyTechnique
 from .models.building import Building, BuildingCategory, BuildingSubcategory
 from .models.base import ALCBTCountryManager
-from .scripts.Excel_export.export_EPDs_to_excel import to_excel_bytes
+from .models.background_job import BackgroundJob, JobStatus
+from .models.scenario import Scenario, ScenarioAssembly, ScenarioOperationalProduct, ScenarioProduct
+from .scripts import background_tasks  # noqa: F401, registers the tasks
+from .scripts.background_jobs import TASKS, ResultFile, cancel, enqueue
+from .scripts.Excel_export.export_EPDs_to_excel import csv_response
 
 
 class CountryFieldMixin:
@@ -46,11 +54,7 @@ class ProductsInline(admin.TabularInline):  # or admin.StackedInline
 class StructuralProductsInline(admin.TabularInline):
     model = Building.operational_components.through  # Use the through model for the many-to-many field
     extra = 1  # Number of empty rows to display
-  
-class StructuralProductsSimulationInline(admin.TabularInline):
-    model = Building.simulated_operational_components.through  # Use the through model for the many-to-many field
-    extra = 1  # Number of empty rows to display
-    
+
 class AssembliesClassificationInline(admin.TabularInline):
     model = AssemblyCategory.techniques.through
 
@@ -61,12 +65,6 @@ class AssembliesInline(admin.TabularInline):  # or admin.StackedInline
     extra = 1  # Number of empty rows to display
 
 
-# Inline for Many-to-Many (assemblies in Building)
-class AssembliesSimulationInline(admin.TabularInline):  # or admin.StackedInline
-    model = Building.simulated_components.through  # Use the through model for the many-to-many field
-    extra = 1  # Number of empty rows to display
-
-
 class BuildingCategoryInline(admin.StackedInline):
     model = BuildingCategory.subcategories.through
     extra = 0
@@ -93,36 +91,27 @@ class TopLevelCategoryFilter(admin.SimpleListFilter):
         return queryset
 
 
-@admin.action(description="Export selected EPDs to Excel.")
-def export_epds_action(modeladmin, request, queryset):
-    queryset = (
-        queryset.select_related(
-            "country",
-            "city",
-            "category",
-            "category__parent",
-            "category__parent__parent",
-        )
-        # grab all the reverse/M2M data in one shot each
-        .prefetch_related(
-            # impacts are through the EPDImpact intermediary; prefetch both sides
-            Prefetch(
-                "epdimpact_set",
-                queryset=EPDImpact.objects.select_related("impact"),
-                to_attr="all_impacts",
-            ),
-            # if you ever do `epd.impacts.all()`, you can also prefetch that:
-            "impacts",
-        )
-    )
-    excel_data = to_excel_bytes(queryset)
-    # Build response
-    response = HttpResponse(
-        excel_data,
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+@admin.action(description="Export selected EPDs to CSV.")
+def export_epds_csv_action(modeladmin, request, queryset):
+    return csv_response(queryset)
+
+
+def queue_export(modeladmin, request, queryset, format):
+    epd_ids = [str(pk) for pk in queryset.values_list("pk", flat=True)]
+    job = enqueue("export_epds", {"epd_ids": epd_ids, "format": format}, user=request.user)
+    url = reverse("admin:pages_backgroundjob_change", args=[job.pk])
+    modeladmin.message_user(
+        request,
+        format_html('Exporting {} EPDs in the background, see <a href="{}">job</a>.', len(epd_ids), url),
+        messages.SUCCESS,
     )
-    response['Content-Disposition'] = 'attachment; filename="export.xlsx"'
-    return response
+
+
+# Workbooks cannot be streamed while they are written, so Excel exports always
+# run as a job instead of holding up the request
+@admin.action(description="Export selected EPDs to Excel in the background.")
+def queue_export_epds_action(modeladmin, request, queryset):
+    queue_export(modeladmin, request, queryset, "xlsx")
 
 
 # Custom admin for EPD
@@ -141,7 +130,7 @@ class EPDAdmin(CountryFieldMixin, admin.ModelAdmin):
         "name",
         "category__name_en",
     )    
-    actions = [export_epds_action]
+    actions = [export_epds_csv_action, queue_export_epds_action]
 
     
 # Custom admin for Assembly
@@ -159,7 +148,7 @@ class AssemblyCategoryAdmin(admin.ModelAdmin):
 # Custom admin for Building
 class BuildingAdmin(CountryFieldMixin, admin.ModelAdmin):
     use_all_countries = False  # Building admin shows only ALCBT countries
-    inlines = [AssembliesInline, AssembliesSimulationInline, StructuralProductsInline, StructuralProductsSimulationInline]  # Add the inline for products
+    inlines = [AssembliesInline, StructuralProductsInline]  # Add the inline for products
     list_display = ["name", "country", "category"]
     
 class BuildingCategoryAdmin(admin.ModelAdmin):
@@ -186,6 +175,122 @@ class LabelAdmin(admin.ModelAdmin):
     search_fields = ("name", "source")
 
 
+# Inlines for the overrides of a scenario
+class ScenarioAssemblyInline(admin.TabularInline):
+    model = ScenarioAssembly
+    raw_id_fields = ["building_assembly", "assembly"]
+    extra = 0
+
+
+class ScenarioProductInline(admin.TabularInline):
+    model = ScenarioProduct
+    raw_id_fields = ["product", "epd"]
+    extra = 0
+
+
+class ScenarioOperationalProductInline(admin.TabularInline):
+    model = ScenarioOperationalProduct
+    raw_id_fields = ["operational_product", "epd"]
+    extra = 0
+
+
+class ScenarioAdmin(admin.ModelAdmin):
+    inlines = [ScenarioAssemblyInline, ScenarioProductInline, ScenarioOperationalProductInline]
+    list_display = ["name", "building", "created_by", "updated_at"]
+    raw_id_fields = ["building"]
+    search_fields = ("name", "building__name")
+
+
+class BackgroundJobForm(forms.ModelForm):
+    kind = forms.ChoiceField(choices=[])
+
+    class Meta:
+        model = BackgroundJob
+        fields = ["kind", "params"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["kind"].choices = [(kind, kind) for kind in sorted(TASKS)]
+
+
+@admin.action(description="Cancel selected jobs.")
+def cancel_jobs_action(modeladmin, request, queryset):
+    for job in queryset:
+        cancel(job)
+
+
+# Custom admin for BackgroundJob, new jobs are queued for the `run_jobs` worker
+class BackgroundJobAdmin(admin.ModelAdmin):
+    form = BackgroundJobForm
+    list_display = ["kind", "status", "progress", "message", "created_by", "created_at", "finished_at", "result"]
+    list_filter = ["status", "kind"]
+    ordering = ["-created_at"]
+    actions = [cancel_jobs_action]
+    readonly_fields = [
+        "status",
+        "progress",
+        "message",
+        "error",
+        "result",
+        "cancel_requested",
+        "worker",
+        "created_by",
+        "created_at",
+        "started_at",
+        "finished_at",
+        "heartbeat_at",
+    ]
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            return ["kind", "params", *self.readonly_fields]
+        return []
+
+    def get_fields(self, request, obj=None):
+        if obj is None:
+            return ["kind", "params"]
+        return self.get_readonly_fields(request, obj)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+    @admin.display(description="Progress")
+    def progress(self, obj):
+        if obj.percent is not None:
+            return f"{obj.progress_done} / {obj.progress_total} ({obj.percent:.0f}%)"
+        return obj.progress_done or ""
+
+    @admin.display(description="Result")
+    def result(self, obj):
+        if not obj.result_name:
+            return ""
+        url = reverse("admin:pages_backgroundjob_result", args=[obj.pk])
+        return format_html('<a href="{}">Download</a>', url)
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<uuid:job_id>/result/",
+                self.admin_site.admin_view(self.download_result),
+                name="pages_backgroundjob_result",
+            )
+        ]
+        return urls + super().get_urls()
+
+    def download_result(self, request, job_id):
+        job = get_object_or_404(BackgroundJob, pk=job_id, status=JobStatus.SUCCEEDED)
+        if not self.has_view_permission(request, job):
+            raise PermissionDenied
+        if not job.result_name:
+            raise Http404("The job has no result file")
+        result = ResultFile(job)
+        response = FileResponse(result, as_attachment=True, filename=job.result_name)
+        response["Content-Length"] = result.size
+        return response
+
+
 # Register your models with custom admin
 admin.site.register(MaterialCategory, MaterialCategoryAdmin)
 admin.site.register(EPD, EPDAdmin)
@@ -197,3 +302,5 @@ admin.site.register(BuildingCategory, BuildingCategoryAdmin)
 admin.site.register(BuildingSubcategory)
 admin.site.register(Impact)
 admin.site.register(Label, LabelAdmin)
+admin.site.register(BackgroundJob, BackgroundJobAdmin)
+admin.site.register(Scenario, ScenarioAdmin)
@@ -10,8 +10,9 @@ from pages.models.assembly import (
     AssemblyTechnique,
     AssemblyCategoryTechnique,
 )
-from pages.models.building import Building, BuildingAssembly, BuildingAssemblySimulated
+from pages.models.building import Building, BuildingAssembly
 from pages.models.base import ALCBTCountryManager
+from pages.views.building.scenarios import find_component
 
 
 class AssemblyForm(forms.ModelForm):
@@ -110,14 +111,9 @@ class AssemblyForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         building_id = kwargs.pop("building_id", None)
-        simulation = kwargs.pop("simulation", False)
+        scenario = kwargs.pop("scenario", None)
         template_edit = kwargs.pop("template_edit", False)
 
-        if simulation:
-            BuildingAssemblyModel = BuildingAssemblySimulated
-        else:
-            BuildingAssemblyModel = BuildingAssembly
-
         super().__init__(*args, **kwargs)
         if kwargs.get("instance"):
             assembly_classification = self.instance.classification
@@ -134,14 +130,18 @@ class AssemblyForm(forms.ModelForm):
             )
 
             # Only try to get BuildingAssembly data if NOT editing a template
-            if not template_edit:
+            if scenario is not None:
+                # The quantity the selected scenario shows
+                component = find_component(scenario, self.instance.pk)
+                self.fields["quantity"].initial = component.quantity if component else 1
+            elif not template_edit:
                 try:
-                    building_assembly = BuildingAssemblyModel.objects.get(
+                    building_assembly = BuildingAssembly.objects.get(
                         assembly=self.instance, building__pk=building_id
                     )
                     self.fields["quantity"].initial = building_assembly.quantity
                     # self.fields["reporting_life_cycle"].initial = building_assembly.reporting_life_cycle
-                except BuildingAssemblyModel.DoesNotExist:
+                except BuildingAssembly.DoesNotExist:
                     self.fields["quantity"].initial = 1
                     # self.fields["reporting_life_cycle"].initial = 50
             else:
@@ -3,7 +3,7 @@ from django.forms import widgets
 from django.utils.translation import gettext as _
 
 from pages.models.assembly import Assembly
-from pages.models.building import BuildingAssembly, BuildingAssemblySimulated
+from pages.models.building import BuildingAssembly
 
 
 class BOQAssemblyForm(forms.ModelForm):
@@ -30,11 +30,7 @@ class BOQAssemblyForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         building_id = kwargs.pop("building_id", None)
-        simulation = kwargs.pop("simulation", False)
-        if simulation:
-            BuildingAssemblyModel = BuildingAssemblySimulated
-        else:
-            BuildingAssemblyModel = BuildingAssembly
+        scenario = kwargs.pop("scenario", None)
 
         super().__init__(*args, **kwargs)
         if kwargs.get("instance"):
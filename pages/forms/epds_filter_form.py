@@ -62,6 +62,11 @@ class EPDsFilterForm(forms.Form):
         label="EPD type",
         required=False,
     )
+    sort = forms.ChoiceField(
+        choices=[("", "---------"), ("gwp", "Lowest GWP first"), ("-gwp", "Highest GWP first")],
+        label="Sort by",
+        required=False,
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -109,6 +114,7 @@ class EPDsFilterForm(forms.Form):
                     ),
                     Row(
                         Column("type", css_class="col-md-3"),
+                        Column("sort", css_class="col-md-3"),
                     ),
                     active=False
                 ),
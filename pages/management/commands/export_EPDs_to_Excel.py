@@ -1,36 +1,35 @@
-from pages.models import EPD, EPDImpact
+from django.core.management.base import BaseCommand
 
-from pages.scripts.Excel_export.export_EPDs_to_excel import to_excel
+from pages.models import EPD
+from pages.scripts.Excel_export.export_EPDs_to_excel import CHUNK_SIZE, iter_csv, write_xlsx
 
 
-from django.db.models import Prefetch
+class Command(BaseCommand):
+    help = "Export all EPDs to an Excel or CSV file, streaming them from the database."
 
-epds = (
-    EPD.objects
-        .all()
-    #    .filter(category__parent__name_en="Mortar and Concrete")
-       # follow all your FK/OneToOne links in one big JOIN
-       .select_related(
-           "country",
-           "city",
-           "category",
-           "category__parent",
-           "category__parent__parent",
-       )
-       # grab all the reverse/M2M data in one shot each
-       .prefetch_related(
-           # impacts are through the EPDImpact intermediary; prefetch both sides
-           Prefetch(
-               "epdimpact_set",
-               queryset=EPDImpact.objects.select_related("impact"),
-               to_attr="all_impacts",
-           ),
-           # if you ever do `epd.impacts.all()`, you can also prefetch that:
-           "impacts",
-       )
-)
+    def add_arguments(self, parser):
+        parser.add_argument("output", type=str, help="Path of the .xlsx or .csv file to write")
+        parser.add_argument(
+            "--category",
+            type=str,
+            help='Optional: Only export EPDs whose parent category has this name, e.g. "Mortar and Concrete"',
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Optional: Number of EPDs fetched from the database at a time",
+        )
 
-df = to_excel(epds)
+    def handle(self, *args, **options):
+        epds = EPD.objects.all()
+        if options["category"]:
+            epds = epds.filter(category__parent__name_en=options["category"])
 
-df.to_excel("Complete_EPD_db_export_20250522.xlsx")
-# df.to_excel("Concrete_db_export_20250522.xlsx")
\ No newline at end of file
+        output = options["output"]
+        if output.endswith(".csv"):
+            with open(output, "w", newline="", encoding="utf-8") as f:
+                f.writelines(iter_csv(epds, options["chunk_size"]))
+        else:
+            write_xlsx(epds, output, options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Exported EPDs to {output}"))
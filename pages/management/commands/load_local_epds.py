@@ -31,10 +31,16 @@ class Command(BaseCommand):
             type=str,
             help="Optional: Specify a single EPD file key to load",
         )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Optional: Only validate the files and report row errors, without writing to the database",
+        )
 
     @transaction.atomic
     def handle(self, *args, **options):
         file_key = options.get("file")
+        dry_run = options.get("dry_run")
         if file_key:
             if file_key not in local_epd_files:
                 self.stdout.write(self.style.ERROR(f"Invalid file key: {file_key}"))
@@ -45,10 +51,16 @@ class Command(BaseCommand):
                 )
                 return
             self.stdout.write(self.style.SUCCESS(f"Starting {file_key}"))
-            local_epd_files[file_key]()
-            self.stdout.write(self.style.SUCCESS(f"Successfully uploaded {file_key}"))
+            self.write_report(file_key, local_epd_files[file_key](dry_run=dry_run))
         else:
             for k, v in local_epd_files.items():
                 self.stdout.write(self.style.SUCCESS(f"Starting {k}"))
-                v()
-                self.stdout.write(self.style.SUCCESS(f"Successfully uploaded {k}"))
+                self.write_report(k, v(dry_run=dry_run))
+
+    def write_report(self, file_key, report):
+        style = self.style.WARNING if report.errors else self.style.SUCCESS
+        self.stdout.write(style(f"{file_key}: {report}"))
+        if report.new_categories:
+            self.stdout.write(self.style.WARNING(f"  New categories: {', '.join(report.new_categories)}"))
+        for row, messages in report.errors.items():
+            self.stdout.write(self.style.ERROR(f"  Row {row}: {'; '.join(messages)}"))
@@ -1,6 +1,7 @@
 from django.db import transaction
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
+from pages.models.epd import Label
 from pages.scripts.Label_mapping.GCCA_mapping import add_GCCA_labels
 
 
@@ -14,11 +15,19 @@ class Command(BaseCommand):
             type=str,
             help="Optional: Specify a single EPD file key to load",
         )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Optional: Only match the mapping against the EPDs, without writing to the database",
+        )
 
     @transaction.atomic
     def handle(self, *args, **options):
         try:
-            add_GCCA_labels()
-            self.stdout.write(self.style.SUCCESS(f"Successfully concluded mapping."))
-        except:
-            self.stdout.write(self.style.WARNING(f"Error in mapping."))
\ No newline at end of file
+            report = add_GCCA_labels(dry_run=options["dry_run"])
+        except Label.DoesNotExist as e:
+            raise CommandError(e)
+        style = self.style.WARNING if report.unmatched else self.style.SUCCESS
+        self.stdout.write(style(str(report)))
+        for row, reason in report.unmatched.items():
+            self.stdout.write(self.style.WARNING(f"  Row {row}: {reason}"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from pages.views.building.impact_results import refresh_all_results
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized impact results of all (or the given) buildings."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-b",
+            "--building",
+            type=str,
+            action="append",
+            help="Optional: Building id to refresh, can be given several times",
+        )
+
+    def handle(self, *args, **options):
+        building_ids = options.get("building")
+        refresh_all_results(building_ids)
+        self.stdout.write(self.style.SUCCESS("Successfully refreshed building impacts."))
@@ -0,0 +1,85 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from pages.models.background_job import JobStatus
+from pages.scripts import background_tasks  # noqa: F401, registers the tasks
+from pages.scripts import background_jobs
+from pages.scripts.background_jobs import (
+    WorkerStopped,
+    claim_next,
+    fail_stale_jobs,
+    requeue,
+    run_job,
+    worker_name,
+)
+
+
+def stop(signum, frame):
+    raise WorkerStopped(signal.Signals(signum).name)
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs, e.g. EPD loads and exports started from the admin."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Optional: Run the queued jobs and exit instead of waiting for new ones",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Optional: Seconds to wait before looking for new jobs",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            help="Optional: Exit after running this many jobs, e.g. to recycle the worker",
+        )
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        self.running = None
+        # Heroku sends SIGTERM on restarts and kills the dyno 30 seconds later
+        previous = signal.signal(signal.SIGTERM, stop)
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker} is waiting for jobs."))
+        try:
+            self.work(worker, options)
+        except WorkerStopped as e:
+            self.stdout.write(self.style.WARNING(f"Worker {worker} stopped by {e}."))
+            # Started over by the next worker, instead of running forever for no one
+            if self.running is not None and requeue(self.running):
+                self.stdout.write(self.style.WARNING(f"Requeued job {self.running.pk}"))
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+
+    def work(self, worker, options):
+        count = 0
+        checked_at = None
+        while options["max_jobs"] is None or count < options["max_jobs"]:
+            close_old_connections()
+            # Also checked while the worker runs, a killed one may never restart
+            if checked_at is None or time.monotonic() - checked_at > background_jobs.STALE_CHECK_INTERVAL:
+                checked_at = time.monotonic()
+                if stale := fail_stale_jobs():
+                    self.stdout.write(self.style.WARNING(f"Failed {stale} jobs of lost workers."))
+
+            job = claim_next(worker)
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Running {job.kind} job {job.pk}")
+            self.running = job
+            job = run_job(job)
+            self.running = None
+            count += 1
+            style = self.style.SUCCESS if job.status == JobStatus.SUCCEEDED else self.style.WARNING
+            self.stdout.write(style(f"Job {job.pk} {job.status}"))
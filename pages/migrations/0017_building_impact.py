@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0016_add_from_template_tracking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuildingImpact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('simulation', models.BooleanField(default=False, verbose_name='Simulation')),
+                ('value', models.FloatField()),
+                ('assembly', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.assembly')),
+                ('assembly_category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='pages.assemblycategory')),
+                ('building', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='impact_results', to='pages.building')),
+                ('epd', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pages.epd')),
+                ('impact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pages.impact')),
+            ],
+            options={
+                'verbose_name': 'Building impact result',
+                'verbose_name_plural': 'Building impact results',
+                'indexes': [models.Index(fields=['building', 'simulation', 'assembly'], name='pages_build_buildin_2f7268_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:45
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def fill_impact_summaries(apps, schema_editor):
+    EPD = apps.get_model("pages", "EPD")
+    EPDImpact = apps.get_model("pages", "EPDImpact")
+
+    epds = {epd.pk: epd for epd in EPD.objects.only("pk", "declared_amount")}
+    rows = EPDImpact.objects.filter(
+        impact__impact_category__in=["gwp", "penrt"],
+        impact__life_cycle_stage__in=["a1a3", "b6"],
+    ).values_list("epd_id", "impact__impact_category", "impact__life_cycle_stage", "value")
+    for epd_id, impact_category, life_cycle_stage, value in rows:
+        epd = epds[epd_id]
+        setattr(
+            epd,
+            f"{impact_category}_{life_cycle_stage}",
+            float(Decimal(round(value, 2)) / epd.declared_amount),
+        )
+    EPD.objects.bulk_update(
+        epds.values(), ["gwp_a1a3", "penrt_a1a3", "gwp_b6", "penrt_b6"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0017_building_impact'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='epd',
+            name='gwp_a1a3',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='GWP A1-A3 per declared amount'),
+        ),
+        migrations.AddField(
+            model_name='epd',
+            name='gwp_b6',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='GWP B6 per declared amount'),
+        ),
+        migrations.AddField(
+            model_name='epd',
+            name='penrt_a1a3',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='PENRT A1-A3 per declared amount'),
+        ),
+        migrations.AddField(
+            model_name='epd',
+            name='penrt_b6',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='PENRT B6 per declared amount'),
+        ),
+        migrations.RunPython(fill_impact_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def fill_search_text(apps, schema_editor):
+    EPD = apps.get_model("pages", "EPD")
+
+    epds = list(EPD.objects.only("pk", "name", "names"))
+    for epd in epds:
+        translations = [n.get("value") for n in epd.names or [] if isinstance(n, dict)]
+        epd.search_text = " ".join(dict.fromkeys(t for t in [epd.name, *translations] if t))
+    EPD.objects.bulk_update(epds, ["search_text"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0018_epd_impact_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='epd',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Search text'),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='epd',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('search_text', config='simple'), name='epd_search_text_vector'),
+        ),
+    ]
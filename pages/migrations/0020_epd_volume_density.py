@@ -0,0 +1,43 @@
+# Generated by Django 5.1.2 on 2026-10-17 18:50
+
+from django.db import migrations, models
+
+
+def fill_volume_density(apps, schema_editor):
+    EPD = apps.get_model("pages", "EPD")
+
+    epds = []
+    for epd in EPD.objects.filter(conversions__contains=[{"unit": "kg/m^3"}]).only("pk", "conversions"):
+        value = next((c.get("value") for c in epd.conversions if c.get("unit") == "kg/m^3"), None)
+        try:
+            epd.volume_density = float(value)
+        except (TypeError, ValueError):
+            epd.volume_density = None
+        epd.has_volume_density = True
+        epds.append(epd)
+    EPD.objects.bulk_update(epds, ["volume_density", "has_volume_density"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0019_epd_search_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='epd',
+            name='has_volume_density',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Has volume density'),
+        ),
+        migrations.AddField(
+            model_name='epd',
+            name='volume_density',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Volume density (kg/m^3)'),
+        ),
+        migrations.RunPython(fill_volume_density, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='epd',
+            index=models.Index(fields=['declared_unit', 'has_volume_density'], name='epd_unit_volume_density_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:19
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0020_epd_volume_density'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(max_length=100, verbose_name='Kind')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Parameters')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], db_index=True, default='queued', max_length=20, verbose_name='Status')),
+                ('progress_done', models.PositiveIntegerField(default=0, verbose_name='Done')),
+                ('progress_total', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total')),
+                ('message', models.CharField(blank=True, default='', max_length=500, verbose_name='Message')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Error')),
+                ('result_file', models.FileField(blank=True, upload_to='job_results/', verbose_name='Result file')),
+                ('cancel_requested', models.BooleanField(default=False, verbose_name='Cancel requested')),
+                ('worker', models.CharField(blank=True, default='', max_length=255, verbose_name='Worker')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished at')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='Heartbeat at')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Background job',
+                'verbose_name_plural': 'Background jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='pages_backg_status_3d7923_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:25
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0021_background_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Scenario',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, verbose_name='Name')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated at')),
+                ('building', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scenarios', to='pages.building')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Scenario',
+                'verbose_name_plural': 'Scenarios',
+                'ordering': ['building', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScenarioAssembly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(blank=True, decimal_places=2, help_text='Replaces the quantity of the building, if set', max_digits=10, null=True, verbose_name='Quantity')),
+                ('removed', models.BooleanField(default=False, verbose_name='Removed')),
+                ('assembly', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.assembly')),
+                ('building_assembly', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.buildingassembly')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assembly_overrides', to='pages.scenario')),
+            ],
+            options={
+                'verbose_name': 'Scenario structural component',
+                'verbose_name_plural': 'Scenario structural components',
+            },
+        ),
+        migrations.CreateModel(
+            name='ScenarioOperationalProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_unit', models.CharField(blank=True, choices=[('cm', 'Centimeter'), ('m', 'Meter'), ('cm2', 'Square Centimeter'), ('m2', 'Square Meter'), ('m3', 'Cubic Meter'), ('kg', 'Kilogram'), ('tones', 'Tones'), ('pcs', 'Pieces'), ('kwh', 'Kilowatt Hour'), ('l', 'Liter'), ('m2r1', 'Square Meter Rate 1'), ('km', 'Kilometer'), ('tones_km', 'Tones per Kilometer'), ('kgm3', 'Kilogram per Cubic Meter'), ('unknown', 'Unknown'), ('percent', 'Percent'), ('mj', 'Megajoule'), ('kgco2e', 'kgCO2e'), ('kgcfc11e', 'kgCFC11e'), ('kgnmvoce', 'kg NMVOC eq.'), ('moleh+e', 'Mole of H+ eq.'), ('molene', 'Mole of N eq.'), ('kgpe', 'kg P eq.'), ('kgne', 'kg N eq.'), ('m3we', 'm³ world equiv.'), ('kgsbe', 'kg Sb eq.'), ('tr', 'Ton of Refrigeration'), ('kw', 'Kilowatt'), ('m^3/h', 'Cubic Meters per Hour'), ('cfm', 'Cubic Feet per Minute'), ('celsius', '°Celsius'), ('fahrenheit', '°Fahrenheit'), ('liter', 'Liter')], max_length=20, null=True, verbose_name='Unit for quantity of EPD')),
+                ('quantity', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Quantity of EPD')),
+                ('description', models.CharField(blank=True, max_length=255, null=True, verbose_name='Description')),
+                ('removed', models.BooleanField(default=False, verbose_name='Removed')),
+                ('epd', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.epd')),
+                ('operational_product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.operationalproduct')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='operational_overrides', to='pages.scenario')),
+            ],
+            options={
+                'verbose_name': 'Scenario operational product',
+                'verbose_name_plural': 'Scenario operational products',
+            },
+        ),
+        migrations.CreateModel(
+            name='ScenarioProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_unit', models.CharField(blank=True, choices=[('cm', 'Centimeter'), ('m', 'Meter'), ('cm2', 'Square Centimeter'), ('m2', 'Square Meter'), ('m3', 'Cubic Meter'), ('kg', 'Kilogram'), ('tones', 'Tones'), ('pcs', 'Pieces'), ('kwh', 'Kilowatt Hour'), ('l', 'Liter'), ('m2r1', 'Square Meter Rate 1'), ('km', 'Kilometer'), ('tones_km', 'Tones per Kilometer'), ('kgm3', 'Kilogram per Cubic Meter'), ('unknown', 'Unknown'), ('percent', 'Percent'), ('mj', 'Megajoule'), ('kgco2e', 'kgCO2e'), ('kgcfc11e', 'kgCFC11e'), ('kgnmvoce', 'kg NMVOC eq.'), ('moleh+e', 'Mole of H+ eq.'), ('molene', 'Mole of N eq.'), ('kgpe', 'kg P eq.'), ('kgne', 'kg N eq.'), ('m3we', 'm³ world equiv.'), ('kgsbe', 'kg Sb eq.'), ('tr', 'Ton of Refrigeration'), ('kw', 'Kilowatt'), ('m^3/h', 'Cubic Meters per Hour'), ('cfm', 'Cubic Feet per Minute'), ('celsius', '°Celsius'), ('fahrenheit', '°Fahrenheit'), ('liter', 'Liter')], max_length=20, null=True, verbose_name='Unit for quantity of EPD')),
+                ('quantity', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Quantity of EPD')),
+                ('removed', models.BooleanField(default=False, verbose_name='Removed')),
+                ('epd', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.epd')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pages.structuralproduct')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_overrides', to='pages.scenario')),
+            ],
+            options={
+                'verbose_name': 'Scenario product',
+                'verbose_name_plural': 'Scenario products',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scenario',
+            constraint=models.UniqueConstraint(fields=('building', 'name'), name='unique_scenario_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='scenarioassembly',
+            constraint=models.UniqueConstraint(condition=models.Q(('building_assembly__isnull', False)), fields=('scenario', 'building_assembly'), name='unique_scenario_building_assembly'),
+        ),
+        migrations.AddConstraint(
+            model_name='scenarioassembly',
+            constraint=models.CheckConstraint(condition=models.Q(('building_assembly__isnull', False), models.Q(('assembly__isnull', False), ('quantity__isnull', False)), _connector='OR'), name='scenario_assembly_added_with_quantity'),
+        ),
+        migrations.AddConstraint(
+            model_name='scenariooperationalproduct',
+            constraint=models.UniqueConstraint(condition=models.Q(('operational_product__isnull', False)), fields=('scenario', 'operational_product'), name='unique_scenario_operational_product'),
+        ),
+        migrations.AddConstraint(
+            model_name='scenariooperationalproduct',
+            constraint=models.CheckConstraint(condition=models.Q(('operational_product__isnull', False), models.Q(('epd__isnull', False), ('input_unit__isnull', False), ('quantity__isnull', False)), _connector='OR'), name='scenario_operational_product_added_complete'),
+        ),
+        migrations.AddConstraint(
+            model_name='scenarioproduct',
+            constraint=models.UniqueConstraint(fields=('scenario', 'product'), name='unique_scenario_product'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0022_scenario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuildingImpactError',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('simulation', models.BooleanField(default=False, verbose_name='Simulation')),
+                ('message', models.TextField(verbose_name='Message')),
+            ],
+            options={
+                'verbose_name': 'Building impact error',
+                'verbose_name_plural': 'Building impact errors',
+            },
+        ),
+        # Overlapping refreshes could have written rows twice, keep the oldest
+        migrations.RunSQL(
+            """
+            DELETE FROM pages_buildingimpact a
+            USING pages_buildingimpact b
+            WHERE a.id > b.id
+              AND a.building_id = b.building_id
+              AND a.simulation = b.simulation
+              AND a.assembly_id IS NOT DISTINCT FROM b.assembly_id
+              AND a.assembly_category_id IS NOT DISTINCT FROM b.assembly_category_id
+              AND a.epd_id = b.epd_id
+              AND a.impact_id = b.impact_id
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='buildingimpact',
+            constraint=models.UniqueConstraint(fields=('building', 'simulation', 'assembly', 'assembly_category', 'epd', 'impact'), name='unique_building_impact', nulls_distinct=False),
+        ),
+        migrations.AddField(
+            model_name='buildingimpacterror',
+            name='assembly',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.assembly'),
+        ),
+        migrations.AddField(
+            model_name='buildingimpacterror',
+            name='building',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='impact_errors', to='pages.building'),
+        ),
+        migrations.AddIndex(
+            model_name='buildingimpacterror',
+            index=models.Index(fields=['building', 'simulation', 'assembly'], name='pages_build_buildin_01e7ae_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # Only creates the tables of database caches that do not exist yet
+    call_command("createcachetable", database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+    """Creates the table of the database cache. The data migrations before this
+    one do not write to the cache, see `pages.views.cache_versions`."""
+
+    dependencies = [
+        ('pages', '0023_building_impact_unique_and_errors'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0024_cache_table'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='backgroundjob',
+            name='result_file',
+        ),
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='result_data',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Result file'),
+        ),
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='result_name',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Result file name'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.1.2 on 2026-10-17 19:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0025_background_job_result_in_db'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ScenarioOperationalProduct',
+        ),
+    ]
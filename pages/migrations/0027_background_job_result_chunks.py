@@ -0,0 +1,40 @@
+# Generated by Django 5.1.2 on 2026-10-17 21:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_results_to_chunks(apps, schema_editor):
+    BackgroundJob = apps.get_model("pages", "BackgroundJob")
+    BackgroundJobResultChunk = apps.get_model("pages", "BackgroundJobResultChunk")
+    for job in BackgroundJob.objects.filter(result_data__isnull=False).iterator(chunk_size=1):
+        BackgroundJobResultChunk.objects.create(job=job, index=0, data=job.result_data)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0026_remove_scenario_operational_product'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJobResultChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField(verbose_name='Index')),
+                ('data', models.BinaryField(verbose_name='Data')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='result_chunks', to='pages.backgroundjob')),
+            ],
+            options={
+                'verbose_name': 'Background job result chunk',
+                'verbose_name_plural': 'Background job result chunks',
+                'constraints': [models.UniqueConstraint(fields=('job', 'index'), name='unique_background_job_result_chunk')],
+            },
+        ),
+        migrations.RunPython(move_results_to_chunks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='backgroundjob',
+            name='result_data',
+        ),
+    ]
@@ -0,0 +1,210 @@
+# Generated by Django 5.1.2 on 2026-10-17 20:31
+
+import django.core.validators
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def _scenario_name(Scenario, building):
+    taken = set(Scenario.objects.filter(building=building).values_list("name", flat=True))
+    name, n = "Simulation", 1
+    while name in taken:
+        n += 1
+        name = f"Simulation {n}"
+    return name
+
+
+def _operational_key(p):
+    return (p.epd_id, p.quantity, p.input_unit, p.description)
+
+
+def simulations_to_scenarios(apps, schema_editor):
+    """Turns the simulated copy of each building into a scenario on top of it.
+
+    Simulated assemblies still used by the building keep their link, with the
+    quantity overridden where it differs. The building's other assemblies are
+    marked removed and the other simulated ones, the copies of custom
+    assemblies included, are added. Operational products are swapped as a
+    whole if they differ.
+    """
+    Building = apps.get_model("pages", "Building")
+    BuildingAssembly = apps.get_model("pages", "BuildingAssembly")
+    BuildingAssemblySimulated = apps.get_model("pages", "BuildingAssemblySimulated")
+    OperationalProduct = apps.get_model("pages", "OperationalProduct")
+    SimulatedOperationalProduct = apps.get_model("pages", "SimulatedOperationalProduct")
+    Scenario = apps.get_model("pages", "Scenario")
+    ScenarioAssembly = apps.get_model("pages", "ScenarioAssembly")
+    ScenarioOperationalProduct = apps.get_model("pages", "ScenarioOperationalProduct")
+    BuildingImpact = apps.get_model("pages", "BuildingImpact")
+    BuildingImpactError = apps.get_model("pages", "BuildingImpactError")
+
+    building_ids = set(
+        BuildingAssemblySimulated.objects.values_list("building_id", flat=True)
+    ) | set(SimulatedOperationalProduct.objects.values_list("building_id", flat=True))
+    for building in Building.objects.filter(pk__in=building_ids).iterator(chunk_size=100):
+        scenario = Scenario.objects.create(
+            building=building,
+            name=_scenario_name(Scenario, building),
+            created_by_id=building.created_by_id,
+        )
+
+        links = {}
+        for link in BuildingAssembly.objects.filter(building=building):
+            links.setdefault(link.assembly_id, []).append(link)
+        overrides = []
+        for simulated in BuildingAssemblySimulated.objects.filter(building=building):
+            matching = links.get(simulated.assembly_id)
+            if matching:
+                link = matching.pop(0)
+                if link.quantity != simulated.quantity:
+                    overrides.append(ScenarioAssembly(
+                        scenario=scenario, building_assembly=link, quantity=simulated.quantity
+                    ))
+            else:
+                overrides.append(ScenarioAssembly(
+                    scenario=scenario,
+                    assembly_id=simulated.assembly_id,
+                    quantity=simulated.quantity,
+                    reporting_life_cycle=simulated.reporting_life_cycle,
+                ))
+        overrides.extend(
+            ScenarioAssembly(scenario=scenario, building_assembly=link, removed=True)
+            for remaining in links.values()
+            for link in remaining
+        )
+        ScenarioAssembly.objects.bulk_create(overrides)
+
+        products = list(OperationalProduct.objects.filter(building=building))
+        simulated = list(SimulatedOperationalProduct.objects.filter(building=building))
+        if sorted(map(_operational_key, products), key=repr) != sorted(
+            map(_operational_key, simulated), key=repr
+        ):
+            ScenarioOperationalProduct.objects.bulk_create(
+                [
+                    ScenarioOperationalProduct(scenario=scenario, operational_product=p, removed=True)
+                    for p in products
+                ]
+                + [
+                    ScenarioOperationalProduct(
+                        scenario=scenario,
+                        epd_id=p.epd_id,
+                        input_unit=p.input_unit,
+                        quantity=p.quantity,
+                        description=p.description,
+                    )
+                    for p in simulated
+                ]
+            )
+
+    # Scenario impacts are calculated on top of the building's own
+    BuildingImpact.objects.filter(simulation=True).delete()
+    BuildingImpactError.objects.filter(simulation=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0027_background_job_result_chunks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScenarioOperationalProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_unit', models.CharField(blank=True, choices=[('cm', 'Centimeter'), ('m', 'Meter'), ('cm2', 'Square Centimeter'), ('m2', 'Square Meter'), ('m3', 'Cubic Meter'), ('kg', 'Kilogram'), ('tones', 'Tones'), ('pcs', 'Pieces'), ('kwh', 'Kilowatt Hour'), ('l', 'Liter'), ('m2r1', 'Square Meter Rate 1'), ('km', 'Kilometer'), ('tones_km', 'Tones per Kilometer'), ('kgm3', 'Kilogram per Cubic Meter'), ('unknown', 'Unknown'), ('percent', 'Percent'), ('mj', 'Megajoule'), ('kgco2e', 'kgCO2e'), ('kgcfc11e', 'kgCFC11e'), ('kgnmvoce', 'kg NMVOC eq.'), ('moleh+e', 'Mole of H+ eq.'), ('molene', 'Mole of N eq.'), ('kgpe', 'kg P eq.'), ('kgne', 'kg N eq.'), ('m3we', 'm³ world equiv.'), ('kgsbe', 'kg Sb eq.'), ('tr', 'Ton of Refrigeration'), ('kw', 'Kilowatt'), ('m^3/h', 'Cubic Meters per Hour'), ('cfm', 'Cubic Feet per Minute'), ('celsius', '°Celsius'), ('fahrenheit', '°Fahrenheit'), ('liter', 'Liter')], max_length=20, null=True, verbose_name='Unit for quantity of EPD')),
+                ('quantity', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Quantity of EPD')),
+                ('description', models.CharField(blank=True, max_length=255, null=True, verbose_name='Description')),
+                ('removed', models.BooleanField(default=False, verbose_name='Removed')),
+                ('epd', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.epd')),
+                ('operational_product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='pages.operationalproduct')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='operational_overrides', to='pages.scenario')),
+            ],
+            options={
+                'verbose_name': 'Scenario operational product',
+                'verbose_name_plural': 'Scenario operational products',
+            },
+        ),
+        migrations.AddField(
+            model_name='scenario',
+            name='selected_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Selected at'),
+        ),
+        migrations.AddField(
+            model_name='scenarioassembly',
+            name='reporting_life_cycle',
+            field=models.IntegerField(blank=True, help_text='Replaces the reporting life-cycle of the building, if set', null=True, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(10000)], verbose_name='Reporting life-cycle'),
+        ),
+        migrations.RunPython(simulations_to_scenarios, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='buildingassemblysimulated',
+            name='assembly',
+        ),
+        migrations.RemoveField(
+            model_name='buildingassemblysimulated',
+            name='building',
+        ),
+        migrations.RemoveField(
+            model_name='building',
+            name='simulated_components',
+        ),
+        migrations.RemoveField(
+            model_name='simulatedoperationalproduct',
+            name='building',
+        ),
+        migrations.RemoveField(
+            model_name='simulatedoperationalproduct',
+            name='epd',
+        ),
+        migrations.RemoveField(
+            model_name='building',
+            name='simulated_operational_components',
+        ),
+        migrations.RemoveConstraint(
+            model_name='buildingimpact',
+            name='unique_building_impact',
+        ),
+        migrations.RemoveIndex(
+            model_name='buildingimpact',
+            name='pages_build_buildin_2f7268_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='buildingimpacterror',
+            name='pages_build_buildin_01e7ae_idx',
+        ),
+        migrations.RemoveField(
+            model_name='buildingimpact',
+            name='simulation',
+        ),
+        migrations.RemoveField(
+            model_name='buildingimpacterror',
+            name='simulation',
+        ),
+        migrations.AddIndex(
+            model_name='buildingimpact',
+            index=models.Index(fields=['building', 'assembly'], name='pages_build_buildin_50e42a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='buildingimpacterror',
+            index=models.Index(fields=['building', 'assembly'], name='pages_build_buildin_068816_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='buildingimpact',
+            constraint=models.UniqueConstraint(fields=('building', 'assembly', 'assembly_category', 'epd', 'impact'), name='unique_building_impact', nulls_distinct=False),
+        ),
+        migrations.DeleteModel(
+            name='BuildingAssemblySimulated',
+        ),
+        migrations.DeleteModel(
+            name='SimulatedOperationalProduct',
+        ),
+        migrations.AddConstraint(
+            model_name='scenariooperationalproduct',
+            constraint=models.UniqueConstraint(condition=models.Q(('operational_product__isnull', False)), fields=('scenario', 'operational_product'), name='unique_scenario_operational_product'),
+        ),
+        migrations.AddConstraint(
+            model_name='scenariooperationalproduct',
+            constraint=models.CheckConstraint(condition=models.Q(('operational_product__isnull', False), models.Q(('epd__isnull', False), ('quantity__isnull', False)), _connector='OR'), name='scenario_operational_product_added_with_epd'),
+        ),
+    ]
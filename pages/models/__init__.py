@@ -4,3 +4,6 @@ from .assembly import *
 from .building import * 
 from .product import *
 from .building_operation import *
+from .building_impact import *
+from .background_job import *
+from .scenario import *
@@ -167,74 +167,32 @@ class Assembly(BaseModel):
         """
         Create a copy of this assembly for use in a building (non-template instance).
         """
-        # Create new assembly instance
-        new_assembly = Assembly(
-            country=self.country,
-            city=self.city,
-            mode=self.mode,
-            dimension=self.dimension,
-            comment=self.comment,
-            description=self.description,
+        # Not at the top, the cloning module imports this one
+        from pages.scripts.assembly_cloning import clone_assembly
+
+        return clone_assembly(
+            self,
             name=new_name or f"{self.name} (Copy)",
-            is_boq=self.is_boq,
             is_template=False,  # New instance is not a template
             from_template=self if self.is_template else None,  # Track source template
+            created_by=user,
+            public=False,
+            draft=False,
         )
-        
-        if user:
-            new_assembly.created_by = user
-            
-        new_assembly.save()
-        
-        # Copy all structural products
-        for structural_product in self.structuralproduct_set.all():
-            StructuralProduct.objects.create(
-                epd=structural_product.epd,
-                classification=structural_product.classification,
-                assembly=new_assembly,
-                input_unit=structural_product.input_unit,
-                quantity=structural_product.quantity,
-                description=structural_product.description,
-            )
-        
-        return new_assembly
 
     def create_template_copy(self, user=None, template_name=None):
         # Create new template instance (completely separate record)
-        template = Assembly(
-            country=self.country,
-            city=self.city,
-            mode=self.mode,
-            dimension=self.dimension,
-            comment=self.comment,
-            description=self.description,
+        from pages.scripts.assembly_cloning import clone_assembly
+
+        return clone_assembly(
+            self,
             name=template_name or f"{self.name} Template",
-            is_boq=self.is_boq,
             is_template=True,  # This is a template
             from_template=None,  # Templates don't track origins
-            public=self.public,
+            created_by=user or self.created_by,
+            draft=False,
         )
 
-        if user:
-            template.created_by = user
-        else:
-            template.created_by = self.created_by
-
-        template.save()
-
-        # Copy all structural products to the template
-        for structural_product in self.structuralproduct_set.all():
-            StructuralProduct.objects.create(
-                epd=structural_product.epd,
-                classification=structural_product.classification,
-                assembly=template,
-                input_unit=structural_product.input_unit,
-                quantity=structural_product.quantity,
-                description=structural_product.description,
-            )
-
-        return template
-
     @property
     def classification(self):
         # 1) do we already have a .products list from prefetch?
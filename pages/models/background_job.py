@@ -0,0 +1,94 @@
+import uuid
+
+from django.db import models
+from django.utils.translation import gettext as _
+
+from accounts.models import CustomUser
+
+
+class JobStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    SUCCEEDED = "succeeded", "Succeeded"
+    FAILED = "failed", "Failed"
+    CANCELLED = "cancelled", "Cancelled"
+
+
+class BackgroundJob(models.Model):
+    """A long-running task, queued in the database and run by the `run_jobs` worker.
+
+    `kind` names a task registered in `pages.scripts.background_jobs`, which is
+    called with `params`. Workers report progress on the row and check
+    `cancel_requested` while the task runs.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(_("Kind"), max_length=100)
+    params = models.JSONField(_("Parameters"), default=dict, blank=True)
+    status = models.CharField(
+        _("Status"),
+        max_length=20,
+        choices=JobStatus.choices,
+        default=JobStatus.QUEUED,
+        db_index=True,
+    )
+    progress_done = models.PositiveIntegerField(_("Done"), default=0)
+    progress_total = models.PositiveIntegerField(_("Total"), null=True, blank=True)
+    message = models.CharField(_("Message"), max_length=500, blank=True, default="")
+    error = models.TextField(_("Error"), blank=True, default="")
+    # The file itself is kept in `BackgroundJobResultChunk` rows
+    result_name = models.CharField(_("Result file name"), max_length=255, blank=True, default="")
+    cancel_requested = models.BooleanField(_("Cancel requested"), default=False)
+    worker = models.CharField(_("Worker"), max_length=255, blank=True, default="")
+    created_by = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    started_at = models.DateTimeField(_("Started at"), null=True, blank=True)
+    finished_at = models.DateTimeField(_("Finished at"), null=True, blank=True)
+    # Touched with every progress report, a stale running job lost its worker
+    heartbeat_at = models.DateTimeField(_("Heartbeat at"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Background job"
+        verbose_name_plural = "Background jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} ({self.status})"
+
+    @property
+    def percent(self) -> float | None:
+        if not self.progress_total:
+            return None
+        return 100 * self.progress_done / self.progress_total
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class BackgroundJobResultChunk(models.Model):
+    """A piece of the result file of a job, numbered from 0 by `index`.
+
+    Kept in the database since the worker and the web processes share no file
+    storage, in pieces so that neither side holds the whole file in memory.
+    """
+
+    job = models.ForeignKey(
+        BackgroundJob, on_delete=models.CASCADE, related_name="result_chunks"
+    )
+    index = models.PositiveIntegerField(_("Index"))
+    data = models.BinaryField(_("Data"))
+
+    class Meta:
+        verbose_name = "Background job result chunk"
+        verbose_name_plural = "Background job result chunks"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job", "index"], name="unique_background_job_result_chunk"
+            ),
+        ]
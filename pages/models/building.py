@@ -106,12 +106,6 @@ class BuildingOperationalInfo(models.Model):
         related_name="buildings",
         through="OperationalProduct",
     )
-    simulated_operational_components = models.ManyToManyField(
-        EPD,
-        blank=True,
-        related_name="buildingsimulations",
-        through="SimulatedOperationalProduct",
-    )
     ### Building Operation
     num_residents = models.IntegerField(
         _("Approx. number of residents"),
@@ -269,12 +263,6 @@ class Building(BaseModel, BaseGeoModel, BuildingOperationalInfo):
         related_name="buildings",
         through="BuildingAssembly",
     )
-    simulated_components = models.ManyToManyField(
-        Assembly,
-        blank=True,
-        related_name="buildingsimulations",
-        through="BuildingAssemblySimulated",
-    )
     category = models.ForeignKey(
         CategorySubcategory, on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -352,32 +340,6 @@ class BuildingAssembly(models.Model):
         verbose_name_plural = "Building structural components"
 
 
-class BuildingAssemblySimulated(models.Model):
-    assembly = models.ForeignKey(Assembly, on_delete=models.CASCADE)
-    building = models.ForeignKey(Building, on_delete=models.CASCADE)
-    quantity = models.DecimalField(
-        _("Quantity"),
-        help_text=_("How many of components"),
-        max_digits=10,
-        decimal_places=2,
-        null=False,
-        blank=False,
-    )
-    unit = models.CharField(
-        _("Unit of Quantity"), max_length=20, choices=Unit.choices, default=Unit.UNKNOWN
-    )
-    reporting_life_cycle = models.IntegerField(
-        _("Reporting life-cycle"),
-        help_text=_("Reporting life-cycle for assembly"),
-        validators=[MinValueValidator(1), MaxValueValidator(10000)],
-        default=50,
-    )
-
-    class Meta:
-        verbose_name = "Building structural component simulation"
-        verbose_name_plural = "Building structural components simulation"
-
-
 class OperationalProduct(BaseProduct):
     """Join Table for EPDs and Building. Products are EPDs with quantity and results."""
 
@@ -387,16 +349,3 @@ class OperationalProduct(BaseProduct):
 
     def get_impacts(self):
         return calculate_impact_operational(self)
-
-
-class SimulatedOperationalProduct(BaseProduct):
-    """Join Table for EPDs and Simulated Building. Products are EPDs with quantity and results."""
-
-    building = models.ForeignKey(
-        Building,
-        on_delete=models.CASCADE,
-        related_name="simulated_operational_products",
-    )
-
-    def get_impacts(self):
-        return calculate_impact_operational(self)
@@ -0,0 +1,144 @@
+from django.db import models
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext as _
+
+from .assembly import Assembly, AssemblyCategory, StructuralProduct
+from .building import Building, BuildingAssembly, OperationalProduct
+from .epd import EPD, EPDImpact, Impact
+
+
+class BuildingImpact(models.Model):
+    """Materialized impact results of a building.
+
+    Rows are normalised by the total floor area like `calculate_impacts`. Operational
+    rows have no assembly and hold the yearly B6 impact. The table is only written by
+    `pages.views.building.impact_results` when one of its inputs changes.
+    """
+
+    building = models.ForeignKey(
+        Building, on_delete=models.CASCADE, related_name="impact_results"
+    )
+    assembly = models.ForeignKey(
+        Assembly, on_delete=models.CASCADE, null=True, blank=True
+    )
+    assembly_category = models.ForeignKey(
+        AssemblyCategory, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    epd = models.ForeignKey(EPD, on_delete=models.CASCADE)
+    impact = models.ForeignKey(Impact, on_delete=models.CASCADE)
+    value = models.FloatField()
+
+    class Meta:
+        verbose_name = "Building impact result"
+        verbose_name_plural = "Building impact results"
+        indexes = [
+            models.Index(fields=["building", "assembly"]),
+        ]
+        constraints = [
+            # Refreshes are serialized on the building row, this guards against
+            # any writer that is not
+            models.UniqueConstraint(
+                fields=[
+                    "building",
+                    "assembly",
+                    "assembly_category",
+                    "epd",
+                    "impact",
+                ],
+                nulls_distinct=False,
+                name="unique_building_impact",
+            ),
+        ]
+
+
+class BuildingImpactError(models.Model):
+    """Parts of a building whose impacts could not be calculated.
+
+    Written next to the `BuildingImpact` rows, so results missing an assembly
+    (or operational products, without assembly) are flagged instead of being
+    silently incomplete.
+    """
+
+    building = models.ForeignKey(
+        Building, on_delete=models.CASCADE, related_name="impact_errors"
+    )
+    assembly = models.ForeignKey(
+        Assembly, on_delete=models.CASCADE, null=True, blank=True
+    )
+    message = models.TextField(_("Message"))
+
+    class Meta:
+        verbose_name = "Building impact error"
+        verbose_name_plural = "Building impact errors"
+        indexes = [
+            models.Index(fields=["building", "assembly"]),
+        ]
+
+
+# Signals: keep `BuildingImpact` in sync with its inputs
+def _impact_results():
+    # Imported lazily, the service depends on the models
+    from pages.views.building import impact_results
+
+    return impact_results
+
+
+@receiver(post_save, sender=StructuralProduct)
+@receiver(post_delete, sender=StructuralProduct)
+def refresh_results_for_product(sender, instance, **kwargs):
+    _impact_results().schedule_assembly_refresh(instance.assembly_id)
+
+
+@receiver(post_save, sender=Assembly)
+def refresh_results_for_assembly(sender, instance, created, **kwargs):
+    if not created:
+        _impact_results().schedule_assembly_refresh(instance.pk)
+
+
+@receiver(post_save, sender=BuildingAssembly)
+@receiver(post_delete, sender=BuildingAssembly)
+def refresh_results_for_building_assembly(sender, instance, **kwargs):
+    _impact_results().schedule_results_refresh(
+        instance.building_id, assembly_id=instance.assembly_id
+    )
+
+
+@receiver(post_save, sender=OperationalProduct)
+@receiver(post_delete, sender=OperationalProduct)
+def refresh_results_for_operational_product(sender, instance, **kwargs):
+    _impact_results().schedule_results_refresh(instance.building_id)
+
+
+@receiver(post_save, sender=EPDImpact)
+@receiver(post_delete, sender=EPDImpact)
+def refresh_results_for_epd_impact(sender, instance, **kwargs):
+    _impact_results().schedule_epd_refresh([instance.epd_id])
+
+
+@receiver(post_save, sender=EPD)
+def refresh_results_for_epd(sender, instance, created, **kwargs):
+    if not created:
+        _impact_results().schedule_epd_refresh([instance.pk])
+
+
+@receiver(post_init, sender=Building)
+def remember_total_floor_area(sender, instance, **kwargs):
+    # Read from __dict__, a deferred area must not cost a query here
+    instance._loaded_total_floor_area = instance.__dict__.get("total_floor_area")
+
+
+@receiver(post_save, sender=Building)
+def refresh_results_for_floor_area(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    previous = instance._loaded_total_floor_area
+    instance._loaded_total_floor_area = instance.__dict__.get("total_floor_area")
+    if created or raw or previous is None:
+        return
+    if update_fields is not None and "total_floor_area" not in update_fields:
+        return
+    if previous != instance.total_floor_area:
+        # Results are normalised by floor area. Recomputed on commit under the
+        # building lock, like every other refresh, so they cannot race one.
+        _impact_results().schedule_building_refresh(instance.pk)
@@ -1,7 +1,11 @@
 from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.utils.translation import gettext as _
 
 from cities_light.models import Country
@@ -9,6 +13,10 @@ from accounts.models import CustomCity
 
 from .base import BaseModel
 
+# No stemming or stop words, names come in many languages
+SEARCH_CONFIG = "simple"
+
+
 class Unit(models.TextChoices):
     """Adapted from LCAx."""
 
@@ -198,6 +206,15 @@ class MaterialCategory(models.Model):
     def __str__(self):
         return self.name_en
 
+    @property
+    def path(self):
+        """Materialized path, e.g. "1.1.01.", a subtree is everything starting with it.
+
+        category_id already nests the parent's id, the trailing dot stops "2.1"
+        from matching "2.10".
+        """
+        return f"{self.category_id}."
+
 
 class Impact(models.Model):
     impact_category = models.CharField(
@@ -299,10 +316,68 @@ class EPD(BaseModel, epdLCAx):
     labels = models.ManyToManyField(
         Label, blank=True, related_name="epd_labels", through="EPDLabel"
     )
+    # Impacts per declared amount, denormalized from EPDImpact by `refresh_impact_summaries`
+    gwp_a1a3 = models.FloatField(_("GWP A1-A3 per declared amount"), null=True, blank=True, editable=False, db_index=True)
+    penrt_a1a3 = models.FloatField(_("PENRT A1-A3 per declared amount"), null=True, blank=True, editable=False)
+    gwp_b6 = models.FloatField(_("GWP B6 per declared amount"), null=True, blank=True, editable=False, db_index=True)
+    penrt_b6 = models.FloatField(_("PENRT B6 per declared amount"), null=True, blank=True, editable=False)
+    # name and all translations, full-text indexed for the EPD search
+    search_text = models.TextField(_("Search text"), blank=True, default="", editable=False)
+    # kg/m^3 conversion, extracted from `conversions` for the dimension filter
+    has_volume_density = models.BooleanField(_("Has volume density"), default=False, editable=False)
+    volume_density = models.FloatField(_("Volume density (kg/m^3)"), null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(
+                SearchVector("search_text", config=SEARCH_CONFIG),
+                name="epd_search_text_vector",
+            ),
+            models.Index(
+                fields=["declared_unit", "has_volume_density"],
+                name="epd_unit_volume_density_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Override save to keep the fields derived from names and conversions in sync.
+        """
+        self.set_derived_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {"name", "names"} & update_fields:
+                update_fields.add("search_text")
+            if "conversions" in update_fields:
+                update_fields.update({"volume_density", "has_volume_density"})
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
+    def get_conversion(self, unit) -> float | None:
+        """Value of the conversion with the given unit, None if missing or not a number."""
+        for item in self.conversions or []:
+            if isinstance(item, dict) and item.get("unit") == unit:
+                try:
+                    return float(item.get("value"))
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    def set_derived_fields(self):
+        self.search_text = self.get_search_text()
+        self.has_volume_density = any(
+            isinstance(item, dict) and item.get("unit") == "kg/m^3" for item in self.conversions or []
+        )
+        self.volume_density = self.get_conversion("kg/m^3")
+
+    def get_search_text(self):
+        translations = [n.get("value") for n in self.names or [] if isinstance(n, dict)]
+        return " ".join(dict.fromkeys(t for t in [self.name, *translations] if t))
+
     def get_gwp_impact_sum(self, life_cycle_stage):
         """
         Finds the EPDImpact for GWP + given life_cycle_stage and returns
@@ -420,6 +495,68 @@ class EPDImpact(models.Model):
         unique_together = ("epd", "impact")
 
 
+# (impact_category, life_cycle_stage) of the summary columns on EPD
+IMPACT_SUMMARY_FIELDS = {
+    ("gwp", "a1a3"): "gwp_a1a3",
+    ("penrt", "a1a3"): "penrt_a1a3",
+    ("gwp", "b6"): "gwp_b6",
+    ("penrt", "b6"): "penrt_b6",
+}
+
+
+def refresh_impact_summaries(epd_ids=None, batch_size=1000):
+    """Recompute the impact summary columns of the given EPDs (all if None).
+
+    Values are normalised the same way as `EPD.get_gwp_impact_sum`.
+    """
+    epds = EPD.objects.all()
+    if epd_ids is not None:
+        epds = epds.filter(pk__in=epd_ids)
+
+    summaries = {
+        pk: EPD(pk=pk, declared_amount=declared_amount)
+        for pk, declared_amount in epds.values_list("pk", "declared_amount")
+    }
+    for epd in summaries.values():
+        for field in IMPACT_SUMMARY_FIELDS.values():
+            setattr(epd, field, None)
+
+    rows = EPDImpact.objects.filter(
+        epd_id__in=summaries.keys(),
+        impact__impact_category__in={c for c, _ in IMPACT_SUMMARY_FIELDS},
+        impact__life_cycle_stage__in={s for _, s in IMPACT_SUMMARY_FIELDS},
+    ).values_list("epd_id", "impact__impact_category", "impact__life_cycle_stage", "value")
+    for epd_id, impact_category, life_cycle_stage, value in rows:
+        field = IMPACT_SUMMARY_FIELDS.get((impact_category, life_cycle_stage))
+        if field:
+            epd = summaries[epd_id]
+            setattr(epd, field, float(Decimal(round(value, 2)) / epd.declared_amount))
+
+    EPD.objects.bulk_update(
+        summaries.values(), list(IMPACT_SUMMARY_FIELDS.values()), batch_size=batch_size
+    )
+
+
+@receiver(pre_save, sender=EPD)
+def set_epd_derived_fields_on_load(sender, instance, raw, **kwargs):
+    # Fixtures are loaded without calling EPD.save()
+    if raw:
+        instance.set_derived_fields()
+
+
+@receiver(post_save, sender=EPDImpact)
+@receiver(post_delete, sender=EPDImpact)
+def refresh_impact_summary_on_impact_change(sender, instance, **kwargs):
+    refresh_impact_summaries([instance.epd_id])
+
+
+@receiver(post_save, sender=EPD)
+def refresh_impact_summary_on_epd_change(sender, instance, created, **kwargs):
+    # The summaries are divided by the declared amount
+    if not created:
+        refresh_impact_summaries([instance.pk])
+
+
 class EPDLabel(models.Model):
     """Join Table for EPDs and Label"""
     
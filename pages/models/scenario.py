@@ -0,0 +1,194 @@
+import uuid
+
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from accounts.models import CustomUser
+
+from .assembly import Assembly, StructuralProduct
+from .building import Building, BuildingAssembly, OperationalProduct
+from .epd import EPD, Unit
+
+
+class Scenario(models.Model):
+    """A named what-if variant of a building, stored as overrides on its baseline.
+
+    Nothing of the building is copied. The simulation page and the scenario
+    sweep resolve it by laying the override rows over the current assemblies
+    and products of the building, see `pages.views.building.scenarios`. An
+    assembly edited in a scenario is the only thing copied, see `ScenarioAssembly`.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    building = models.ForeignKey(
+        Building, on_delete=models.CASCADE, related_name="scenarios"
+    )
+    name = models.CharField(_("Name"), max_length=255)
+    created_by = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(_("Created at"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated at"), auto_now=True)
+    # The simulation page shows the scenario selected last
+    selected_at = models.DateTimeField(_("Selected at"), default=timezone.now)
+
+    class Meta:
+        verbose_name = "Scenario"
+        verbose_name_plural = "Scenarios"
+        ordering = ["building", "name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["building", "name"], name="unique_scenario_name"
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class ScenarioAssembly(models.Model):
+    """Changes one assembly of the building, or adds one when `building_assembly` is empty.
+
+    With both `building_assembly` and `assembly` set, the assembly replaces the
+    one of the building. That is how assemblies edited in a scenario are stored:
+    the edit goes to a copy of that one assembly, the building keeps its own.
+    """
+
+    scenario = models.ForeignKey(
+        Scenario, on_delete=models.CASCADE, related_name="assembly_overrides"
+    )
+    building_assembly = models.ForeignKey(
+        BuildingAssembly, on_delete=models.CASCADE, null=True, blank=True
+    )
+    # Set for added assemblies and the copies replacing one of the building
+    assembly = models.ForeignKey(
+        Assembly, on_delete=models.CASCADE, null=True, blank=True
+    )
+    quantity = models.DecimalField(
+        _("Quantity"),
+        help_text=_("Replaces the quantity of the building, if set"),
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+    reporting_life_cycle = models.IntegerField(
+        _("Reporting life-cycle"),
+        help_text=_("Replaces the reporting life-cycle of the building, if set"),
+        validators=[MinValueValidator(1), MaxValueValidator(10000)],
+        null=True,
+        blank=True,
+    )
+    removed = models.BooleanField(_("Removed"), default=False)
+
+    class Meta:
+        verbose_name = "Scenario structural component"
+        verbose_name_plural = "Scenario structural components"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scenario", "building_assembly"],
+                condition=models.Q(building_assembly__isnull=False),
+                name="unique_scenario_building_assembly",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(building_assembly__isnull=False)
+                | models.Q(assembly__isnull=False, quantity__isnull=False),
+                name="scenario_assembly_added_with_quantity",
+            ),
+        ]
+
+
+class ScenarioProduct(models.Model):
+    """Swaps the EPD of, changes or removes one product of an assembly of the building."""
+
+    scenario = models.ForeignKey(
+        Scenario, on_delete=models.CASCADE, related_name="product_overrides"
+    )
+    product = models.ForeignKey(StructuralProduct, on_delete=models.CASCADE)
+    epd = models.ForeignKey(EPD, on_delete=models.CASCADE, null=True, blank=True)
+    input_unit = models.CharField(
+        _("Unit for quantity of EPD"),
+        max_length=20,
+        choices=Unit.choices,
+        null=True,
+        blank=True,
+    )
+    quantity = models.DecimalField(
+        _("Quantity of EPD"),
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+    removed = models.BooleanField(_("Removed"), default=False)
+
+    class Meta:
+        verbose_name = "Scenario product"
+        verbose_name_plural = "Scenario products"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scenario", "product"], name="unique_scenario_product"
+            ),
+        ]
+
+
+class ScenarioOperationalProduct(models.Model):
+    """Changes or removes one operational product of the building, or adds one
+    when `operational_product` is empty."""
+
+    scenario = models.ForeignKey(
+        Scenario, on_delete=models.CASCADE, related_name="operational_overrides"
+    )
+    operational_product = models.ForeignKey(
+        OperationalProduct, on_delete=models.CASCADE, null=True, blank=True
+    )
+    epd = models.ForeignKey(EPD, on_delete=models.CASCADE, null=True, blank=True)
+    input_unit = models.CharField(
+        _("Unit for quantity of EPD"),
+        max_length=20,
+        choices=Unit.choices,
+        null=True,
+        blank=True,
+    )
+    quantity = models.DecimalField(
+        _("Quantity of EPD"),
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+    description = models.CharField(
+        _("Description"), max_length=255, null=True, blank=True
+    )
+    removed = models.BooleanField(_("Removed"), default=False)
+
+    class Meta:
+        verbose_name = "Scenario operational product"
+        verbose_name_plural = "Scenario operational products"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scenario", "operational_product"],
+                condition=models.Q(operational_product__isnull=False),
+                name="unique_scenario_operational_product",
+            ),
+            models.CheckConstraint(
+                condition=models.Q(operational_product__isnull=False)
+                | models.Q(epd__isnull=False, quantity__isnull=False),
+                name="scenario_operational_product_added_with_epd",
+            ),
+        ]
+
+
+# Signals: cached impacts of a scenario are keyed by its `updated_at`
+@receiver(post_save, sender=ScenarioAssembly)
+@receiver(post_delete, sender=ScenarioAssembly)
+@receiver(post_save, sender=ScenarioProduct)
+@receiver(post_delete, sender=ScenarioProduct)
+@receiver(post_save, sender=ScenarioOperationalProduct)
+@receiver(post_delete, sender=ScenarioOperationalProduct)
+def touch_scenario(sender, instance, **kwargs):
+    Scenario.objects.filter(pk=instance.scenario_id).update(updated_at=timezone.now())
@@ -1,7 +1,11 @@
 import json
+from functools import partial
 
 import pandas as pd
 
+from pages.scripts.epd_parsing import ParsePool
+from pages.scripts.http_fetcher import EPDFetcher
+
 from pages.scripts.oekobaudat.oekobaudat_loader import (
     get_all_epds,
     get_full_epd,
@@ -20,18 +24,25 @@ mapping_dict = dict(zip(mapping_table["category_id"], mapping_table["name_en"]))
 mapping_dict["0"] = "Unkown"
 
 
-def load_oekobaudat():
-    def get_classification(d: dict):
-        classification_list = d["processInformation"]["dataSetInformation"]["classificationInformation"]["classification"][0]["class"]
-        container = {}
-        for count, i in enumerate(classification_list):
-            # classification list is ordered
-            assert i.get("level") == count
-            container.update({f"level_{count}_index": i.get('classId'), f"level_{count}_text": i.get('value')})
-            
-        return container
+def get_oekobaudat_classification(d: dict):
+    classification_list = d["processInformation"]["dataSetInformation"]["classificationInformation"]["classification"][0]["class"]
+    container = {}
+    for count, i in enumerate(classification_list):
+        # classification list is ordered
+        assert i.get("level") == count
+        container.update({f"level_{count}_index": i.get('classId'), f"level_{count}_text": i.get('value')})
+        
+    return container
+
+
+def parse_oekobaudat_epd(data: dict):
+    # Runs in the parsing processes
+    epd = parse_epd(data)
+    epd.update(get_oekobaudat_classification(data))
+    return epd
 
 
+def load_oekobaudat():
     def get_densities(d: dict):
         container = {}
         for conv in d["conversions"]:
@@ -52,16 +63,20 @@ def load_oekobaudat():
         conv = {"conversion_factor (to kg)": i["value"] for i in d.get("conversions") if "kg" in i["unit"]}
         return conv
     
-    uuids = get_all_epds()
-    
+    def download(fetcher):
+        for uuid, data, error in fetcher.map(partial(get_full_epd, fetcher=fetcher), get_all_epds(fetcher)):
+            if error:
+                raise error
+            yield uuid, data
+
     epd_list = []
-    for uuid in uuids:
-        data = get_full_epd(uuid)
-        epd = parse_epd(data)
-        epd.update(get_classification(data))
-        epd.update(get_densities(epd))
-        epd.update(get_conv_factor(epd))
-        epd_list.append(epd)
+    with EPDFetcher() as fetcher, ParsePool(parse_oekobaudat_epd) as parser:
+        for uuid, epd, error in parser.map(download(fetcher)):
+            if error:
+                raise error
+            epd.update(get_densities(epd))
+            epd.update(get_conv_factor(epd))
+            epd_list.append(epd)
         
     df = pd.DataFrame.from_records(epd_list)
     
@@ -1,48 +1,129 @@
-from io import BytesIO
+import csv
 
-import pandas as pd
+from django.db.models import Prefetch, QuerySet
+from django.http import StreamingHttpResponse
 
 from pages.models.epd import EPD, EPDImpact, MaterialCategory
 
-def to_excel(epds: list[EPD]) -> None:
-    epd_list = []
-    for e in epds:
-        epd_list.append(parse_EPD(e))
-    
-    return pd.DataFrame.from_records(epd_list)
+# EPDs held in memory at once, with their prefetched impacts
+CHUNK_SIZE = 2000
 
-def to_excel_bytes(epds: list[EPD]):
-    df = to_excel(epds)
-    
-    buffer = BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='EPDs', index=False)
+COLUMNS = [
+    "level_0_index",
+    "level_0_text",
+    "level_1_index",
+    "level_1_text",
+    "level_2_index",
+    "level_2_text",
+    "source",
+    "type",
+    "comment",
+    "country",
+    "uuid",
+    "name",
+    "names",
+    "declared_unit",
+    "declared amount",
+    "weight",
+    "volumne density",
+    "area density",
+    "linear density",
+    "gwp_a1a3",
+]
+
+def export_queryset(epds: QuerySet) -> QuerySet:
+    """The EPDs with everything `parse_EPD` reads, loaded in a fixed number of queries per chunk."""
+    return (
+        epds.select_related(
+            "country",
+            "category",
+            "category__parent",
+            "category__parent__parent",
+        )
+        .prefetch_related(
+            Prefetch(
+                "epdimpact_set",
+                queryset=EPDImpact.objects.select_related("impact").filter(
+                    impact__impact_category="gwp", impact__life_cycle_stage="a1a3"
+                ),
+                to_attr="export_impacts",
+            )
+        )
+        .order_by("pk")
+    )
+
+
+def iter_rows(epds: QuerySet, chunk_size=CHUNK_SIZE, progress=None):
+    """Yields one list of `COLUMNS` values per EPD, fetching `chunk_size` EPDs at a time.
+
+    `progress(done)` is called after every chunk.
+    """
+    for done, epd in enumerate(export_queryset(epds).iterator(chunk_size=chunk_size), start=1):
+        row = parse_EPD(epd)
+        yield [row[column] for column in COLUMNS]
+        if progress and done % chunk_size == 0:
+            progress(done)
+
+
+def write_xlsx(epds: QuerySet, file, chunk_size=CHUNK_SIZE, progress=None) -> None:
+    # Imported here, only the Excel export needs openpyxl
+    from openpyxl import Workbook
+
+    # Write-only workbooks flush rows to disk instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("EPDs")
+    sheet.append(COLUMNS)
+    for row in iter_rows(epds, chunk_size, progress):
+        sheet.append(row)
+    workbook.save(file)
+
+
+class _Echo:
+    """File-like object handing back what `csv.writer` writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(epds: QuerySet, chunk_size=CHUNK_SIZE, progress=None):
+    """Yields the export as CSV lines, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in iter_rows(epds, chunk_size, progress):
+        yield writer.writerow(row)
+
+
+def csv_response(epds: QuerySet, filename="export.csv") -> StreamingHttpResponse:
+    response = StreamingHttpResponse(iter_csv(epds), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
-    excel_bytes = buffer.getvalue()
-    return excel_bytes
 
 def parse_EPD(epd: EPD):
+    category = epd.category
+    parent = get_parent(category)
+    grandparent = get_parent(parent)
     return {
-        "level_0_index": epd.category.parent.parent.level if get_parent(get_parent(epd.category)) else "",
-        "level_0_text": epd.category.parent.parent.name_en if get_parent(get_parent(epd.category)) else "",
-        "level_1_index": epd.category.parent.level if get_parent(epd.category) else "",
-        "level_1_text": epd.category.parent.name_en if get_parent(epd.category) else "",
-        "level_2_index": epd.category.level,
-        "level_2_text": epd.category.name_en,
+        "level_0_index": grandparent.level if grandparent else "",
+        "level_0_text": grandparent.name_en if grandparent else "",
+        "level_1_index": parent.level if parent else "",
+        "level_1_text": parent.name_en if parent else "",
+        "level_2_index": category.level if category else "",
+        "level_2_text": category.name_en if category else "",
         "source": epd.source,
         "type": epd.type,
         "comment": epd.comment,
-        "country": epd.country.name,
+        "country": epd.country.name if epd.country else "",
         "uuid": epd.UUID,
         "name": epd.name,
-        "names": ", ".join([n["value"] for n in epd.names]),
+        "names": ", ".join([n["value"] for n in epd.names or []]),
         "declared_unit": epd.declared_unit,
         "declared amount": epd.declared_amount,
         "weight": get_conversion(epd.conversions, "-"),
         "volumne density": get_conversion(epd.conversions, "kg/m^3"),
         "area density": get_conversion(epd.conversions, "kg/m^2"),
         "linear density": get_conversion(epd.conversions, "kg/m"),
-        "gwp_a1a3": get_impact(epd.epdimpact_set.all(), "gwp", "a1a3")
+        "gwp_a1a3": get_impact(getattr(epd, "export_impacts", epd.epdimpact_set.all()), "gwp", "a1a3"),
     }
 
 
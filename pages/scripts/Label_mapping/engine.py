@@ -0,0 +1,104 @@
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable
+
+import pandas as pd
+from django.db import transaction
+
+from pages.models.epd import EPD, EPDLabel, Label
+from pages.views.reference_registry import reference_registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LabelMapping:
+    """Describes a file assigning the scores of one label to EPDs.
+
+    `prepare` maps the raw frame to EPD field values, one column per field
+    (e.g. `name`, `country_id`, `category_id`). A row matches the EPD that
+    agrees on all of them; the score is read from `score_column`.
+    """
+
+    file_path: str
+    label_name: str
+    prepare: Callable[[pd.DataFrame], pd.DataFrame]
+    score_column: str = "label_score"
+
+
+@dataclass
+class LabelReport:
+    rows: int = 0
+    assigned: int = 0
+    unmatched: dict[int, str] = field(default_factory=dict)
+    dry_run: bool = False
+
+    def __str__(self):
+        action = "Would assign" if self.dry_run else "Assigned"
+        return f"{action} {self.assigned} of {self.rows} labels, {len(self.unmatched)} rows unmatched."
+
+
+def assign_labels(spec: LabelMapping, dry_run=False, df: pd.DataFrame | None = None) -> LabelReport:
+    """Matches all rows of a mapping file to EPDs at once and upserts their labels.
+
+    Rows without exactly one matching EPD, or with a score that is not on
+    the label's scale, are skipped and listed in the report.
+    """
+    if df is None:
+        df = pd.read_csv(spec.file_path, sep=";")
+    report = LabelReport(rows=len(df), dry_run=dry_run)
+
+    label = reference_registry().label(spec.label_name)
+    if label is None:
+        raise Label.DoesNotExist(f"Label '{spec.label_name}' is not loaded")
+
+    keys = spec.prepare(df)
+    # Empty cells become None instead of NaN, like the stored values
+    keys = keys.astype(object).where(keys.notna(), None)
+    scores = df[spec.score_column].astype(str)
+
+    matches = match_epds(keys)
+    epd_labels = {}
+    for row, key, score in zip(keys.index, keys.itertuples(index=False, name=None), scores):
+        pks = matches.get(key, [])
+        if len(pks) != 1:
+            report.unmatched[row] = "No matching EPD" if not pks else f"Matches {len(pks)} EPDs"
+        elif label.scale_parameters and score not in label.scale_parameters:
+            report.unmatched[row] = f"Score '{score}' is not on the scale of '{label.name}'"
+        else:
+            # Like repeated updates, the last row for an EPD wins
+            epd_labels[pks[0]] = EPDLabel(epd_id=pks[0], label=label, score=score)
+    report.assigned = len(epd_labels)
+
+    for row, reason in report.unmatched.items():
+        logger.warning("Row %s of %s: %s", row, spec.file_path, reason)
+    logger.info("%s: %s", spec.file_path, report)
+    if not dry_run:
+        write(list(epd_labels.values()))
+    return report
+
+
+def match_epds(keys: pd.DataFrame) -> dict[tuple, list[int]]:
+    """Primary keys of the EPDs agreeing with each distinct row of `keys`.
+
+    One query fetches the candidates by name, the remaining columns are
+    compared on an in-memory index.
+    """
+    fields = list(keys.columns)
+    candidates = EPD.objects.filter(name__in=set(keys["name"].dropna())).values_list("pk", *fields)
+    index = defaultdict(list)
+    for pk, *values in candidates:
+        index[tuple(values)].append(pk)
+    return index
+
+
+@transaction.atomic
+def write(epd_labels: list[EPDLabel]) -> None:
+    # bulk_create skips EPDLabel.save(), scores are checked against the scale above
+    EPDLabel.objects.bulk_create(
+        epd_labels,
+        update_conflicts=True,
+        unique_fields=["epd", "label"],
+        update_fields=["score"],
+    )
@@ -0,0 +1,60 @@
+import logging
+from typing import Callable, Iterable
+
+from django.db import transaction
+
+from pages.models.assembly import Assembly, StructuralProduct
+
+logger = logging.getLogger(__name__)
+
+# Set by their defaults on every new row
+SKIPPED_FIELDS = {"id", "created_at", "updated_at"}
+
+
+@transaction.atomic
+def clone_assemblies(
+    assemblies: Iterable[Assembly],
+    overrides: dict | Callable[[Assembly], dict] | None = None,
+) -> dict:
+    """Copies assemblies and their products, returns the copies by original pk.
+
+    `overrides` sets fields on the copies, either the same values for all of
+    them or per original when callable. Everything is written in one query
+    for the assemblies, one to read the products and one to write them,
+    however many assemblies are copied. Like all bulk writes this skips
+    `save()` and its signals, link the copies to buildings afterwards.
+    """
+    fields = [
+        f.attname for f in Assembly._meta.concrete_fields if f.attname not in SKIPPED_FIELDS
+    ]
+    clones = {}
+    for original in assemblies:
+        if original.pk in clones:
+            continue
+        clone = Assembly(**{f: getattr(original, f) for f in fields})
+        values = overrides(original) if callable(overrides) else overrides
+        for name, value in (values or {}).items():
+            setattr(clone, name, value)
+        clones[original.pk] = clone
+    if not clones:
+        return clones
+
+    Assembly.objects.bulk_create(list(clones.values()))
+    products = [
+        StructuralProduct(
+            assembly=clones[product.assembly_id],
+            epd_id=product.epd_id,
+            classification_id=product.classification_id,
+            input_unit=product.input_unit,
+            quantity=product.quantity,
+            description=product.description,
+        )
+        for product in StructuralProduct.objects.filter(assembly_id__in=clones).order_by("pk")
+    ]
+    StructuralProduct.objects.bulk_create(products)
+    logger.info("Cloned %s assemblies with %s products", len(clones), len(products))
+    return clones
+
+
+def clone_assembly(assembly: Assembly, **overrides) -> Assembly:
+    return clone_assemblies([assembly], overrides)[assembly.pk]
@@ -0,0 +1,293 @@
+import io
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from typing import Callable
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from pages.models.background_job import BackgroundJob, BackgroundJobResultChunk, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Running jobs without a progress report for this long lost their worker
+STALE_AFTER = timedelta(minutes=30)
+# How often a waiting worker looks for such jobs
+STALE_CHECK_INTERVAL = 60  # seconds
+# Progress is written at most this often, cancellation is noticed as fast
+PROGRESS_INTERVAL = 2  # seconds
+# How often a running job is marked alive, whether it reports progress or not
+HEARTBEAT_INTERVAL = 60  # seconds
+# Result files are stored and read back in pieces of this size
+RESULT_CHUNK_SIZE = 1024 * 1024  # bytes
+
+TASKS: dict[str, Callable] = {}
+
+
+def task(kind: str):
+    """Registers `fn(job: JobContext, **params)` as the task run for `kind`."""
+
+    def register(fn):
+        TASKS[kind] = fn
+        return fn
+
+    return register
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class WorkerStopped(BaseException):
+    """Raised into the running task when the worker is told to stop, e.g. on a
+    dyno restart. Not an `Exception`, so tasks do not catch it as a failure."""
+
+
+class JobContext:
+    """Handed to a running task to report progress and store its result.
+
+    `progress` raises `JobCancelled` once the job was cancelled, so tasks stop
+    at their next report.
+    """
+
+    def __init__(self, job: BackgroundJob):
+        self.job = job
+        self._written_at = 0.0
+
+    @property
+    def params(self) -> dict:
+        return self.job.params
+
+    def progress(self, done: int | None = None, total: int | None = None, message: str | None = None, force=False) -> None:
+        if done is not None:
+            self.job.progress_done = done
+        if total is not None:
+            self.job.progress_total = total
+        if message is not None:
+            self.job.message = message[:500]
+        if not force and time.monotonic() - self._written_at < PROGRESS_INTERVAL:
+            return
+        self._written_at = time.monotonic()
+        self.job.heartbeat_at = timezone.now()
+        BackgroundJob.objects.filter(pk=self.job.pk).update(
+            progress_done=self.job.progress_done,
+            progress_total=self.job.progress_total,
+            message=self.job.message,
+            heartbeat_at=self.job.heartbeat_at,
+        )
+        if BackgroundJob.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise JobCancelled()
+
+    def save_result(self, filename: str, file) -> None:
+        """Stores the content of an open binary file as the job's result file,
+        one `RESULT_CHUNK_SIZE` piece at a time."""
+        with transaction.atomic():
+            BackgroundJobResultChunk.objects.filter(job_id=self.job.pk).delete()
+            for index, data in enumerate(iter(lambda: file.read(RESULT_CHUNK_SIZE), b"")):
+                BackgroundJobResultChunk.objects.create(job_id=self.job.pk, index=index, data=data)
+            self.job.result_name = filename
+            BackgroundJob.objects.filter(pk=self.job.pk).update(result_name=filename)
+
+
+class ResultFile(io.RawIOBase):
+    """Read-only file of a job's result, fetched one chunk at a time."""
+
+    def __init__(self, job: BackgroundJob):
+        self.job = job
+        self._index = 0
+        self._chunk = memoryview(b"")
+
+    @property
+    def size(self) -> int:
+        return (
+            BackgroundJobResultChunk.objects.filter(job_id=self.job.pk)
+            .aggregate(size=Sum(Length("data")))["size"]
+            or 0
+        )
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._chunk:
+            data = (
+                BackgroundJobResultChunk.objects.filter(job_id=self.job.pk, index=self._index)
+                .values_list("data", flat=True)
+                .first()
+            )
+            if data is None:
+                return 0
+            self._chunk = memoryview(bytes(data))
+            self._index += 1
+        n = min(len(buffer), len(self._chunk))
+        buffer[:n] = self._chunk[:n]
+        self._chunk = self._chunk[n:]
+        return n
+
+
+class Heartbeat(threading.Thread):
+    """Touches `heartbeat_at` of a running job until stopped.
+
+    Tasks may stay silent for long, e.g. management commands printing only at
+    the end, and must not be taken for jobs of a lost worker meanwhile.
+    """
+
+    def __init__(self, job: BackgroundJob):
+        super().__init__(name=f"heartbeat-{job.pk}", daemon=True)
+        self.job = job
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        try:
+            while not self._stopped.wait(HEARTBEAT_INTERVAL):
+                try:
+                    self.beat()
+                except Exception:
+                    logger.exception("Heartbeat of job %s failed", self.job.pk)
+        finally:
+            # The thread has its own connection
+            connection.close()
+
+    def beat(self) -> None:
+        BackgroundJob.objects.filter(pk=self.job.pk, status=JobStatus.RUNNING).update(
+            heartbeat_at=timezone.now()
+        )
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+class JobOutput:
+    """File-like stdout for management commands run as tasks.
+
+    Every line written becomes the job's progress message.
+    """
+
+    def __init__(self, job: JobContext):
+        self.job = job
+        self.lines = []
+
+    def write(self, text: str) -> None:
+        for line in text.splitlines():
+            if line.strip():
+                self.lines.append(line)
+                self.job.progress(message=line)
+
+    def flush(self) -> None:
+        pass
+
+
+def enqueue(kind: str, params: dict | None = None, user=None) -> BackgroundJob:
+    if kind not in TASKS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    return BackgroundJob.objects.create(
+        kind=kind,
+        params=params or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+def cancel(job: BackgroundJob) -> None:
+    """Queued jobs are cancelled right away, running ones at their next progress report."""
+    BackgroundJob.objects.filter(pk=job.pk, status=JobStatus.QUEUED).update(
+        status=JobStatus.CANCELLED, finished_at=timezone.now(), cancel_requested=True
+    )
+    BackgroundJob.objects.filter(pk=job.pk, status=JobStatus.RUNNING).update(cancel_requested=True)
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next(worker: str) -> BackgroundJob | None:
+    """Marks the oldest queued job as running for `worker`.
+
+    Concurrent workers skip the rows locked by each other, so every job is
+    claimed once.
+    """
+    with transaction.atomic():
+        job = (
+            BackgroundJob.objects.select_for_update(skip_locked=True)
+            .filter(status=JobStatus.QUEUED)
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = JobStatus.RUNNING
+        job.worker = worker
+        job.started_at = job.heartbeat_at = timezone.now()
+        job.save(update_fields=["status", "worker", "started_at", "heartbeat_at"])
+    return job
+
+
+def run_job(job: BackgroundJob) -> BackgroundJob:
+    context = JobContext(job)
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        TASKS[job.kind](context, **job.params)
+    except JobCancelled:
+        job.status = JobStatus.CANCELLED
+        logger.info("Job %s was cancelled", job.pk)
+    except Exception:
+        job.status = JobStatus.FAILED
+        job.error = traceback.format_exc()
+        logger.exception("Job %s failed", job.pk)
+    else:
+        job.status = JobStatus.SUCCEEDED
+        if job.progress_total is not None:
+            job.progress_done = job.progress_total
+    finally:
+        heartbeat.stop()
+    job.finished_at = timezone.now()
+    # Only while still running, the job may have been failed as stale meanwhile
+    finished = BackgroundJob.objects.filter(pk=job.pk, status=JobStatus.RUNNING).update(
+        status=job.status,
+        error=job.error,
+        progress_done=job.progress_done,
+        progress_total=job.progress_total,
+        message=job.message,
+        finished_at=job.finished_at,
+        heartbeat_at=job.heartbeat_at,
+    )
+    if not finished:
+        logger.warning("Job %s was no longer running when it finished", job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def requeue(job: BackgroundJob) -> bool:
+    """Puts a job its worker stopped running back into the queue, to start over."""
+    return bool(
+        BackgroundJob.objects.filter(
+            pk=job.pk, status=JobStatus.RUNNING, worker=job.worker
+        ).update(
+            status=JobStatus.QUEUED,
+            worker="",
+            started_at=None,
+            heartbeat_at=None,
+            progress_done=0,
+            progress_total=None,
+            message="Requeued, its worker was stopped",
+        )
+    )
+
+
+def fail_stale_jobs() -> int:
+    """Fails running jobs whose worker stopped reporting, e.g. after a restart."""
+    return BackgroundJob.objects.filter(
+        status=JobStatus.RUNNING, heartbeat_at__lt=timezone.now() - STALE_AFTER
+    ).update(
+        status=JobStatus.FAILED,
+        error="The worker stopped reporting progress.",
+        finished_at=timezone.now(),
+    )
@@ -0,0 +1,52 @@
+import tempfile
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from pages.models.epd import EPD
+from pages.scripts.background_jobs import JobContext, JobOutput, task
+from pages.scripts.Excel_export.export_EPDs_to_excel import iter_csv, write_xlsx
+
+# Management commands that can run as jobs, see `run_command`
+COMMANDS = [
+    "load_local_epds",
+    "load_oekobaudat_epds",
+    "load_ecoplatform_epds",
+    "map_GCCA_EPD_label",
+    "refresh_building_impacts",
+]
+
+
+@task("export_epds")
+def export_epds(job: JobContext, epd_ids: list[str] | None = None, format: str = "xlsx") -> None:
+    """Writes the EPDs (all if `epd_ids` is None) to an Excel or CSV result file."""
+    epds = EPD.objects.all()
+    if epd_ids is not None:
+        epds = epds.filter(pk__in=epd_ids)
+    job.progress(0, total=epds.count(), message="Exporting EPDs", force=True)
+
+    filename = f"epds-{timezone.now():%Y%m%dT%H%M%S}.{format}"
+    with tempfile.TemporaryFile() as f:
+        if format == "csv":
+            for line in iter_csv(epds, progress=job.progress):
+                f.write(line.encode("utf-8"))
+        elif format == "xlsx":
+            write_xlsx(epds, f, progress=job.progress)
+        else:
+            raise ValueError(f"Unknown export format '{format}'")
+        f.seek(0)
+        job.save_result(filename, f)
+    job.progress(message=f"Exported {filename}", force=True)
+
+
+def run_command(command: str):
+    def run(job: JobContext, **options) -> None:
+        """Runs the command, its output lines become the progress messages."""
+        job.progress(message=f"Starting {command}", force=True)
+        call_command(command, stdout=JobOutput(job), **options)
+
+    return run
+
+
+for command in COMMANDS:
+    task(command)(run_command(command))
@@ -0,0 +1,292 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pages.scripts.delta_sync import DeltaFilter
+from pages.scripts.epd_ingestion import EPDIngestor, ReferenceData
+from pages.scripts.epd_parsing import ParsePool
+from pages.scripts.http_fetcher import EPDFetcher
+from pages.scripts.oekobaudat.oekobaudat_loader import parse_epd
+from pages.scripts.sync_journal import ResponseCache, SyncJournal, SyncState
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncResult:
+    fetched: int = 0
+    cached: int = 0
+    skipped: int = 0
+    failed: dict = field(default_factory=dict)
+
+
+class CatalogueSync:
+    """Downloads, parses and stores the EPDs of a remote catalogue, resumably.
+
+    Progress is kept per EPD in a `SyncJournal` and raw responses in a
+    `ResponseCache` below `EPD_SYNC_DIR/<source>`. A re-run skips the EPDs
+    already stored and reuses cached responses, `offline` syncs never touch
+    the network and only re-parse what is in the cache. Entries flagged as
+    `changed` (see `DeltaFilter`) are always downloaded again.
+
+    `fetch(key, info, fetcher)` returns the raw dataset of an EPD, the
+    `parser` turns it into an EPD record on its worker processes and
+    `store(key, info, record, ingestor)` hands the record to the ingestor.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        fetch,
+        store,
+        fetcher: EPDFetcher,
+        parser: ParsePool,
+        ingestor: EPDIngestor,
+        sync_dir: Path | None = None,
+        offline=False,
+        restart=False,
+    ):
+        self.directory = Path(sync_dir or settings.EPD_SYNC_DIR) / source
+        self.journal = SyncJournal(self.directory / "journal.sqlite3")
+        self.cache = ResponseCache(self.directory / "responses")
+        self.fetch = fetch
+        self.store = store
+        self.fetcher = fetcher
+        self.parser = parser
+        self.ingestor = ingestor
+        self.offline = offline
+        self.restart = restart
+        self.result = SyncResult()
+        self._infos = {}
+
+        ingestor.on_stored = lambda uuids: self.journal.mark(uuids, SyncState.STORED)
+        ingestor.on_failed = lambda uuid, e: self.journal.mark(uuid, SyncState.FAILED, repr(e))
+
+    def run(self, entries) -> SyncResult:
+        """Syncs `(key, info)` entries, e.g. from a catalogue listing or `journaled`."""
+
+        def pending():
+            for key, info in entries:
+                self.journal.add(key, info)
+                if (
+                    not self.restart
+                    and not info.get("changed")
+                    and self.journal.state(key) == SyncState.STORED
+                ):
+                    self.result.skipped += 1
+                    continue
+                self._infos[key] = info
+                yield key
+
+        def fetched():
+            for key, loaded, error in self.fetcher.map(self._load, pending()):
+                if error:
+                    self._infos.pop(key)
+                    self._failed(key, error)
+                    continue
+                data, cached = loaded
+                if cached:
+                    self.result.cached += 1
+                else:
+                    self.result.fetched += 1
+                self.journal.mark(key, SyncState.FETCHED)
+                yield key, data
+
+        # Fetching, parsing and storing overlap: each stage pulls from the one before
+        for key, record, error in self.parser.map(fetched()):
+            info = self._infos.pop(key)
+            if error:
+                logger.error("EPD %s could not be parsed", key)
+                self._failed(key, error)
+                continue
+            # Before storing, a flushed batch marks its EPDs stored or failed right away
+            self.journal.mark(key, SyncState.PARSED)
+            try:
+                self.store(key, info, record, self.ingestor)
+            except Exception as e:
+                logger.exception("EPD %s could not be stored", key)
+                self._failed(key, e)
+
+        self.ingestor.flush()
+        self.result.failed = self.journal.errors()
+        return self.result
+
+    def journaled(self, states=None):
+        """Entries of earlier runs, e.g. to replay the failed ones."""
+        return list(self.journal.entries(states))
+
+    def close(self) -> None:
+        self.journal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _load(self, key):
+        """Returns the raw dataset and whether it came from the cache."""
+        # Runs in the fetcher threads, the journal is only used by the main thread
+        # A changed EPD has a newer version than the cached response
+        data = None if self._infos[key].get("changed") else self.cache.get(key)
+        if data is not None:
+            return data, True
+        if self.offline:
+            raise LookupError(f"{key} is not in the response cache")
+        data = self.fetch(key, self._infos[key], self.fetcher)
+        self.cache.put(key, data)
+        return data, False
+
+    def _failed(self, key, error) -> None:
+        logger.error("EPD %s failed: %r", key, error)
+        self.journal.mark(key, SyncState.FAILED, repr(error))
+
+
+class CatalogueSyncCommand(BaseCommand):
+    """Base of the commands loading a remote EPD catalogue through `CatalogueSync`.
+
+    Subclasses set `source` (and `parse` if needed) and implement `listing`,
+    `local_epds`, `fetch` and `store`. With `new_only` EPDs that are already stored are never fetched
+    again, unless the sync is `--incremental`.
+    """
+
+    source = None
+    new_only = False
+    # Runs in the parsing processes, see `ParsePool`
+    parse = staticmethod(parse_epd)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Optional: Number of EPDs written per transaction",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Optional: Number of EPDs downloaded in parallel",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=10,
+            help="Optional: Maximum requests per second",
+        )
+        parser.add_argument(
+            "--parse-workers",
+            type=int,
+            help="Optional: Number of processes parsing EPDs, defaults to the number of CPUs, 0 parses inline",
+        )
+        parser.add_argument(
+            "--sync-dir",
+            type=Path,
+            help="Optional: Directory of the sync journal and response cache, defaults to EPD_SYNC_DIR",
+        )
+        parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Optional: Re-parse the EPDs of earlier runs from the response cache, without network access",
+        )
+        parser.add_argument(
+            "--failed-only",
+            action="store_true",
+            help="Optional: Only replay the EPDs that failed in earlier runs",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Optional: Only fetch EPDs that are new or have a newer version, and report withdrawn ones",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Optional: Also process EPDs that earlier runs already stored",
+        )
+
+    def handle(self, *args, **options):
+        self.refs = ReferenceData()
+        delta = None
+
+        with (
+            self.get_fetcher(max_workers=options["concurrency"], rate=options["rate"]) as fetcher,
+            ParsePool(self.parse, workers=options["parse_workers"]) as parser,
+            EPDIngestor(self.refs, batch_size=options["batch_size"]) as ingestor,
+            CatalogueSync(
+                self.source,
+                fetch=self.fetch,
+                store=self.store,
+                fetcher=fetcher,
+                parser=parser,
+                ingestor=ingestor,
+                sync_dir=options["sync_dir"],
+                offline=options["offline"],
+                restart=options["restart"] or options["offline"],
+            ) as sync,
+        ):
+            if options["failed_only"]:
+                entries = sync.journaled([SyncState.FAILED])
+            elif options["offline"]:
+                entries = sync.journaled()
+            else:
+                # Lazily consumed: downloads start with the first listing page
+                entries = self.listing(fetcher)
+                if options["incremental"] or self.new_only:
+                    delta = DeltaFilter(self.local_epds(), updates=options["incremental"])
+                    entries = delta(entries)
+            result = sync.run(entries)
+            if delta:
+                self.write_delta_report(delta, sync.directory)
+
+        stats = ingestor.stats
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fetched {result.fetched} EPDs, {result.cached} from cache, "
+                f"skipped {result.skipped} already stored."
+            )
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored {stats.stored} EPDs in {stats.batches} batches ({stats.rate:.1f} EPDs/sec)."
+            )
+        )
+        if result.failed:
+            self.stdout.write(self.style.ERROR(f"{len(result.failed)} EPDs failed, replay them with --failed-only:"))
+            for key, error in result.failed.items():
+                self.stdout.write(self.style.ERROR(f"  {key}: {error}"))
+
+    def write_delta_report(self, delta: DeltaFilter, directory: Path) -> None:
+        report = delta.report
+        path = directory / f"delta-{timezone.now():%Y%m%dT%H%M%S}.json"
+        path.write_text(json.dumps(report.as_dict(), indent=2))
+
+        self.stdout.write(
+            self.style.HTTP_INFO(
+                f"Delta: {len(report.added)} added, {len(report.updated)} updated, "
+                f"{len(report.withdrawn)} withdrawn, {report.unchanged} unchanged. Report: {path}"
+            )
+        )
+
+    def get_fetcher(self, **kwargs) -> EPDFetcher:
+        return EPDFetcher(**kwargs)
+
+    def listing(self, fetcher: EPDFetcher):
+        """Yields `(key, info)` of every EPD in the catalogue, info holding its
+        listed `version` and `lastUpdate`."""
+        raise NotImplementedError
+
+    def local_epds(self):
+        """Stored EPDs that came from this catalogue."""
+        raise NotImplementedError
+
+    def fetch(self, key: str, info: dict, fetcher: EPDFetcher) -> dict:
+        raise NotImplementedError
+
+    def store(self, key: str, info: dict, record: dict, ingestor: EPDIngestor) -> None:
+        raise NotImplementedError
@@ -0,0 +1,392 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Callable
+
+import pandas as pd
+from django.db import transaction
+
+from pages.models.epd import (
+    EPD,
+    EPDImpact,
+    EPDLabel,
+    Impact,
+    MaterialCategory,
+    Unit,
+    refresh_impact_summaries,
+)
+from pages.scripts.csv_import.utils import get_superuser
+from pages.scripts.utils import chunked
+from pages.views.reference_registry import reference_registry
+
+logger = logging.getLogger(__name__)
+
+# Columns `CsvImport.prepare` has to provide, one per EPD field
+EPD_COLUMNS = [
+    "country",
+    "category_id",
+    "name",
+    "declared_unit",
+    "declared_amount",
+    "source",
+    "type",
+    "comment",
+    "UUID",
+]
+
+# Fields rewritten when an existing EPD is matched, see `CsvImport.update_fields`
+EPD_UPDATE_FIELDS = [
+    "names",
+    "conversions",
+    "category",
+    "declared_unit",
+    "declared_amount",
+    "source",
+    "type",
+    "comment",
+    "UUID",
+]
+# Kept in sync with the fields they derive from
+DERIVED_FIELDS = ["search_text", "has_volume_density", "volume_density", "updated_at"]
+
+CONVERSION_COLUMNS = {
+    "weight [kg]": {
+        "name": "conversion factor to 1 kg",
+        "unit": "-",  # following the practice in Ökobaudat, see PR #116.
+        "unit_description": "Without unit",
+    },
+    "volume density [kg/m3]": {
+        "name": "volume density",
+        "unit": "kg/m^3",
+        "unit_description": "kilograms per cubic metre",
+    },
+    "area density [kg/m2]": {
+        "name": "area density",
+        "unit": "kg/m^2",
+        "unit_description": "kilograms per square metre",
+    },
+    "linear density [kg/m]": {
+        "name": "linear density",
+        "unit": "kg/m",
+        "unit_description": "kilograms per metre",
+    },
+}
+
+# Read as text, "1.10" must not become 1.1
+INDEX_COLUMNS = {"level_0_index": str, "level_1_index": str, "level_2_index": str}
+
+
+@dataclass
+class CsvImport:
+    """Describes one local EPD file.
+
+    `prepare` maps the raw frame to the `EPD_COLUMNS`. With `match_on`, EPDs
+    of the superuser that agree on these fields are updated instead of added,
+    rewriting `update_fields`. `label_columns` maps Label names to the column
+    holding the score.
+    """
+
+    file_path: str
+    impact_columns: list[str]
+    prepare: Callable[[pd.DataFrame], pd.DataFrame]
+    match_on: tuple[str, ...] = ()
+    update_fields: list[str] = field(default_factory=lambda: list(EPD_UPDATE_FIELDS))
+    category_parent: str | None = None
+    label_columns: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    errors: dict[int, list[str]] = field(default_factory=dict)
+    new_categories: list[str] = field(default_factory=list)
+    dry_run: bool = False
+
+    def __str__(self):
+        action = "Would import" if self.dry_run else "Imported"
+        return (
+            f"{action} {self.rows - len(self.errors)} of {self.rows} rows "
+            f"({self.created} new, {self.updated} updated), {len(self.errors)} rows with errors."
+        )
+
+
+class Lookups:
+    """Countries, categories, impacts and labels of one file, taken from the
+    reference registry. Rows the file creates are only added here."""
+
+    def __init__(self):
+        registry = reference_registry()
+        self.countries = registry.countries
+        self.categories = dict(registry.categories)
+        self.impacts = dict(registry.impacts)
+        self.labels = registry.labels
+
+
+def category_id_with_padding(df: pd.DataFrame) -> pd.Series:
+    """"1", "3", "1" -> "1.3.01", for files listing each level's own index."""
+    level_2 = df["level_2_index"]
+    category_id = (
+        df["level_0_index"] + "." + df["level_1_index"] + "." + level_2.str.zfill(2)
+    )
+    return category_id.where(level_2.notna(), None)
+
+
+def category_id_or_parent(df: pd.DataFrame) -> pd.Series:
+    """Full level 2 id, or the level 1 id if the row has none."""
+    return df["level_2_index"].fillna(df["level_1_index"])
+
+
+def declared_amount_or_one(df: pd.DataFrame) -> pd.Series:
+    if "declared_amount" not in df:
+        return pd.Series(1.0, index=df.index)
+    return pd.to_numeric(df["declared_amount"], errors="coerce").fillna(1.0)
+
+
+def get_conversions(df: pd.DataFrame) -> pd.Series:
+    columns = [col for col in CONVERSION_COLUMNS if col in df]
+    conversions = [
+        [
+            {**CONVERSION_COLUMNS[col], "value": str(value)}
+            for col, value in zip(columns, values)
+            if not pd.isna(value)
+        ]
+        for values in zip(*(df[col] for col in columns))
+    ]
+    return pd.Series(conversions, index=df.index, dtype=object)
+
+
+def read_csv(file_path: str) -> pd.DataFrame:
+    return pd.read_csv(file_path, sep=";", dtype=INDEX_COLUMNS)
+
+
+def import_csv(spec: CsvImport, dry_run=False, df: pd.DataFrame | None = None) -> ImportReport:
+    """Validates a local EPD file as a whole and writes its valid rows in one transaction.
+
+    Rows with errors are skipped and listed in the report. A `dry_run` only
+    validates and never writes to the database.
+    """
+    if df is None:
+        df = read_csv(spec.file_path)
+    lookups = Lookups()
+    report = ImportReport(rows=len(df), dry_run=dry_run)
+
+    frame = spec.prepare(df)[EPD_COLUMNS]
+    # Empty cells become None instead of NaN
+    frame = frame.astype(object).where(frame.notna(), None)
+    frame["UUID"] = frame["UUID"].fillna("")
+    frame["country_obj"] = frame["country"].map(lookups.countries)
+    frame["conversions"] = get_conversions(df)
+    impacts = get_impact_values(df, spec.impact_columns)
+    labels = get_label_scores(df, spec.label_columns, lookups)
+
+    validate(frame, impacts, labels, report)
+    report.new_categories = sorted(
+        set(frame["category_id"].dropna()) - set(lookups.categories)
+    )
+
+    valid = ~frame.index.isin(list(report.errors))
+    frame = frame[valid]
+    impacts = impacts[impacts["row"].isin(frame.index)]
+    labels = labels[labels["row"].isin(frame.index)]
+
+    existing = find_existing(frame, spec.match_on, lookups) if spec.match_on else {}
+    report.updated = sum(1 for pk in existing.values() if pk is not None)
+    report.created = len(frame) - report.updated
+
+    for row, messages in report.errors.items():
+        logger.warning("Row %s of %s: %s", row, spec.file_path, "; ".join(messages))
+    logger.info("%s: %s", spec.file_path, report)
+    if dry_run:
+        return report
+
+    write(spec, frame, impacts, labels, existing, lookups)
+    return report
+
+
+def get_impact_values(df: pd.DataFrame, impact_columns) -> pd.DataFrame:
+    """Impact columns as one row per (row, impact) with a non-empty value."""
+    long = df[impact_columns].melt(ignore_index=False, var_name="column", value_name="raw")
+    long = long[long["raw"].notna()].reset_index(names="row")
+    long["value"] = pd.to_numeric(long["raw"], errors="coerce")
+    # "penrt_a1a3 [MJ]" -> ("penrt", "a1a3")
+    key = long["column"].str.split(" ").str[0].str.split("_")
+    long["impact_category"] = key.str[0]
+    long["life_cycle_stage"] = key.str[1]
+    return long
+
+
+def get_label_scores(df: pd.DataFrame, label_columns: dict, lookups: Lookups) -> pd.DataFrame:
+    """Label columns as one row per (row, label) with a score."""
+    frames = [
+        pd.DataFrame(
+            {"row": scores.index, "label": label_name, "score": scores.astype(str).values}
+        )
+        for label_name, column in label_columns.items()
+        if not (scores := df[column].dropna()).empty
+    ]
+    if not frames:
+        return pd.DataFrame(columns=["row", "label", "score", "label_obj"])
+    labels = pd.concat(frames, ignore_index=True)
+    labels["label_obj"] = labels["label"].map(lookups.labels)
+    return labels
+
+
+def validate(frame, impacts, labels, report: ImportReport) -> None:
+    def add_errors(rows, messages):
+        for row, message in zip(rows, messages):
+            report.errors.setdefault(row, []).append(message)
+
+    def add_frame_errors(mask, message):
+        add_errors(frame.index[mask], (message.format(**r) for r in frame[mask].to_dict("records")))
+
+    add_frame_errors(frame["country_obj"].isna(), "Unknown country '{country}'")
+    add_frame_errors(
+        frame["name"].isna() | (frame["name"].astype(str).str.strip() == ""), "Missing name"
+    )
+    units = frame["declared_unit"].astype(str).str.lower()
+    add_frame_errors(~units.isin(Unit.values), "Unknown declared unit '{declared_unit}'")
+    add_frame_errors(
+        pd.to_numeric(frame["declared_amount"], errors="coerce").isna(), "Invalid declared amount"
+    )
+
+    invalid = impacts[impacts["value"].isna()]
+    add_errors(
+        invalid["row"],
+        (f"'{raw}' in {column} is not a number" for column, raw in zip(invalid["column"], invalid["raw"])),
+    )
+
+    unknown = labels[labels["label_obj"].isna()]
+    add_errors(unknown["row"], (f"Unknown label '{name}'" for name in unknown["label"]))
+    known = labels[labels["label_obj"].notna()]
+    on_scale = pd.Series(
+        [
+            not label.scale_parameters or score in label.scale_parameters
+            for score, label in zip(known["score"], known["label_obj"])
+        ],
+        index=known.index,
+        dtype=bool,
+    )
+    out_of_scale = known[~on_scale]
+    add_errors(
+        out_of_scale["row"],
+        (
+            f"Score '{score}' is not on the scale of '{name}'"
+            for score, name in zip(out_of_scale["score"], out_of_scale["label"])
+        ),
+    )
+
+
+def find_existing(frame: pd.DataFrame, match_on, lookups) -> dict:
+    """Primary key of the stored EPD each row updates, None for new ones."""
+    superuser = get_superuser()
+    candidates = EPD.objects.filter(
+        public=True,
+        created_by=superuser,
+        name__in=set(frame["name"]),
+    )
+    fields = ["country_id" if f == "country" else f for f in match_on]
+    stored = {tuple(values): pk for pk, *values in candidates.values_list("pk", *fields)}
+
+    def key(record):
+        return tuple(
+            record["country_obj"].pk if f == "country" else record[f] for f in match_on
+        )
+
+    return {row: stored.get(key(record)) for row, record in zip(frame.index, frame.to_dict("records"))}
+
+
+@transaction.atomic
+def write(spec: CsvImport, frame, impacts, labels, existing: dict, lookups: Lookups) -> None:
+    superuser = get_superuser()
+    categories = get_categories(frame["category_id"].dropna(), spec.category_parent, lookups)
+
+    epds, rows_by_pk = {}, {}
+    for row, record in zip(frame.index, frame.to_dict("records")):
+        category_id = record["category_id"]
+        epd = EPD(
+            country=record["country_obj"],
+            source=record["source"],
+            name=record["name"],
+            names=[{"lang": "en", "value": record["name"]}],
+            public=True,
+            conversions=record["conversions"],
+            category=categories.get(category_id) if isinstance(category_id, str) else None,
+            declared_unit=record["declared_unit"],
+            type=record["type"],
+            declared_amount=record["declared_amount"],
+            comment=record["comment"],
+            created_by=superuser,
+            UUID=record["UUID"],
+        )
+        if existing.get(row):
+            epd.pk = existing[row]
+            # Like repeated updates, the last row matching an EPD wins
+            epds.pop(rows_by_pk.get(epd.pk), None)
+            rows_by_pk[epd.pk] = row
+        # bulk_create skips EPD.save()
+        epd.set_derived_fields()
+        epds[row] = epd
+
+    EPD.objects.bulk_create(
+        epds.values(),
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=spec.update_fields + DERIVED_FIELDS,
+    )
+
+    epd_impacts = [
+        EPDImpact(epd=epds[row], impact=get_impact(lookups, category, stage), value=value)
+        for row, category, stage, value in zip(
+            impacts["row"], impacts["impact_category"], impacts["life_cycle_stage"], impacts["value"]
+        )
+        if row in epds
+    ]
+    for chunk in chunked(epd_impacts, 1000):
+        EPDImpact.objects.bulk_create(
+            chunk,
+            update_conflicts=True,
+            unique_fields=["epd", "impact"],
+            update_fields=["value"],
+        )
+
+    EPDLabel.objects.bulk_create(
+        [
+            EPDLabel(epd=epds[row], label=label, score=score)
+            for row, label, score in zip(labels["row"], labels["label_obj"], labels["score"])
+            if row in epds
+        ],
+        update_conflicts=True,
+        unique_fields=["epd", "label"],
+        update_fields=["score"],
+    )
+
+    # Signals are skipped by bulk writes
+    refresh_impact_summaries([epd.pk for epd in epds.values()])
+    updated_ids = [pk for pk in existing.values() if pk is not None]
+    if updated_ids:
+        from pages.views.building.impact_results import schedule_epd_refresh
+
+        schedule_epd_refresh(updated_ids)
+
+
+def get_categories(category_ids: pd.Series, parent_id, lookups: Lookups) -> dict:
+    """Categories by id, creating the ones the file introduces."""
+    parent = lookups.categories.get(parent_id) if parent_id else None
+    for category_id in set(category_ids) - set(lookups.categories):
+        # Created one by one, so the category caches are invalidated
+        lookups.categories[category_id] = MaterialCategory.objects.create(
+            category_id=category_id,
+            level=category_id.count(".") + 1,
+            parent=parent,
+        )
+    return lookups.categories
+
+
+def get_impact(lookups: Lookups, impact_category: str, life_cycle_stage: str) -> Impact:
+    key = (impact_category, life_cycle_stage)
+    if key not in lookups.impacts:
+        lookups.impacts[key], _ = Impact.objects.get_or_create(
+            impact_category=impact_category, life_cycle_stage=life_cycle_stage
+        )
+    return lookups.impacts[key]
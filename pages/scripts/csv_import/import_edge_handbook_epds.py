@@ -1,12 +1,11 @@
 import pandas as pd
 
-from pages.models.epd import EPD, EPDType
-from pages.scripts.csv_import.utils import (
-    add_impacts,
-    get_category,
-    get_conversions,
-    get_country,
-    get_superuser,
+from pages.models.epd import EPDType
+from pages.scripts.csv_import.engine import (
+    CsvImport,
+    ImportReport,
+    category_id_or_parent,
+    import_csv,
 )
 
 
@@ -22,38 +21,28 @@ impact_columns = [
 ]
 
 
-def import_EDGE_EPDs():
-    file_path = "pages/data/EDGE_HANDBOOK_EPDs.csv"
-    df = pd.read_csv(file_path, sep=";")
-
-    superuser = get_superuser()
-    # Iterate through each row and access the data
-
-    for index, row in df.iterrows():
-        print(f"Row {index} is being processed.")
-        try:
-            conversions = get_conversions(row)
-
-            new_epd = EPD(
-                country=get_country(row["country"]),
-                source=row["source"],
-                name=row["name"],
-                names=[
-                    {"lang": "en", "value": row["name"]},
-                ],
-                public=True,
-                conversions=conversions,
-                category=get_category(row),
-                declared_unit=row["declared_unit"],
-                type=EPDType.OFFICIAL,
-                declared_amount=1,
-                comment=row["description"],
-                created_by_id=superuser.id,
-            )
-            new_epd.save()
-            add_impacts(row, new_epd, impact_columns)
-            print(f"Row {index} processed.")
-        except Exception as e:
-            print(f"Error in row {index}:")
-            print(e)
-            raise Exception(f"Error in row {index}: {e}\n  Row: {row}")
+def prepare(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "country": df["country"],
+            "category_id": category_id_or_parent(df),
+            "name": df["name"],
+            "declared_unit": df["declared_unit"],
+            "declared_amount": 1,
+            "source": df["source"],
+            "type": EPDType.OFFICIAL,
+            "comment": df["description"],
+            "UUID": None,
+        }
+    )
+
+
+EDGE_EPDS = CsvImport(
+    file_path="pages/data/EDGE_HANDBOOK_EPDs.csv",
+    impact_columns=impact_columns,
+    prepare=prepare,
+)
+
+
+def import_EDGE_EPDs(dry_run=False) -> ImportReport:
+    return import_csv(EDGE_EPDS, dry_run=dry_run)
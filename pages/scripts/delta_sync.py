@@ -0,0 +1,104 @@
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+from django.db.models import QuerySet
+
+from pages.models.epd import EPD
+from pages.scripts.utils import chunked
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeltaReport:
+    added: list[str] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)
+    withdrawn: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    # Withdrawn EPDs are only known once the whole listing was seen
+    complete: bool = False
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def parse_version(version) -> tuple:
+    """ILCD data set versions look like "01.02.003"."""
+    try:
+        return tuple(int(part) for part in str(version).split("."))
+    except ValueError:
+        return ()
+
+
+def parse_timestamp(value) -> datetime | None:
+    """soda4LCA timestamps come as epoch milliseconds or ISO strings."""
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc)
+    except (TypeError, ValueError):
+        pass
+    try:
+        timestamp = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=timezone.utc)
+
+
+def is_changed(info: dict, local_version, local_updated_at) -> bool:
+    """Whether the remote listing entry is newer than the stored EPD."""
+    remote, local = parse_version(info.get("version")), parse_version(local_version)
+    if remote and local and remote != local:
+        return remote > local
+    last_update = parse_timestamp(info.get("lastUpdate"))
+    return bool(last_update and local_updated_at and last_update > local_updated_at)
+
+
+class DeltaFilter:
+    """Narrows a catalogue listing down to the EPDs that are new or changed.
+
+    Listing entries are compared in chunks against the `version` (and
+    `updated_at`, if the listing has a `lastUpdate`) of the stored EPDs.
+    Changed entries are flagged with `"changed": True` in their info. Once
+    the listing is exhausted, stored EPDs of `local_epds` that were not in it
+    are reported as withdrawn; they are not deleted, products may use them.
+    """
+
+    def __init__(self, local_epds: QuerySet, updates=True, chunk_size=1000):
+        self.local_epds = local_epds
+        self.updates = updates
+        self.chunk_size = chunk_size
+        self.report = DeltaReport()
+
+    def __call__(self, entries):
+        seen = set()
+        for chunk in chunked(entries, self.chunk_size):
+            local = {
+                uuid: (version, updated_at)
+                for uuid, version, updated_at in EPD.objects.filter(
+                    UUID__in=[key for key, _ in chunk]
+                ).values_list("UUID", "version", "updated_at")
+            }
+            for key, info in chunk:
+                seen.add(key)
+                if key not in local:
+                    self.report.added.append(key)
+                    yield key, info
+                elif self.updates and is_changed(info, *local[key]):
+                    self.report.updated.append(key)
+                    yield key, {**info, "changed": True}
+                else:
+                    self.report.unchanged += 1
+
+        self.report.withdrawn = sorted(
+            set(self.local_epds.values_list("UUID", flat=True)) - seen
+        )
+        self.report.complete = True
+        logger.info(
+            "Delta: %s added, %s updated, %s withdrawn, %s unchanged",
+            len(self.report.added),
+            len(self.report.updated),
+            len(self.report.withdrawn),
+            self.report.unchanged,
+        )
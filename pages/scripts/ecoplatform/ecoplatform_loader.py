@@ -6,6 +6,9 @@ import environ
 import requests
 import lcax
 
+from pages.scripts.http_fetcher import EPDFetcher
+from pages.scripts.oekobaudat.oekobaudat_loader import parse_epd
+
 logger = logging.getLogger(__name__)
 
 env = environ.Env()
@@ -31,7 +34,7 @@ def get_epds(limit) -> dict:
         "Authorization": f"Bearer {ECO_PLATFORM_TOKEN}"
     }
 
-    response = requests.get(f"{ECO_PLATFORM_URL}&pageSize={limit}", headers=headers)
+    response = requests.get(f"{ECO_PLATFORM_URL}&pageSize={limit}", headers=headers, timeout=300)
     response.raise_for_status()
     data = response.json()
 
@@ -44,19 +47,19 @@ def get_epds(limit) -> dict:
     return data
 
 
-def get_all_uuids_ecoplatform() -> dict[str, dict]:
-    """Get UUIDs and info from Eco-platform."""
-    # get total number of EPDs
-    data = get_epds(1)
-    num_epds = data.get("totalCount")
-
-    # Load all epds
-    data = get_epds(num_epds)
-    
-    # Get UUID
+LISTING_PAGE_SIZE = 500
+
+
+def iter_uuids_ecoplatform(fetcher: EPDFetcher | None = None, page_size=LISTING_PAGE_SIZE):
+    """Yields `(uuid, info)` of the ECO-Platform EPDs of the target countries,
+    page by page as the listing is retrieved."""
+    if fetcher is None:
+        with get_fetcher(max_workers=1) as fetcher:
+            yield from iter_uuids_ecoplatform(fetcher, page_size)
+        return
+
     required = ("uuid", "uri", "nodeid", "geo", "name")
-    epd_list = {}
-    for i in data["data"]:
+    for i in fetcher.iter_pages(ECO_PLATFORM_URL, page_size):
         try:
             uuid, uri, nodeid, geo, name = (i[k] for k in required)
         except KeyError as exc:
@@ -73,31 +76,54 @@ def get_all_uuids_ecoplatform() -> dict[str, dict]:
                 logger.error("The EPD with UUID: '%s' did not contain a name.\nSkipping", uuid)
                 continue
         
-            epd_list[uuid] = {
+            yield uuid, {
                 "geo": geo,
                 "uuid": uuid,
                 "uri": uri,
                 "name": name,
-                "nodeid": nodeid
+                "nodeid": nodeid,
+                "version": i.get("version"),
+                "lastUpdate": i.get("lastUpdate"),
             }
 
-    return epd_list
 
+def get_all_uuids_ecoplatform() -> dict[str, dict]:
+    """Get UUIDs and info from Eco-platform."""
+    return dict(iter_uuids_ecoplatform())
 
-def get_full_epd(uri: str) -> dict:
-    """Get the full dataset for a single EPD"""
 
-        
-    headers = {
-        "Authorization": f"Bearer {ECO_PLATFORM_TOKEN}"
-    }
+def get_fetcher(**kwargs) -> EPDFetcher:
+    """Fetcher that authenticates against ECO-Platform"""
+    return EPDFetcher(headers={"Authorization": f"Bearer {ECO_PLATFORM_TOKEN}"}, **kwargs)
+
+
+def get_full_epd(uri: str, fetcher: EPDFetcher | None = None) -> dict:
+    """Get the full dataset for a single EPD
+
+    Pass a shared `fetcher` from `get_fetcher` when loading many EPDs.
+    """
 
     assert "?" in uri  # check that parameter can be given    
-        
-    
-    response = requests.get(f"{uri}&lang=en&format=json&view=extended", headers=headers)
-    response.raise_for_status()
-    data = response.json()
+
+    url = f"{uri}&lang=en&format=json&view=extended"
+    if fetcher is None:
+        with get_fetcher(max_workers=1) as fetcher:
+            data = fetcher.get_json(url)
+    else:
+        data = fetcher.get_json(url)
     data["source"] = uri
 
     return data
+
+
+def parse_ecoplatform_epd(data: dict) -> dict:
+    """Parse an ECO-Platform EPD, noting whether it has any classification.
+
+    The classification fallback needs this, and only the parsed record leaves
+    the parsing process.
+    """
+    epd = parse_epd(data)
+    epd["has_classification_info"] = bool(
+        data["processInformation"]["dataSetInformation"].get("classificationInformation")
+    )
+    return epd
@@ -0,0 +1,253 @@
+import logging
+import time
+from dataclasses import dataclass, field
+
+from cities_light.models import Country
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from pages.models.epd import (
+    EPD,
+    EPDImpact,
+    EPDType,
+    Impact,
+    MaterialCategory,
+    refresh_impact_summaries,
+)
+from pages.scripts.utils import chunked
+from pages.views.reference_registry import reference_registry
+
+logger = logging.getLogger(__name__)
+
+# EPD fields written by the loaders, everything else keeps its value on update
+EPD_UPDATE_FIELDS = [
+    "name",
+    "names",
+    "declared_unit",
+    "conversions",
+    "category",
+    "source",
+    "type",
+    "country",
+    "declared_amount",
+    "version",
+    "comment",
+    "created_by",
+    "public",
+    "draft",
+    "search_text",
+    "has_volume_density",
+    "volume_density",
+    "updated_at",
+]
+
+
+class ReferenceData:
+    """In-memory lookups for the reference rows every EPD record points to,
+    taken from the reference registry once per run."""
+
+    def __init__(self):
+        registry = reference_registry()
+        categories = registry.categories.values()
+        self.categories = {c.category_id: c for c in categories}
+        self.categories_by_name = {c.name_en: c for c in categories}
+        countries = set(registry.countries.values())
+        self.countries_by_name = {c.name: c for c in countries}
+        self.countries_by_code2 = {c.code2: c for c in countries}
+        self.impacts = dict(registry.impacts)
+        self.superuser = get_user_model().objects.filter(is_superuser=True).first()
+
+    def category(self, category_id=None, name_en=None) -> MaterialCategory | None:
+        if category_id in self.categories:
+            return self.categories[category_id]
+        return self.categories_by_name.get(name_en)
+
+    def impact(self, impact_category: str, life_cycle_stage: str) -> Impact:
+        key = (impact_category, life_cycle_stage)
+        if key not in self.impacts:
+            self.impacts[key], _ = Impact.objects.get_or_create(
+                impact_category=impact_category, life_cycle_stage=life_cycle_stage
+            )
+        return self.impacts[key]
+
+
+@dataclass
+class IngestionStats:
+    stored: int = 0
+    batches: int = 0
+    failed: list[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def rate(self) -> float:
+        """Stored EPDs per second."""
+        elapsed = time.monotonic() - self.started_at
+        return self.stored / elapsed if elapsed else 0.0
+
+
+class EPDIngestor:
+    """Buffers parsed EPD records and upserts them in batches.
+
+    A batch is written in one transaction with a bulk upsert for EPDs and one
+    for their impacts. If it fails, its records are retried one by one so a
+    single broken EPD does not drop the whole batch.
+
+    Usage:
+        with EPDIngestor(refs) as ingestor:
+            for epd_data in records:
+                ingestor.add(epd_data, country=..., category=...)
+    """
+
+    def __init__(
+        self,
+        refs: ReferenceData | None = None,
+        batch_size=200,
+        epd_type=EPDType.OFFICIAL,
+        on_stored=None,
+        on_failed=None,
+    ):
+        self.refs = refs or ReferenceData()
+        self.batch_size = batch_size
+        self.epd_type = epd_type
+        # Optional callbacks, called with the UUIDs of a stored batch and of a failed EPD
+        self.on_stored = on_stored
+        self.on_failed = on_failed
+        self.stats = IngestionStats()
+        self._batch = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def add(self, epd_data: dict, country: Country | None, category: MaterialCategory | None) -> None:
+        self._batch.append((epd_data, country, category))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        self.stats.batches += 1
+        try:
+            uuids = self._write(batch)
+        except Exception:
+            logger.exception(
+                "Batch %s of %s EPDs failed, retrying them one by one",
+                self.stats.batches,
+                len(batch),
+            )
+            for record in batch:
+                self._write_one(record)
+        else:
+            if self.on_stored:
+                self.on_stored(uuids)
+        logger.info(
+            "Stored %s EPDs in %s batches, %.1f EPDs/sec, %s failed",
+            self.stats.stored,
+            self.stats.batches,
+            self.stats.rate,
+            len(self.stats.failed),
+        )
+
+    def _write_one(self, record) -> None:
+        uuid = record[0].get("uuid")
+        try:
+            self._write([record])
+        except Exception as e:
+            logger.exception("EPD %s could not be stored", uuid)
+            self.stats.failed.append(uuid)
+            if self.on_failed:
+                self.on_failed(uuid, e)
+        else:
+            if self.on_stored:
+                self.on_stored([uuid])
+
+    @transaction.atomic
+    def _write(self, batch) -> list[str]:
+        # The same UUID twice in one batch would update one row twice
+        records = {epd_data["uuid"]: (epd_data, country, category) for epd_data, country, category in batch}
+        existing = dict(
+            EPD.objects.filter(UUID__in=records.keys()).values_list("UUID", "pk")
+        )
+
+        epds = []
+        for uuid, (epd_data, country, category) in records.items():
+            epd = EPD(
+                UUID=uuid,
+                name=_truncated(epd_data["name"], "name"),
+                names=epd_data.get("names"),
+                declared_unit=epd_data["declared_unit"],
+                conversions=epd_data["conversions"],
+                category=category,
+                source=epd_data["source"],
+                type=self.epd_type,
+                country=country,
+                declared_amount=epd_data["declared_amount"],
+                version=_truncated(epd_data.get("version"), "version"),
+                comment=_truncated(epd_data.get("comment"), "comment"),
+                # from base
+                created_by=self.refs.superuser,
+                public=True,
+                draft=False,
+            )
+            if uuid in existing:
+                epd.pk = existing[uuid]
+            # bulk_create skips EPD.save()
+            epd.set_derived_fields()
+            epds.append(epd)
+
+        EPD.objects.bulk_create(
+            epds,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=EPD_UPDATE_FIELDS,
+        )
+
+        epd_impacts = [
+            EPDImpact(epd=epd, impact=self.refs.impact(*key.split("_")), value=value)
+            for epd in epds
+            for key, value in records[epd.UUID][0].items()
+            if key.startswith(("gwp", "penrt")) and value is not None
+        ]
+        # Impacts a new version of an EPD no longer declares
+        updated_ids = [epd.pk for epd in epds if epd.UUID in existing]
+        declared = {(i.epd.pk, i.impact.pk) for i in epd_impacts}
+        stale_ids = [
+            pk
+            for pk, epd_id, impact_id in EPDImpact.objects.filter(
+                epd_id__in=updated_ids
+            ).values_list("pk", "epd_id", "impact_id")
+            if (epd_id, impact_id) not in declared
+        ]
+        if stale_ids:
+            EPDImpact.objects.filter(pk__in=stale_ids).delete()
+
+        for chunk in chunked(epd_impacts, 1000):
+            EPDImpact.objects.bulk_create(
+                chunk,
+                update_conflicts=True,
+                unique_fields=["epd", "impact"],
+                update_fields=["value"],
+            )
+
+        # Signals are skipped by bulk writes, update what depends on impacts here
+        epd_ids = [epd.pk for epd in epds]
+        refresh_impact_summaries(epd_ids)
+        if updated_ids:
+            from pages.views.building.impact_results import schedule_epd_refresh
+
+            schedule_epd_refresh(updated_ids)
+
+        self.stats.stored += len(epds)
+        return list(records)
+
+
+def _truncated(value: str | None, field_name: str) -> str | None:
+    # Sources have longer texts than the EPD columns, which would fail the record
+    max_length = EPD._meta.get_field(field_name).max_length
+    if value is not None and len(value) > max_length:
+        return value[:max_length]
+    return value
@@ -0,0 +1,64 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from pages.scripts.oekobaudat.oekobaudat_loader import parse_epd
+from pages.scripts.utils import bounded_map
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_item(parse, item):
+    key, data = item
+    return parse(data)
+
+
+class ParsePool:
+    """Parses raw ILCD datasets into EPD records on a pool of worker processes.
+
+    The ILCD to LCAx conversion is CPU bound, so it runs in `workers`
+    processes (all cores by default, inline with `workers=0`). `parse` must be
+    a module level function of a module that imports without Django set up,
+    so the workers can load it.
+
+    Usage:
+        with ParsePool(workers=4) as pool:
+            for uuid, epd, error in pool.map((uuid, data) for ...):
+                ...
+    """
+
+    def __init__(self, parse=parse_epd, workers: int | None = None):
+        self.parse = parse
+        self.workers = os.cpu_count() if workers is None else workers
+        self._executor = None
+        if self.workers:
+            # Forking next to the fetcher threads is unsafe, start fresh interpreters
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def map(self, items):
+        """Parses `(key, data)` items and yields `(key, record, error)` as they complete."""
+        if self._executor is None:
+            for key, data in items:
+                try:
+                    yield key, self.parse(data), None
+                except Exception as e:
+                    yield key, None, e
+            return
+
+        fn = partial(_parse_item, self.parse)
+        for (key, _), record, error in bounded_map(self._executor, fn, items, window=self.workers * 2):
+            yield key, record, error
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pages.scripts.utils import bounded_map
+
+logger = logging.getLogger(__name__)
+
+# Responses worth another attempt, anything else is raised right away
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 60  # seconds
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_for = (1 - self._tokens) / self.rate
+            time.sleep(wait_for)
+
+
+class EPDFetcher:
+    """Fetches JSON documents from the EPD catalogues over a pooled session.
+
+    Requests run on a pool of `max_workers` threads. Each host gets its own
+    token bucket of `rate` requests per second, failed requests are retried
+    with exponential backoff.
+
+    Usage:
+        with EPDFetcher(max_workers=8, rate=10) as fetcher:
+            fetch = partial(get_full_epd, fetcher=fetcher)
+            for uuid, data, error in fetcher.map(fetch, uuids):
+            ...
+    """
+
+    def __init__(
+        self,
+        max_workers=8,
+        rate=10.0,
+        timeout=30,
+        retries=3,
+        backoff=0.5,
+        headers: dict | None = None,
+    ):
+        self.max_workers = max_workers
+        self.rate = rate
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+
+    def get_json(self, url: str, **kwargs) -> dict:
+        response = self.get(url, **kwargs)
+        return response.json()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        bucket = self._bucket(urlsplit(url).netloc)
+        for attempt in range(self.retries + 1):
+            bucket.acquire()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2**attempt
+                logger.warning("Request to %s failed, retrying in %.1fs", url, delay)
+            else:
+                if response.status_code not in RETRY_STATUS or attempt == self.retries:
+                    response.raise_for_status()
+                    return response
+                delay = self._retry_after(response) or self.backoff * 2**attempt
+                logger.warning(
+                    "Request to %s returned %s, retrying in %.1fs",
+                    url,
+                    response.status_code,
+                    delay,
+                )
+            time.sleep(delay)
+
+    def map(self, fn, items):
+        """Calls `fn(item)` concurrently and yields `(item, result, error)` as they complete.
+
+        Only a few calls per worker are in flight at any time, so a long list of
+        items does not hold all responses in memory.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            yield from bounded_map(executor, fn, items, window=self.max_workers * 2)
+
+    def iter_pages(self, url: str, page_size=500, **kwargs):
+        """Yields the records of a paged soda4LCA listing one page at a time.
+
+        `url` must already contain a query string, `startIndex` and `pageSize`
+        are appended to it.
+        """
+        start_index = 0
+        while True:
+            page = self.get_json(f"{url}&startIndex={start_index}&pageSize={page_size}", **kwargs)
+            records = page.get("data") or []
+            logger.info(
+                "Retrieved listing page at %s with %s of %s records",
+                start_index,
+                len(records),
+                page.get("totalCount"),
+            )
+            yield from records
+            start_index += len(records)
+            if not records or start_index >= (page.get("totalCount") or 0):
+                return
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._buckets_lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate)
+            return self._buckets[host]
+
+    @staticmethod
+    def _retry_after(response) -> float | None:
+        try:
+            return min(float(response.headers.get("Retry-After")), MAX_RETRY_AFTER)
+        except (TypeError, ValueError):
+            return None
@@ -1,20 +1,25 @@
 import logging
 import json
-import re
 
 import lcax
 import requests
 
+from pages.scripts.http_fetcher import EPDFetcher
+
 logger = logging.getLogger(__name__)
 
 OKOBAU_URL = "https://oekobaudat.de/OEKOBAU.DAT/resource/datastocks/c391de0f-2cfd-47ea-8883-c661d294e2ba"
 
 
+LISTING_PAGE_SIZE = 500
+
+
 def get_epds(limit) -> dict:
     """Get several EPDs from Ökobau"""
 
     response = requests.get(
-        f"{OKOBAU_URL}/processes?format=json&view=extended&pageSize={limit}"
+        f"{OKOBAU_URL}/processes?format=json&view=extended&pageSize={limit}",
+        timeout=300,
     )
     response.raise_for_status()
     data = response.json()
@@ -28,35 +33,39 @@ def get_epds(limit) -> dict:
     return data
 
 
-def get_all_epds() -> dict:
-    """Get UUIDs from all Oekobaudat EPDs."""
-    # get total number of EPDs
-    data = get_epds(1)
-    num_epds = data.get("totalCount")
+def iter_epd_records(fetcher: EPDFetcher | None = None, page_size=LISTING_PAGE_SIZE):
+    """Yields the listing records of all Oekobaudat EPDs, page by page."""
+    url = f"{OKOBAU_URL}/processes?format=json&view=extended"
+    if fetcher is None:
+        with EPDFetcher(max_workers=1) as fetcher:
+            yield from fetcher.iter_pages(url, page_size)
+    else:
+        yield from fetcher.iter_pages(url, page_size)
 
-    # Load all epds
-    data = get_epds(num_epds)
 
-    # Get UUID
-    uuids = []
-    for epd in data.get("data"):
-        uuids.append(epd.get("uuid"))
+def get_all_epds(fetcher: EPDFetcher | None = None, page_size=LISTING_PAGE_SIZE):
+    """Yields the UUIDs of all Oekobaudat EPDs as the listing pages arrive."""
+    for epd in iter_epd_records(fetcher, page_size):
+        yield epd.get("uuid")
 
-    return uuids
 
-
-def get_full_epd(uid: str) -> dict:
+def get_full_epd(uid: str, fetcher: EPDFetcher | None = None) -> dict:
     """Get the full dataset for a single EPD
 
+    Pass a shared `fetcher` when loading many EPDs, so connections are pooled and
+    requests are rate limited.
+
     Notes:
      - If no version number is specified, the most recent dataset (with the highest version number) is always
     returned. (ECO-Platform documentation on soda4LCA)
     """
 
     base_url = f"{OKOBAU_URL}/processes/{uid}"
-    response = requests.get(f"{base_url}?format=json&view=extended")
-    response.raise_for_status()
-    data = response.json()
+    if fetcher is None:
+        with EPDFetcher(max_workers=1) as fetcher:
+            data = fetcher.get_json(f"{base_url}?format=json&view=extended")
+    else:
+        data = fetcher.get_json(f"{base_url}?format=json&view=extended")
     data["source"] = base_url
 
     return data
@@ -110,11 +119,25 @@ def parse_epd(epd: dict):
 
 
 
+# "Not declared" and "module not assessed" markers in ILCD values
+UNDECLARED_VALUES = {"ND", "MNA"}
+
+
+def sanitize_ilcd(node):
+    """Copy of an ILCD document with undeclared values set to zero."""
+    if isinstance(node, dict):
+        return {
+            k: "0" if k == "value" and isinstance(v, str) and v in UNDECLARED_VALUES else sanitize_ilcd(v)
+            for k, v in node.items()
+        }
+    if isinstance(node, list):
+        return [sanitize_ilcd(v) for v in node]
+    return node
+
+
 def parse_Lcax_format(epd: dict) -> dict:
-    epd_string = json.dumps(epd)
-    
     # if value is ND, set to zero
-    epd_string = re.sub('"value": "ND"|"value": "MNA"', '"value": "0"', epd_string)
+    epd_string = json.dumps(sanitize_ilcd(epd))
     epd = lcax.convert_ilcd(epd_string, as_type=lcax.EPD)
     conversions = [conv.meta_data for conv in epd.conversions]
     info = {
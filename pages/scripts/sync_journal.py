@@ -0,0 +1,122 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class SyncState:
+    FETCHED = "fetched"
+    PARSED = "parsed"
+    STORED = "stored"
+    FAILED = "failed"
+
+
+class SyncJournal:
+    """Per-EPD progress of a catalogue sync, kept in a SQLite file.
+
+    Every EPD seen in a listing gets an entry with its listing info (URI,
+    country, ...) and the last state it reached, so an interrupted sync can
+    resume and failures can be replayed.
+    """
+
+    def __init__(self, path: Path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: every statement commits right away, a crash loses nothing
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                state TEXT,
+                info TEXT,
+                error TEXT,
+                updated_at REAL
+            )
+            """
+        )
+
+    def add(self, key: str, info: dict | None = None) -> None:
+        """Registers an EPD from the listing, keeping the state of known ones."""
+        self.connection.execute(
+            """
+            INSERT INTO entries (key, info, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET info = excluded.info
+            """,
+            (key, json.dumps(info or {}), time.time()),
+        )
+
+    def mark(self, keys, state: str, error: str | None = None) -> None:
+        if isinstance(keys, str):
+            keys = [keys]
+        self.connection.executemany(
+            """
+            INSERT INTO entries (key, state, error, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                state = excluded.state, error = excluded.error, updated_at = excluded.updated_at
+            """,
+            [(key, state, error, time.time()) for key in keys],
+        )
+
+    def state(self, key: str) -> str | None:
+        row = self.connection.execute(
+            "SELECT state FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def entries(self, states=None):
+        """Yields `(key, info)` of all entries, or of those in one of `states`."""
+        query, params = "SELECT key, info FROM entries", ()
+        if states:
+            query += f" WHERE state IN ({','.join('?' * len(states))})"
+            params = tuple(states)
+        for key, info in self.connection.execute(query + " ORDER BY key", params).fetchall():
+            yield key, json.loads(info) if info else {}
+
+    def counts(self) -> dict:
+        return dict(
+            self.connection.execute("SELECT state, COUNT(*) FROM entries GROUP BY state")
+        )
+
+    def errors(self) -> dict:
+        return dict(
+            self.connection.execute(
+                "SELECT key, error FROM entries WHERE state = ?", (SyncState.FAILED,)
+            )
+        )
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class ResponseCache:
+    """Raw ILCD JSON responses, gzip compressed on disk."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key: str) -> Path:
+        # Keys can be URIs, hash them into a file name
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return self.directory / name[:2] / f"{name}.json.gz"
+
+    def get(self, key: str) -> dict | None:
+        try:
+            with gzip.open(self.path(key), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: dict) -> None:
+        path = self.path(key)
+        path.parent.mkdir(exist_ok=True)
+        # Written next to the target and renamed, so a crash never leaves half a file
+        tmp_path = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
@@ -1,6 +1,5 @@
 import itertools
-
-from pages.models import EPD
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
 
 def chunked(iterable, size=1000):
     it = iter(iterable)
@@ -11,10 +10,41 @@ def chunked(iterable, size=1000):
         yield chunk
 
 
+def bounded_map(executor: Executor, fn, items, window: int):
+    """
+    Calls `fn(item)` on the executor and yields `(item, result, error)` as the
+    calls complete. At most `window` calls are in flight, so long iterables of
+    items are consumed lazily.
+    """
+    items = iter(items)
+    futures = {}
+
+    def submit_next():
+        for item in items:
+            futures[executor.submit(fn, item)] = item
+            return True
+        return False
+
+    for _ in range(window):
+        if not submit_next():
+            break
+
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = futures.pop(future)
+            submit_next()
+            error = future.exception()
+            yield item, None if error else future.result(), error
+
+
 def find_missing_uuids(ids_list, chunk_size=1000):
     """
     Generator yielding uuids in `all_ids` that are not in EPD.UUID.
     """
+    # Imported here, the parsing workers use this module without Django set up
+    from pages.models import EPD
+
     for chunk in chunked(ids_list, chunk_size):
         # 1) Build a set of this chunk
         chunk_set = set(chunk)
@@ -0,0 +1,11 @@
+import pytest
+
+from pages.views.reference_registry import clear_reference_registry
+
+
+@pytest.fixture(autouse=True)
+def fresh_reference_registry():
+    # Rows of rolled back tests must not survive in the process-wide registry
+    clear_reference_registry()
+    yield
+    clear_reference_registry()
@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+import pytest
+
+from pages.models.assembly import Assembly, AssemblyDimension
+from pages.models.building import Building, BuildingAssembly, ClimateZone, OperationalProduct
+from pages.models.epd import Unit
+from pages.models.scenario import Scenario, ScenarioAssembly, ScenarioOperationalProduct
+from pages.scripts.assembly_cloning import clone_assemblies
+from pages.views.building.scenarios import reset_scenario, set_component
+from pages.tests.test_impact_calculation import (
+    create_assembly,
+    create_epd,
+    create_epd_impact,
+    create_impact,
+    create_product,
+)
+
+
+@pytest.fixture
+def create_building(create_epd, create_epd_impact, create_assembly, create_product):
+    def _create_building(assemblies):
+        building = Building.objects.create(
+            name="Simulated Building",
+            climate_zone=ClimateZone.COLD,
+            total_floor_area=Decimal("10"),
+        )
+        epd = create_epd("Screed", Unit.KG, [{"unit": "kg/m^3", "value": "2000"}])
+        create_epd_impact(epd, Decimal("0.5"))
+        for i in range(assemblies):
+            assembly = create_assembly(AssemblyDimension.AREA)
+            create_product(assembly, epd, Decimal("5"), Unit.CM)
+            create_product(assembly, epd, Decimal("2"), Unit.CM)
+            BuildingAssembly.objects.create(
+                building=building, assembly=assembly, quantity=Decimal(i + 1), reporting_life_cycle=50
+            )
+        OperationalProduct.objects.create(
+            building=building, epd=epd, quantity=Decimal("3"), input_unit=Unit.KG, description="Fuel"
+        )
+        return building
+
+    return _create_building
+
+
+@pytest.mark.django_db
+def test_clone_assemblies_copies_products(create_assembly, create_epd, create_product):
+    """
+    ARRANGE: Two assemblies with products
+    ACT: Clone them with a name per original and a shared override
+    ASSERT: The copies carry the fields and products of their original
+    """
+    epd = create_epd("Screed", Unit.KG, [{"unit": "kg/m^3", "value": "2000"}])
+    first = create_assembly(AssemblyDimension.AREA)
+    second = create_assembly(AssemblyDimension.LENGTH)
+    create_product(first, epd, Decimal("5"), Unit.CM)
+    create_product(second, epd, Decimal("1"), Unit.M2)
+
+    clones = clone_assemblies([first, second], lambda a: {"name": f"{a.pk} copy", "is_template": True})
+
+    assert set(clones) == {first.pk, second.pk}
+    for original, clone in ((first, clones[first.pk]), (second, clones[second.pk])):
+        clone = Assembly.objects.get(pk=clone.pk)
+        assert clone.pk != original.pk
+        assert clone.name == f"{original.pk} copy"
+        assert clone.is_template
+        assert clone.dimension == original.dimension
+        assert list(clone.structuralproduct_set.values_list("epd_id", "quantity", "input_unit")) == list(
+            original.structuralproduct_set.values_list("epd_id", "quantity", "input_unit")
+        )
+
+
+@pytest.mark.django_db
+def test_template_copy_keeps_source(create_assembly, create_epd, create_product):
+    """
+    ARRANGE: A template with one product
+    ACT: Instantiate it
+    ASSERT: The instance is no template, points at its source and has its products
+    """
+    epd = create_epd("Screed", Unit.KG, [{"unit": "kg/m^3", "value": "2000"}])
+    template = create_assembly(AssemblyDimension.AREA).create_template_copy(template_name="Slab")
+    create_product(template, epd, Decimal("5"), Unit.CM)
+
+    instance = template.copy_as_template_instance()
+
+    assert instance.name == "Slab (Copy)"
+    assert not instance.is_template
+    assert instance.from_template == template
+    assert instance.structuralproduct_set.count() == 1
+
+
+@pytest.mark.django_db
+def test_scenario_reset_queries_independent_of_size(create_impact, create_building, django_assert_max_num_queries):
+    """
+    ARRANGE: Buildings with 2 and 20 assemblies, each with a scenario holding a copy of one and a changed quantity
+    ACT: Reset both scenarios
+    ASSERT: Both need the same number of queries, the overrides and the copy are gone and the buildings are untouched
+    """
+    scenarios = []
+    for building in (create_building(2), create_building(20)):
+        scenario = Scenario.objects.create(building=building, name="Simulation")
+        first, second = BuildingAssembly.objects.filter(building=building).order_by("quantity")[:2]
+        set_component(scenario, clone_assemblies([first.assembly])[first.assembly_id], first.quantity, first)
+        set_component(scenario, second.assembly, Decimal("7"), second)
+        ScenarioOperationalProduct.objects.create(
+            scenario=scenario, operational_product=OperationalProduct.objects.get(building=building), removed=True
+        )
+        scenarios.append(scenario)
+    assemblies = Assembly.objects.count()
+
+    small, large = scenarios
+    with django_assert_max_num_queries(40) as small_queries:
+        reset_scenario(small)
+    with django_assert_max_num_queries(len(small_queries)) as large_queries:
+        reset_scenario(large)
+    assert len(large_queries) == len(small_queries)
+
+    assert not ScenarioAssembly.objects.exists()
+    assert not ScenarioOperationalProduct.objects.exists()
+    assert Assembly.objects.count() == assemblies - 2
+    assert BuildingAssembly.objects.filter(building=large.building).count() == 20
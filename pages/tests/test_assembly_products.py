@@ -0,0 +1,86 @@
+import pytest
+from django.core.exceptions import ValidationError
+
+from pages.models.assembly import (
+    AssemblyCategory,
+    AssemblyCategoryTechnique,
+    AssemblyDimension,
+    StructuralProduct,
+)
+from pages.models.epd import Unit
+from pages.views.assembly.product_sync import save_products
+from pages.tests.test_impact_calculation import create_assembly, create_epd
+
+
+def selected(*rows):
+    """Rows in the shape of `parse_selected_epds`."""
+    classification = AssemblyCategoryTechnique.objects.filter(technique__isnull=True).first()
+    return {
+        f"{epd.pk}{i}": {
+            "epd_id": str(epd.pk),
+            "quantity": quantity,
+            "unit": unit,
+            "description": description,
+            "category": str(classification.category_id),
+            "technique": None,
+        }
+        for i, (epd, quantity, unit, description) in enumerate(rows)
+    }
+
+
+@pytest.mark.django_db
+def test_save_products_diffs_against_stored_products(create_assembly, create_epd, django_assert_max_num_queries):
+    """
+    ARRANGE: An assembly with three products
+    ACT: Save it again with one product changed, one unchanged, one removed and one added
+    ASSERT: Unchanged products keep their row, the rest is written in a few bulk statements
+    """
+    assembly = create_assembly(AssemblyDimension.AREA)
+    concrete = create_epd("Concrete", Unit.M3, [])
+    steel = create_epd("Steel", Unit.KG, [])
+    timber = create_epd("Timber", Unit.M3, [])
+    insulation = create_epd("Insulation", Unit.M3, [])
+    save_products(
+        assembly,
+        selected(
+            (concrete, 20, Unit.CM, "Slab"),
+            (steel, 1.5, Unit.CM, "Rebar"),
+            (timber, 10, Unit.CM, "Battens"),
+        ),
+    )
+    stored = {p.epd_id: p.pk for p in StructuralProduct.objects.filter(assembly=assembly)}
+    rows = selected(
+        (concrete, 20, Unit.CM, "Slab"),
+        (steel, 2, Unit.CM, "Rebar"),
+        (insulation, 12, Unit.CM, "Insulation"),
+    )
+
+    # Independent of the number of products, the delete cascades to scenario overrides
+    with django_assert_max_num_queries(11):
+        save_products(assembly, rows)
+
+    products = {p.epd_id: p for p in StructuralProduct.objects.filter(assembly=assembly)}
+    assert set(products) == {concrete.pk, steel.pk, insulation.pk}
+    assert products[concrete.pk].pk == stored[concrete.pk]
+    assert products[steel.pk].pk == stored[steel.pk]
+    assert products[steel.pk].quantity == 2
+    assert products[insulation.pk].classification.category == AssemblyCategory.objects.get(
+        pk=AssemblyCategoryTechnique.objects.filter(technique__isnull=True).first().category_id
+    )
+
+
+@pytest.mark.django_db
+def test_save_products_rejects_invalid_units(create_assembly, create_epd):
+    """
+    ARRANGE: An area assembly with one product
+    ACT: Save a product with a unit the dimension does not allow
+    ASSERT: The save fails before any product is written
+    """
+    assembly = create_assembly(AssemblyDimension.AREA)
+    concrete = create_epd("Concrete", Unit.M3, [])
+    save_products(assembly, selected((concrete, 20, Unit.CM, "Slab")))
+
+    with pytest.raises(ValidationError):
+        save_products(assembly, selected((concrete, 20, Unit.KG, "Slab")))
+
+    assert StructuralProduct.objects.get(assembly=assembly).input_unit == Unit.CM
@@ -0,0 +1,235 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+from django.contrib import admin
+from django.core.management import call_command
+from django.utils import timezone
+
+from pages.management.commands import run_jobs
+from pages.models.background_job import BackgroundJob, JobStatus
+from pages.models.epd import EPD
+from pages.scripts import background_jobs
+from pages.scripts.background_jobs import (
+    STALE_AFTER,
+    Heartbeat,
+    JobContext,
+    ResultFile,
+    WorkerStopped,
+    cancel,
+    claim_next,
+    enqueue,
+    fail_stale_jobs,
+    run_job,
+    task,
+)
+
+
+@pytest.fixture
+def test_tasks(monkeypatch):
+    monkeypatch.setattr(background_jobs, "TASKS", dict(background_jobs.TASKS))
+
+    @task("count")
+    def count(job, to, cancel_at=None, fail_at=None):
+        for i in range(to):
+            if i == cancel_at:
+                BackgroundJob.objects.filter(pk=job.job.pk).update(cancel_requested=True)
+            if i == fail_at:
+                raise RuntimeError("Broken input")
+            job.progress(i + 1, total=to, force=True)
+
+    @task("stop_worker")
+    def stop_worker(job):
+        job.progress(1, total=2, force=True)
+        # What the SIGTERM handler of `run_jobs` raises
+        raise WorkerStopped("SIGTERM")
+
+    @task("outlive_heartbeat")
+    def outlive_heartbeat(job):
+        # Taken for lost by another worker while still running
+        BackgroundJob.objects.filter(pk=job.job.pk).update(heartbeat_at=timezone.now() - 2 * STALE_AFTER)
+        fail_stale_jobs()
+
+    @task("lose_worker")
+    def lose_worker(job):
+        # Another worker dies while this job runs
+        BackgroundJob.objects.create(
+            kind="count",
+            status=JobStatus.RUNNING,
+            worker="lost",
+            heartbeat_at=timezone.now() - 2 * STALE_AFTER,
+        )
+
+
+@pytest.mark.django_db
+def test_worker_runs_jobs_and_reports_progress(test_tasks):
+    """
+    ARRANGE: Three queued jobs, one that succeeds, one that gets cancelled and one that fails
+    ACT: Claim and run them in queue order
+    ASSERT: Each ends in its status with its progress and error recorded
+    """
+    enqueue("count", {"to": 3})
+    enqueue("count", {"to": 3, "cancel_at": 1})
+    enqueue("count", {"to": 3, "fail_at": 2})
+
+    succeeded = run_job(claim_next("test"))
+    cancelled = run_job(claim_next("test"))
+    failed = run_job(claim_next("test"))
+
+    assert claim_next("test") is None
+    assert succeeded.status == JobStatus.SUCCEEDED
+    assert (succeeded.progress_done, succeeded.progress_total, succeeded.percent) == (3, 3, 100)
+    assert cancelled.status == JobStatus.CANCELLED
+    assert cancelled.progress_done == 2
+    assert failed.status == JobStatus.FAILED
+    assert "Broken input" in failed.error
+    assert all(job.finished_at and job.worker == "test" for job in (succeeded, cancelled, failed))
+
+
+@pytest.mark.django_db
+def test_cancelled_queued_job_is_never_run(test_tasks):
+    """
+    ARRANGE: A queued job
+    ACT: Cancel it before a worker claims it
+    ASSERT: It is cancelled and not claimed
+    """
+    job = enqueue("count", {"to": 3})
+
+    cancel(job)
+
+    job.refresh_from_db()
+    assert job.status == JobStatus.CANCELLED
+    assert claim_next("test") is None
+
+    with pytest.raises(ValueError):
+        enqueue("does-not-exist")
+
+
+@pytest.mark.django_db
+def test_export_job_stores_result_file(rf, monkeypatch):
+    """
+    ARRANGE: Two EPDs and a queued CSV export of one of them
+    ACT: Run the worker once, then download the result in the admin
+    ASSERT: The job succeeds with a result file holding only that EPD
+    """
+    epds = [
+        EPD.objects.create(
+            name=name,
+            names=[{"lang": "en", "value": name}],
+            declared_unit="m3",
+            declared_amount=1,
+            conversions=[],
+        )
+        for name in ["Exported EPD", "Other EPD"]
+    ]
+    job = enqueue("export_epds", {"epd_ids": [str(epds[0].pk)], "format": "csv"})
+    # Would close the connection of the test transaction
+    monkeypatch.setattr(run_jobs, "close_old_connections", lambda: None)
+
+    call_command("run_jobs", "--once")
+
+    job.refresh_from_db()
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.progress_total == 1
+    assert job.result_name.endswith(".csv")
+    content = ResultFile(job).read().decode()
+    assert "Exported EPD" in content
+    assert "Other EPD" not in content
+
+    request = rf.get("/")
+    # Stand-in for a staff user, the result is read from the job row
+    request.user = SimpleNamespace(has_perm=lambda perm, obj=None: True)
+    response = admin.site._registry[BackgroundJob].download_result(request, job.pk)
+    assert b"".join(response.streaming_content).decode() == content
+    assert job.result_name in response["Content-Disposition"]
+    assert int(response["Content-Length"]) == len(content.encode())
+
+
+@pytest.mark.django_db
+def test_stopped_worker_requeues_its_job(test_tasks, monkeypatch):
+    """
+    ARRANGE: A queued job during which the worker is told to stop
+    ACT: Run the worker
+    ASSERT: The job is queued again for the next worker
+    """
+    job = enqueue("stop_worker")
+    monkeypatch.setattr(run_jobs, "close_old_connections", lambda: None)
+
+    call_command("run_jobs", "--once")
+
+    job.refresh_from_db()
+    assert job.status == JobStatus.QUEUED
+    assert (job.worker, job.started_at, job.progress_done) == ("", None, 0)
+    assert claim_next("next").pk == job.pk
+
+
+@pytest.mark.django_db
+def test_worker_fails_stale_jobs_while_running(test_tasks, monkeypatch):
+    """
+    ARRANGE: A queued job during which another worker is lost
+    ACT: Run the worker with every loop checking for stale jobs
+    ASSERT: The job of the lost worker is failed without a restart
+    """
+    enqueue("lose_worker")
+    monkeypatch.setattr(run_jobs, "close_old_connections", lambda: None)
+    monkeypatch.setattr(background_jobs, "STALE_CHECK_INTERVAL", -1)
+
+    call_command("run_jobs", "--once")
+
+    lost = BackgroundJob.objects.get(worker="lost")
+    assert lost.status == JobStatus.FAILED
+    assert lost.finished_at is not None
+
+
+@pytest.mark.django_db
+def test_heartbeat_keeps_silent_job_alive(test_tasks):
+    """
+    ARRANGE: A running job that has not reported progress for longer than STALE_AFTER
+    ACT: Beat its heartbeat, then look for stale jobs
+    ASSERT: The job is still running
+    """
+    enqueue("count", {"to": 1})
+    job = claim_next("test")
+    BackgroundJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - 2 * STALE_AFTER)
+
+    Heartbeat(job).beat()
+
+    assert fail_stale_jobs() == 0
+    job.refresh_from_db()
+    assert job.status == JobStatus.RUNNING
+
+
+@pytest.mark.django_db
+def test_job_failed_as_stale_keeps_its_status(test_tasks):
+    """
+    ARRANGE: A queued job that is failed as stale while it runs
+    ACT: Run it to the end
+    ASSERT: The end of the run does not overwrite the failure
+    """
+    enqueue("outlive_heartbeat")
+
+    job = run_job(claim_next("test"))
+
+    assert job.status == JobStatus.FAILED
+    assert job.error == "The worker stopped reporting progress."
+
+
+@pytest.mark.django_db
+def test_result_file_is_stored_in_chunks(monkeypatch):
+    """
+    ARRANGE: A job and a result larger than one chunk
+    ACT: Save it, then save a shorter one over it
+    ASSERT: Both read back whole, from as many chunks as needed
+    """
+    monkeypatch.setattr(background_jobs, "RESULT_CHUNK_SIZE", 4)
+    job = BackgroundJob.objects.create(kind="export_epds")
+    context = JobContext(job)
+
+    context.save_result("result.txt", io.BytesIO(b"0123456789"))
+    assert job.result_chunks.count() == 3
+    assert ResultFile(job).read() == b"0123456789"
+    assert ResultFile(job).size == 10
+
+    context.save_result("result.txt", io.BytesIO(b"abc"))
+    assert job.result_chunks.count() == 1
+    assert ResultFile(job).read() == b"abc"
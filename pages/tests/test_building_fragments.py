@@ -0,0 +1,31 @@
+import uuid
+
+import pytest
+from django.test import RequestFactory
+from django.urls import reverse
+
+from pages.views.building.operational_products.operational_products import (
+    PICKER_MAX_AGE,
+    get_op_product_list,
+)
+
+
+@pytest.mark.django_db
+def test_operational_picker_is_a_cacheable_fragment():
+    """
+    ARRANGE: A GET request for the first page of the operational EPD picker of a simulation
+    ACT: Render the picker on its own
+    ASSERT: Only the picker is rendered, browsers may reuse it and its filters post to the simulation
+    """
+    building_id = uuid.uuid4()
+    request = RequestFactory().get(f"/building/{building_id}/", {"page": 1, "simulation": "True"})
+
+    response = get_op_product_list(request, building_id, simulation=True)
+
+    assert response.status_code == 200
+    assert f"max-age={PICKER_MAX_AGE}" in response["Cache-Control"]
+    assert "private" in response["Cache-Control"]
+    content = response.content.decode()
+    assert 'id="operational-filter-form"' in content
+    assert reverse("building_simulation", kwargs={"building_id": building_id}) in content
+    assert "selected_op_products" not in content
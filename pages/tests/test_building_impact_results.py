@@ -0,0 +1,186 @@
+from decimal import Decimal
+
+import pytest
+from django.db import IntegrityError, transaction
+
+from pages.models.assembly import AssemblyDimension, StructuralProduct
+from pages.models.building import Building, BuildingAssembly, ClimateZone
+from pages.models.building_impact import BuildingImpact, BuildingImpactError
+from pages.models.epd import Unit
+from pages.views.building.impact_results import refresh_building_results
+from pages.views.building.impact_snapshot import get_building_snapshot
+from pages.tests.test_impact_calculation import (
+    create_assembly,
+    create_epd,
+    create_epd_impact,
+    create_impact,
+    create_product,
+)
+
+
+@pytest.fixture
+def create_building_with_assembly(create_epd, create_epd_impact, create_assembly, create_product):
+    def _create_building_with_assembly():
+        return _building_with_assembly(create_epd, create_epd_impact, create_assembly, create_product)
+
+    return _create_building_with_assembly
+
+
+def _building_with_assembly(create_epd, create_epd_impact, create_assembly, create_product):
+    building = Building.objects.create(
+        name="Results Building",
+        climate_zone=ClimateZone.COLD,
+        total_floor_area=Decimal("10"),
+    )
+    epd = create_epd("Screed", Unit.KG, [{"unit": "kg/m^3", "value": "2000"}])
+    create_epd_impact(epd, Decimal("0.5"))
+    assembly = create_assembly(dimension=AssemblyDimension.AREA)
+    product = create_product(assembly, epd, Decimal("5"), Unit.CM)
+    BuildingAssembly.objects.create(
+        building=building, assembly=assembly, quantity=Decimal("20"), reporting_life_cycle=50
+    )
+    return building, assembly, product
+
+
+@pytest.mark.django_db
+def test_results_written_on_commit(django_capture_on_commit_callbacks, create_impact, create_building_with_assembly):
+    """Test if results are materialized when the inputs change.
+
+    ARRANGE: Create a building with an area assembly and a kg EPD.
+    ACT: Run the on-commit refresh, change the floor area and delete the product.
+    ASSERT: Stored value follows the inputs.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        building, assembly, product = create_building_with_assembly()
+
+    result = BuildingImpact.objects.get(building=building, assembly=assembly)
+    # 20 m2 * 5 cm * 2000 kg/m3 / 100 * 0.5 / 10 m2
+    assert result.value == pytest.approx(100)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        building.total_floor_area = Decimal("20")
+        building.save()
+    result = BuildingImpact.objects.get(building=building, assembly=assembly)
+    assert result.value == pytest.approx(50)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        StructuralProduct.objects.get(pk=product.pk).delete()
+    assert not BuildingImpact.objects.filter(building=building).exists()
+
+
+@pytest.mark.django_db
+def test_results_removed_with_building_assembly(django_capture_on_commit_callbacks, create_impact, create_building_with_assembly):
+    """Test if unlinking an assembly drops its results only.
+
+    ARRANGE: Create a building with a materialized assembly.
+    ACT: Delete the BuildingAssembly.
+    ASSERT: No results remain for the building.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        building, assembly, _ = create_building_with_assembly()
+    assert BuildingImpact.objects.filter(building=building).count() == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        BuildingAssembly.objects.filter(building=building, assembly=assembly).delete()
+    assert not BuildingImpact.objects.filter(building=building).exists()
+
+
+@pytest.mark.django_db
+def test_snapshot_follows_building_version(django_capture_on_commit_callbacks, django_assert_num_queries, create_impact, create_building_with_assembly):
+    """Test if the cached snapshot is reused until the results change.
+
+    ARRANGE: Create a building with a materialized assembly.
+    ACT: Read the snapshot twice, then change the floor area and read again.
+    ASSERT: Snapshot is served from the cache, rebuilt after the change.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        building, assembly, _ = create_building_with_assembly()
+    building.refresh_from_db()
+
+    snapshot = get_building_snapshot(building)
+    assert snapshot.assembly_gwp[assembly.pk] == pytest.approx(100)
+    # Only the lookup in the database cache
+    with django_assert_num_queries(1):
+        assert get_building_snapshot(building) == snapshot
+
+    with django_capture_on_commit_callbacks(execute=True):
+        building.total_floor_area = Decimal("20")
+        building.save()
+    building.refresh_from_db()
+    assert get_building_snapshot(building).assembly_gwp[assembly.pk] == pytest.approx(50)
+
+
+@pytest.mark.django_db
+def test_save_without_new_floor_area(django_capture_on_commit_callbacks, django_assert_num_queries, create_impact, create_building_with_assembly):
+    """Test if saving a building leaves its results alone unless the area changes.
+
+    ARRANGE: Create a building with a materialized assembly.
+    ACT: Save it with a new name, then with update_fields not naming the area.
+    ASSERT: Only the UPDATE runs and no refresh is scheduled.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        building, _, _ = create_building_with_assembly()
+    building = Building.objects.get(pk=building.pk)
+
+    with django_capture_on_commit_callbacks() as callbacks, django_assert_num_queries(1):
+        building.name = "Renamed"
+        building.save()
+    assert not callbacks
+
+    with django_capture_on_commit_callbacks() as callbacks, django_assert_num_queries(1):
+        building.total_floor_area = Decimal("20")
+        building.save(update_fields=["name"])
+    assert not callbacks
+
+
+@pytest.mark.django_db
+def test_refresh_does_not_duplicate_results(django_capture_on_commit_callbacks, create_impact, create_building_with_assembly):
+    """Test if results stay unique per building, assembly, EPD and impact.
+
+    ARRANGE: Create a building with a materialized assembly.
+    ACT: Refresh twice, then insert a copy of the stored row.
+    ASSERT: One row with the same value remains, the copy is refused.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        building, assembly, _ = create_building_with_assembly()
+
+    refresh_building_results(building.pk)
+    refresh_building_results(building.pk)
+    result = BuildingImpact.objects.get(building=building, assembly=assembly)
+    assert result.value == pytest.approx(100)
+
+    result.pk = None
+    with pytest.raises(IntegrityError), transaction.atomic():
+        result.save()
+
+
+@pytest.mark.django_db
+def test_failed_assembly_is_flagged(django_capture_on_commit_callbacks, create_impact, create_epd, create_epd_impact, create_building_with_assembly):
+    """Test if an assembly that cannot be calculated is flagged instead of dropped silently.
+
+    ARRANGE: Create a building with a materialized assembly.
+    ACT: Swap its EPD for a kg EPD without density, then back.
+    ASSERT: The snapshot reports the assembly as an error until it can be calculated again.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        building, assembly, product = create_building_with_assembly()
+    epd = product.epd
+    no_density = create_epd("No density", Unit.KG, [])
+    create_epd_impact(no_density, Decimal("0.5"))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product.epd = no_density
+        product.save()
+    building.refresh_from_db()
+    snapshot = get_building_snapshot(building)
+    assert assembly.pk not in snapshot.assembly_gwp
+    assert list(snapshot.errors) == [assembly.pk]
+    assert BuildingImpactError.objects.filter(building=building).count() == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product.epd = epd
+        product.save()
+    building.refresh_from_db()
+    snapshot = get_building_snapshot(building)
+    assert snapshot.errors == {}
+    assert snapshot.assembly_gwp[assembly.pk] == pytest.approx(100)
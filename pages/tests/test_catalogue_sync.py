@@ -0,0 +1,119 @@
+import pytest
+
+from pages.models.epd import EPD
+from pages.scripts.catalogue_sync import CatalogueSync
+from pages.scripts.epd_ingestion import EPDIngestor
+from pages.scripts.epd_parsing import ParsePool
+from pages.scripts.http_fetcher import EPDFetcher
+from pages.scripts.sync_journal import SyncState
+from pages.tests.test_epd_ingestion import parsed_epd
+
+
+@pytest.fixture
+def run_sync(tmp_path):
+    """Runs a sync over fake remote datasets, counting the downloads."""
+    downloads = []
+
+    def _run_sync(entries, store, batch_size=10, **kwargs):
+        def fetch(key, info, fetcher):
+            downloads.append(key)
+            return parsed_epd(key, info.get("gwp", 100.0))
+
+        with (
+            EPDFetcher(max_workers=2) as fetcher,
+            # The fake datasets are parsed records already
+            ParsePool(parse=dict, workers=0) as parser,
+            EPDIngestor(batch_size=batch_size) as ingestor,
+            CatalogueSync("test", fetch, store, fetcher, parser, ingestor, sync_dir=tmp_path, **kwargs) as sync,
+        ):
+            if entries is None:
+                entries = sync.journaled([SyncState.FAILED])
+            result = sync.run(entries)
+            states = {key: sync.journal.state(key) for key, _ in sync.journaled()}
+        return result, states
+
+    _run_sync.downloads = downloads
+    return _run_sync
+
+
+def store(key, info, data, ingestor):
+    ingestor.add(data, None, None)
+
+
+def broken_store(key, info, data, ingestor):
+    if key == "uuid-2":
+        raise ValueError("Parser bug")
+    ingestor.add(data, None, None)
+
+
+def unstorable_store(key, info, data, ingestor):
+    if key == "uuid-2":
+        data["declared_unit"] = None
+    ingestor.add(data, None, None)
+
+
+@pytest.mark.django_db
+def test_sync_resumes_and_replays_failures(run_sync):
+    """
+    ARRANGE: Three remote EPDs, one of which fails to parse
+    ACT: Sync, sync again, then replay the failures offline with a fixed parser
+    ASSERT: Stored EPDs are skipped, failures are replayed from the cache
+    """
+    entries = [(f"uuid-{i}", {}) for i in range(1, 4)]
+
+    result, states = run_sync(entries, broken_store)
+
+    assert result.fetched == 3
+    assert list(result.failed) == ["uuid-2"]
+    assert states == {"uuid-1": SyncState.STORED, "uuid-2": SyncState.FAILED, "uuid-3": SyncState.STORED}
+    assert EPD.objects.count() == 2
+
+    result, _ = run_sync(entries, broken_store)
+
+    assert result.skipped == 2
+    assert result.cached == 1
+    assert result.fetched == 0
+
+    result, states = run_sync(None, store, offline=True)
+
+    assert result.cached == 1
+    assert result.failed == {}
+    assert set(states.values()) == {SyncState.STORED}
+    assert EPD.objects.count() == 3
+    # Every dataset was only downloaded once
+    assert sorted(run_sync.downloads) == ["uuid-1", "uuid-2", "uuid-3"]
+
+    result, _ = run_sync([("uuid-1", {"gwp": 120.0, "changed": True})], store)
+
+    assert result.fetched == 1
+    assert EPD.objects.get(UUID="uuid-1").gwp_a1a3 == 120.0
+
+
+@pytest.mark.django_db
+def test_offline_sync_does_not_download(run_sync):
+    """
+    ARRANGE: An EPD that was never downloaded
+    ACT: Sync it offline
+    ASSERT: It fails without a download
+    """
+    result, states = run_sync([("uuid-1", {})], store, offline=True)
+
+    assert "not in the response cache" in result.failed["uuid-1"]
+    assert states["uuid-1"] == SyncState.FAILED
+    assert run_sync.downloads == []
+
+
+@pytest.mark.django_db
+def test_sync_journals_stored_batches(run_sync):
+    """
+    ARRANGE: Three remote EPDs, one of which the database refuses
+    ACT: Sync them with a batch written per EPD
+    ASSERT: The journal keeps the outcome of each write
+    """
+    entries = [(f"uuid-{i}", {}) for i in range(1, 4)]
+
+    result, states = run_sync(entries, unstorable_store, batch_size=1)
+
+    assert list(result.failed) == ["uuid-2"]
+    assert states == {"uuid-1": SyncState.STORED, "uuid-2": SyncState.FAILED, "uuid-3": SyncState.STORED}
+    assert EPD.objects.count() == 2
@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+from cities_light.models import Country
+
+from pages.models.epd import EPD, EPDImpact, EPDType, MaterialCategory, Unit
+from pages.scripts.csv_import.engine import CsvImport, category_id_or_parent, import_csv
+
+
+def prepare(df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "country": df["country"],
+            "category_id": category_id_or_parent(df),
+            "name": df["name"],
+            "declared_unit": df["declared_unit"],
+            "declared_amount": 1,
+            "source": "Test",
+            "type": EPDType.GENERIC,
+            "comment": None,
+            "UUID": None,
+        }
+    )
+
+
+SPEC = CsvImport(
+    file_path="test.csv",
+    impact_columns=["gwp_a1a3 [kgCo2e]", "penrt_a1a3 [MJ]"],
+    prepare=prepare,
+    match_on=("country", "source", "name"),
+)
+
+
+def csv_rows(gwp="300", unit="m3"):
+    return pd.DataFrame(
+        {
+            "country": ["DEU", "DEU", "DEU", "Atlantis"],
+            "level_1_index": ["1.1", "1.1", "1.1", "1.1"],
+            "level_2_index": [None, None, None, None],
+            "name": ["Concrete", "Brick", "Timber", "Steel"],
+            "declared_unit": [unit, "pieces", "m3", "kg"],
+            "volume density [kg/m3]": [2400, None, 500, None],
+            "gwp_a1a3 [kgCo2e]": [gwp, "100", "n.a.", "10"],
+            "penrt_a1a3 [MJ]": ["1000", None, "50", "100"],
+        }
+    )
+
+
+@pytest.fixture
+def germany():
+    return Country.objects.create(name="Germany", code2="DE", code3="DEU", geoname_id=1)
+
+
+@pytest.mark.django_db
+def test_csv_import_dry_run_reports_row_errors(germany):
+    """
+    ARRANGE: A file with an unknown country, an unknown unit and a non-numeric impact
+    ACT: Import it as a dry run
+    ASSERT: Nothing is written and every broken row is reported
+    """
+    report = import_csv(SPEC, dry_run=True, df=csv_rows())
+
+    assert EPD.objects.count() == 0
+    assert report.rows == 4
+    assert report.created == 1
+    assert report.errors == {
+        1: ["Unknown declared unit 'pieces'"],
+        2: ["'n.a.' in gwp_a1a3 [kgCo2e] is not a number"],
+        3: ["Unknown country 'Atlantis'"],
+    }
+
+
+@pytest.mark.django_db
+def test_csv_import_writes_and_updates_valid_rows(germany):
+    """
+    ARRANGE: A file with one valid row
+    ACT: Import it, then import it again with a new GWP value
+    ASSERT: The EPD is created with impacts and summary columns, then updated in place
+    """
+    category = MaterialCategory.objects.get(category_id="1.1")
+
+    report = import_csv(SPEC, df=csv_rows())
+
+    assert report.created == 1
+    epd = EPD.objects.get(name="Concrete")
+    assert epd.country == germany
+    assert epd.category == category
+    assert epd.declared_unit == Unit.M3
+    assert epd.gwp_a1a3 == 300.0
+    assert epd.volume_density == 2400.0
+    assert EPDImpact.objects.filter(epd=epd).count() == 2
+
+    report = import_csv(SPEC, df=csv_rows(gwp="250"))
+
+    assert report.updated == 1
+    assert EPD.objects.count() == 1
+    epd.refresh_from_db()
+    assert epd.gwp_a1a3 == 250.0
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from pages.models.epd import EPD
+from pages.scripts.delta_sync import DeltaFilter, is_changed
+from pages.scripts.epd_ingestion import EPDIngestor
+from pages.tests.test_epd_ingestion import parsed_epd
+
+
+@pytest.fixture
+def stored_epds():
+    with EPDIngestor() as ingestor:
+        for uuid in ("uuid-1", "uuid-2", "uuid-4"):
+            ingestor.add(parsed_epd(uuid, 100.0), None, None)
+
+
+@pytest.mark.django_db
+def test_delta_filter_reports_added_updated_withdrawn(stored_epds):
+    """
+    ARRANGE: Stored EPDs 1, 2 and 4 in version 00.01.000
+    ACT: Filter a listing with a new version of 1, the same version of 2 and a new EPD 3
+    ASSERT: Only 1 and 3 pass, 4 is reported as withdrawn
+    """
+    listing = [
+        ("uuid-1", {"version": "00.02.000"}),
+        ("uuid-2", {"version": "00.01.000"}),
+        ("uuid-3", {"version": "00.01.000"}),
+    ]
+    delta = DeltaFilter(EPD.objects.all(), chunk_size=2)
+
+    entries = list(delta(listing))
+
+    assert entries == [("uuid-1", {"version": "00.02.000", "changed": True}), ("uuid-3", {"version": "00.01.000"})]
+    report = delta.report
+    assert report.added == ["uuid-3"]
+    assert report.updated == ["uuid-1"]
+    assert report.withdrawn == ["uuid-4"]
+    assert report.unchanged == 1
+    assert report.complete
+
+
+@pytest.mark.django_db
+def test_delta_filter_new_only(stored_epds):
+    """
+    ARRANGE: Stored EPD 1 in version 00.01.000
+    ACT: Filter a listing with a new version of it without updates
+    ASSERT: Nothing passes
+    """
+    delta = DeltaFilter(EPD.objects.all(), updates=False)
+
+    assert list(delta([("uuid-1", {"version": "00.02.000"})])) == []
+
+
+def test_is_changed_falls_back_to_last_update():
+    """
+    ARRANGE: Listing entries with equal versions and different lastUpdate
+    ACT: Compare them to a stored EPD
+    ASSERT: Only a lastUpdate after the local update counts as a change
+    """
+    updated_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    later = int((updated_at + timedelta(days=1)).timestamp() * 1000)
+
+    assert is_changed({"version": "00.01.000", "lastUpdate": later}, "00.01.000", updated_at)
+    assert not is_changed({"version": "00.01.000", "lastUpdate": "2024-12-31T00:00:00"}, "00.01.000", updated_at)
+    assert not is_changed({"version": "00.01.000"}, "00.02.000", updated_at)
@@ -1,11 +1,14 @@
 import pytest
-
+from django.db import connection
 
 from pages.models.assembly import AssemblyDimension
-from pages.models.epd import EPD, Unit
-from pages.tests.test_impact_calculation import create_epd
+from pages.models.epd import EPD, MaterialCategory, Unit
+from pages.tests.test_impact_calculation import create_epd, create_epd_impact, create_impact
 
-from pages.views.assembly.epd_filtering import filter_by_dimension
+from pages.views.assembly.epd_filtering import filter_by_dimension, sort_by_impact
+from pages.views.assembly.epd_pagination import KeysetPaginator
+from pages.views.assembly.epd_search import SEARCH_RANK, search_epds
+from pages.views.material_category_tree import material_category_tree
 
 
 @pytest.mark.django_db
@@ -71,3 +74,233 @@ def test_filter_by_dimension(
         assert list(rslt) == [test_epd]
     else:
         assert list(rslt) == []
+
+
+@pytest.mark.django_db
+def test_impact_summary_and_sort(create_epd, create_epd_impact):
+    """Check if the GWP summary column follows EPDImpact and can be sorted on.
+
+    ARRANGE: Create two EPDs with GWP A1-A3 impacts.
+    ACT: Change and delete impacts, sort by GWP.
+    ASSERT: Summary column is kept in sync and defines the order.
+    """
+
+    # Arrange
+    high = create_epd("High EPD", Unit.KG, [])
+    low = create_epd("Low EPD", Unit.KG, [])
+    high_impact = create_epd_impact(high, 3.456)
+    create_epd_impact(low, 1.5)
+    epds = EPD.objects.filter(id__in=[high.id, low.id])
+
+    # Act & Assert
+    high.refresh_from_db()
+    assert high.gwp_a1a3 == pytest.approx(3.46)
+    assert list(sort_by_impact(epds, "gwp", operational=False)) == [low, high]
+    assert list(sort_by_impact(epds, "-gwp", operational=False)) == [high, low]
+
+    high_impact.value = 1
+    high_impact.save()
+    assert list(sort_by_impact(epds, "gwp", operational=False)) == [high, low]
+
+    high_impact.delete()
+    high.refresh_from_db()
+    assert high.gwp_a1a3 is None
+    assert list(sort_by_impact(epds, "gwp", operational=False)) == [low, high]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("sort_field, descending", [(None, False), ("gwp_a1a3", False), ("gwp_a1a3", True)])
+def test_keyset_pagination(sort_field, descending, create_epd, create_epd_impact):
+    """Check if walking the cursors visits every EPD once, in order, both ways.
+
+    ARRANGE: Create EPDs with repeated and missing GWP values.
+    ACT: Page forward from the start and backward from the end.
+    ASSERT: Pages concatenate to the sorted list.
+    """
+
+    # Arrange
+    for i, value in enumerate([2, 1, None, 2, 3, None, 1]):
+        epd = create_epd(f"EPD {i}", Unit.KG, [])
+        if value is not None:
+            create_epd_impact(epd, value)
+    epds = EPD.objects.filter(names__0__value__startswith="EPD ")
+    sort = "-gwp" if descending else "gwp"
+    expected = list(sort_by_impact(epds, sort, operational=False)) if sort_field else list(epds.order_by("pk"))
+    paginator = KeysetPaginator(epds, 3, sort_field=sort_field, descending=descending)
+
+    # Act
+    forward, page = [], paginator.get_page()
+    forward.extend(page)
+    while page.has_next:
+        page = paginator.get_page(page.next_cursor, "next")
+        forward.extend(page)
+
+    backward, page = [], paginator.get_page(None, "prev")
+    backward[:0] = list(page)
+    while page.has_previous:
+        page = paginator.get_page(page.previous_cursor, "prev")
+        backward[:0] = list(page)
+
+    # Assert
+    assert forward == expected
+    assert backward == expected
+    assert page.count == 7
+
+
+@pytest.mark.django_db
+def test_search_epds_translations_and_rank(create_epd):
+    """Check if the search covers translated names and ranks better matches first.
+
+    ARRANGE: Create EPDs with English and German names.
+    ACT: Search for a German term.
+    ASSERT: Only matching EPDs are returned, the closest one first.
+    """
+
+    # Arrange
+    exact = create_epd("Concrete C30/37", Unit.M3, [])
+    exact.names = [{"value": "Concrete C30/37", "lang": "en"}, {"value": "Beton C30/37", "lang": "de"}]
+    exact.save()
+    partial = create_epd("Precast concrete", Unit.M3, [])
+    partial.names = [{"value": "Precast concrete", "lang": "en"}, {"value": "Betonfertigteil Stahlbeton", "lang": "de"}]
+    partial.save()
+    create_epd("Timber", Unit.M3, [])
+    epds = EPD.objects.filter(id__in=[exact.id, partial.id]) | EPD.objects.filter(names__0__value="Timber")
+
+    # Act
+    rslt = list(search_epds(epds, "beton c30"))
+
+    # Assert
+    assert rslt == [exact]
+    assert list(search_epds(epds, "BETON")) == [exact, partial]
+    assert list(search_epds(epds, "concrete beton")) == [exact, partial]
+
+
+@pytest.mark.django_db
+def test_search_epds_tokens_like_index(create_epd):
+    """Check if terms are split like the indexed names and match word prefixes.
+
+    ARRANGE: Create EPDs named with a strength class and a compound word.
+    ACT: Search for the strength class, a prefix of it and parts of the compound.
+    ASSERT: Only EPDs with a word starting with each term are returned.
+    """
+
+    # Arrange
+    graded = create_epd("Concrete C30/37", Unit.M3, [])
+    graded.names = [{"value": "Concrete C30/37", "lang": "en"}, {"value": "Beton C30/37", "lang": "de"}]
+    graded.save()
+    compound = create_epd("Reinforced concrete", Unit.M3, [])
+    compound.names = [{"value": "Stahlbeton", "lang": "de"}]
+    compound.save()
+    epds = EPD.objects.filter(id__in=[graded.id, compound.id])
+
+    # Act & Assert
+    assert list(search_epds(epds, "C30/37")) == [graded]
+    assert list(search_epds(epds, "concrete c30/3")) == [graded]
+    assert list(search_epds(epds, "beton")) == [graded]
+    assert list(search_epds(epds, "stahl")) == [compound]
+
+
+@pytest.mark.django_db
+def test_search_epds_uses_index(create_epd):
+    """Check if the search can be answered from the GIN index on the names.
+
+    ARRANGE: Create an EPD and turn off sequential scans.
+    ACT: Explain a search.
+    ASSERT: Plan reads the search text index.
+    """
+
+    # Arrange
+    create_epd("Concrete C30/37", Unit.M3, [])
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+
+    # Act
+    plan = search_epds(EPD.objects.all(), "concrete c30").explain()
+
+    # Assert
+    assert "epd_search_text_vector" in plan
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_of_tied_ranks(create_epd):
+    """Check if paging search results visits EPDs of the same relevance once.
+
+    ARRANGE: Create EPDs with identical names, so their ranks tie.
+    ACT: Page forward and backward by rank.
+    ASSERT: Every EPD is visited once in each direction.
+    """
+
+    # Arrange
+    for i in range(11):
+        create_epd("Tied concrete", Unit.M3, [])
+    epds = search_epds(EPD.objects.all(), "concrete")
+    expected = list(epds)
+    paginator = KeysetPaginator(epds, 3, sort_field=SEARCH_RANK, descending=True)
+
+    # Act
+    forward, page = [], paginator.get_page()
+    forward.extend(page)
+    while page.has_next:
+        page = paginator.get_page(page.next_cursor, "next")
+        forward.extend(page)
+
+    backward, page = [], paginator.get_page(None, "prev")
+    backward[:0] = list(page)
+    while page.has_previous:
+        page = paginator.get_page(page.previous_cursor, "prev")
+        backward[:0] = list(page)
+
+    # Assert
+    assert len(expected) == 11
+    assert forward == expected
+    assert backward == expected
+
+
+@pytest.mark.django_db
+def test_volume_density_follows_conversions(create_epd):
+    """Check if the extracted volume density is kept in sync with conversions.
+
+    ARRANGE: Create a KG EPD with a gross density conversion.
+    ACT: Remove the conversion with a partial save.
+    ASSERT: Typed columns and dimension filter follow.
+    """
+
+    # Arrange
+    test_epd = create_epd("Test EPD", Unit.KG, [{"unit": "kg/m^3", "value": "2400"}])
+    filtered_epds = EPD.objects.filter(id=test_epd.id)
+    assert test_epd.has_volume_density
+    assert test_epd.volume_density == 2400
+
+    # Act
+    test_epd.conversions = [{"unit": "kg/m^2", "value": "10"}]
+    test_epd.save(update_fields=["conversions"])
+
+    # Assert
+    test_epd.refresh_from_db()
+    assert not test_epd.has_volume_density
+    assert test_epd.volume_density is None
+    assert list(filter_by_dimension(filtered_epds, AssemblyDimension.AREA)) == []
+
+
+@pytest.mark.django_db
+def test_category_subtree_uses_path_boundaries():
+    """Check if a category subtree does not leak into siblings sharing an id prefix.
+
+    ARRANGE: Take the loaded categories "2.1" and "2.10".
+    ACT: Collect the subtree of "2.1" from the cached tree.
+    ASSERT: Children of "2.1" are included, "2.10" and its children are not.
+    """
+
+    # Arrange
+    category = MaterialCategory.objects.get(category_id="2.1")
+    sibling = MaterialCategory.objects.get(category_id="2.10")
+
+    # Act
+    tree = material_category_tree()
+    subtree = tree.subtree_ids(category.pk)
+
+    # Assert
+    assert category.pk in subtree
+    assert {c.pk for c in tree.children(category.pk)} <= set(subtree)
+    assert sibling.pk not in subtree
+    assert not set(tree.subtree_ids(sibling.pk)) & set(subtree)
@@ -0,0 +1,79 @@
+import csv
+import io
+
+import pytest
+from django.http import StreamingHttpResponse
+
+from pages.models.epd import EPD, EPDImpact, Impact, MaterialCategory
+from pages.scripts.Excel_export.export_EPDs_to_excel import (
+    COLUMNS,
+    csv_response,
+    iter_csv,
+)
+from pages.scripts.background_jobs import ResultFile, claim_next, enqueue, run_job
+
+
+@pytest.fixture
+def create_epds():
+    def _create_epds(count):
+        gwp = Impact.objects.get_or_create(impact_category="gwp", life_cycle_stage="a1a3")[0]
+        penrt = Impact.objects.get_or_create(impact_category="penrt", life_cycle_stage="a1a3")[0]
+        category = MaterialCategory.objects.filter(level=3).first()
+        for i in range(count):
+            epd = EPD.objects.create(
+                name=f"EPD {i}",
+                names=[{"lang": "en", "value": f"EPD {i}"}],
+                category=category,
+                declared_unit="m3",
+                declared_amount=1,
+                conversions=[{"unit": "kg/m^3", "value": "2400"}],
+                public=True,
+            )
+            EPDImpact.objects.create(epd=epd, impact=gwp, value=100 + i)
+            EPDImpact.objects.create(epd=epd, impact=penrt, value=1000)
+        return category
+
+    return _create_epds
+
+
+@pytest.mark.django_db
+def test_csv_export_streams_rows_in_constant_queries(create_epds, django_assert_num_queries):
+    """
+    ARRANGE: Five EPDs with impacts
+    ACT: Export them as CSV in chunks of two
+    ASSERT: One row per EPD with its category path and GWP, one impact query per chunk
+    """
+    category = create_epds(5)
+
+    # EPDs come through one server-side cursor, impacts are prefetched per chunk of 2
+    with django_assert_num_queries(1 + 3):
+        lines = list(iter_csv(EPD.objects.all(), chunk_size=2))
+
+    rows = {row["name"]: row for row in csv.DictReader(io.StringIO("".join(lines)))}
+    assert len(rows) == 5
+    assert list(rows["EPD 0"]) == COLUMNS
+    assert rows["EPD 0"]["level_2_text"] == category.name_en
+    assert rows["EPD 0"]["level_1_text"] == category.parent.name_en
+    assert rows["EPD 0"]["volumne density"] == "2400"
+    assert float(rows["EPD 4"]["gwp_a1a3"]) == 104
+
+
+@pytest.mark.django_db
+def test_exports_stream_or_run_as_job(create_epds):
+    """
+    ARRANGE: Two EPDs
+    ACT: Build the CSV download response and run an Excel export job
+    ASSERT: The CSV is streamed as an attachment, the workbook stored as the job result
+    """
+    create_epds(2)
+
+    response = csv_response(EPD.objects.all())
+    assert isinstance(response, StreamingHttpResponse)
+    assert response["Content-Disposition"] == 'attachment; filename="export.csv"'
+    assert b"EPD 1" in b"".join(response.streaming_content)
+
+    pytest.importorskip("openpyxl")
+    enqueue("export_epds", {"format": "xlsx"})
+    job = run_job(claim_next("test"))
+    assert job.result_name.endswith(".xlsx")
+    assert ResultFile(job).read().startswith(b"PK")
@@ -0,0 +1,102 @@
+import pytest
+
+from pages.models.epd import EPD, EPDImpact, MaterialCategory
+from pages.scripts.epd_ingestion import EPDIngestor, ReferenceData
+
+
+def parsed_epd(uuid, gwp_a1a3, name="Concrete C30/37"):
+    # Shape of `parse_epd` output
+    return {
+        "uuid": uuid,
+        "name": name,
+        "names": [{"value": name, "lang": "en"}],
+        "declared_unit": "m3",
+        "conversions": [{"unit": "kg/m^3", "value": "2400"}],
+        "source": "https://example.org/epd",
+        "declared_amount": 1,
+        "version": "00.01.000",
+        "comment": None,
+        "classification": None,
+        "gwp_a1a3": gwp_a1a3,
+        "penrt_a1a3": 1000.0,
+        "gwp_c3": None,
+    }
+
+
+@pytest.mark.django_db
+def test_ingestion_upserts_epds_and_impacts():
+    """
+    ARRANGE: Two parsed EPDs
+    ACT: Ingest them in batches of one, then ingest them again with new values
+    ASSERT: EPDs are updated in place, impacts and summary columns follow
+    """
+    category = MaterialCategory.objects.first()
+    refs = ReferenceData()
+
+    with EPDIngestor(refs, batch_size=1) as ingestor:
+        ingestor.add(parsed_epd("uuid-1", 300.0), None, category)
+        ingestor.add(parsed_epd("uuid-2", 200.0), None, category)
+
+    assert ingestor.stats.stored == 2
+    assert ingestor.stats.batches == 2
+    epd = EPD.objects.get(UUID="uuid-1")
+    assert epd.gwp_a1a3 == 300.0
+    assert epd.has_volume_density
+    assert epd.volume_density == 2400.0
+    assert "concrete" in epd.search_text.lower()
+
+    with EPDIngestor(refs) as ingestor:
+        ingestor.add(parsed_epd("uuid-1", 350.0, name="Concrete C35/45"), None, category)
+
+    assert EPD.objects.count() == 2
+    epd = EPD.objects.get(UUID="uuid-1")
+    assert epd.name == "Concrete C35/45"
+    assert epd.gwp_a1a3 == 350.0
+    assert epd.penrt_a1a3 == 1000.0
+    # gwp_c3 is None and not stored
+    assert EPDImpact.objects.filter(epd=epd).count() == 2
+
+    # A new version without PENRT drops the old value
+    new_version = parsed_epd("uuid-1", 350.0)
+    new_version["penrt_a1a3"] = None
+    with EPDIngestor(refs) as ingestor:
+        ingestor.add(new_version, None, category)
+
+    epd.refresh_from_db()
+    assert epd.penrt_a1a3 is None
+    assert EPDImpact.objects.filter(epd=epd).count() == 1
+
+
+@pytest.mark.django_db
+def test_ingestion_isolates_failing_records():
+    """
+    ARRANGE: A batch where one record is missing its declared unit
+    ACT: Ingest the batch
+    ASSERT: The valid record is stored and the broken one is reported
+    """
+    broken = parsed_epd("uuid-broken", 100.0)
+    broken["declared_unit"] = None
+
+    with EPDIngestor(batch_size=10) as ingestor:
+        ingestor.add(parsed_epd("uuid-1", 300.0), None, None)
+        ingestor.add(broken, None, None)
+
+    assert ingestor.stats.failed == ["uuid-broken"]
+    assert list(EPD.objects.values_list("UUID", flat=True)) == ["uuid-1"]
+
+
+@pytest.mark.django_db
+def test_ingestion_truncates_long_texts():
+    """
+    ARRANGE: A parsed EPD with a comment longer than the column
+    ACT: Ingest it
+    ASSERT: The EPD is stored with the comment cut to the column length
+    """
+    epd_data = parsed_epd("uuid-1", 300.0)
+    epd_data["comment"] = "c" * 400
+
+    with EPDIngestor() as ingestor:
+        ingestor.add(epd_data, None, None)
+
+    assert ingestor.stats.failed == []
+    assert EPD.objects.get(UUID="uuid-1").comment == "c" * EPD._meta.get_field("comment").max_length
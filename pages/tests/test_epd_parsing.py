@@ -0,0 +1,60 @@
+from pages.scripts.epd_parsing import ParsePool
+from pages.scripts.oekobaudat.oekobaudat_loader import sanitize_ilcd
+
+
+def ilcd_document(value):
+    return {
+        "LCIAResults": {
+            "LCIAResult": [
+                {"other": {"anies": [{"module": "A1-A3", "value": value}, {"module": "C3", "value": "MNA"}]}},
+            ]
+        },
+        "processInformation": {"dataSetInformation": {"value": "ND is not a value here", "name": "ND"}},
+    }
+
+
+def test_sanitize_ilcd_replaces_undeclared_values():
+    """
+    ARRANGE: An ILCD document with "ND" and "MNA" values
+    ACT: Sanitize it
+    ASSERT: Only values are zeroed, the original document is unchanged
+    """
+    document = ilcd_document("ND")
+
+    sanitized = sanitize_ilcd(document)
+
+    anies = sanitized["LCIAResults"]["LCIAResult"][0]["other"]["anies"]
+    assert [a["value"] for a in anies] == ["0", "0"]
+    assert sanitized["processInformation"] == document["processInformation"]
+    assert document["LCIAResults"]["LCIAResult"][0]["other"]["anies"][0]["value"] == "ND"
+
+
+def test_parse_pool_runs_in_processes():
+    """
+    ARRANGE: Five documents
+    ACT: Parse them on two worker processes
+    ASSERT: Every document comes back parsed under its key
+    """
+    items = [(str(i), ilcd_document(str(i))) for i in range(5)]
+
+    with ParsePool(parse=sanitize_ilcd, workers=2) as pool:
+        results = {key: (record, error) for key, record, error in pool.map(items)}
+
+    assert len(results) == 5
+    for i in range(5):
+        record, error = results[str(i)]
+        assert error is None
+        assert record["LCIAResults"]["LCIAResult"][0]["other"]["anies"][0]["value"] == str(i)
+
+
+def test_parse_pool_reports_errors_per_item():
+    """
+    ARRANGE: A document and something that is not one
+    ACT: Parse them inline
+    ASSERT: The broken item is yielded with its error
+    """
+    with ParsePool(parse=dict, workers=0) as pool:
+        results = {key: (record, error) for key, record, error in pool.map([("ok", {"a": 1}), ("broken", 1)])}
+
+    assert results["ok"] == ({"a": 1}, None)
+    assert isinstance(results["broken"][1], TypeError)
@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from pages.scripts.http_fetcher import EPDFetcher, TokenBucket
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves `{"uuid": <path>}` after `delay` seconds, failing the first `failures` calls per path.
+
+    `/processes` serves a paged listing instead.
+    """
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.calls[self.path] = server.calls.get(self.path, 0) + 1
+            calls = server.calls[self.path]
+        time.sleep(server.delay)
+        if calls <= server.failures:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        url = urlsplit(self.path)
+        if url.path == "/processes":
+            # Paged soda4LCA listing of `total` records
+            query = parse_qs(url.query)
+            start, size = int(query["startIndex"][0]), int(query["pageSize"][0])
+            data = [{"uuid": str(i)} for i in range(start, min(start + size, server.total))]
+            body = json.dumps({"totalCount": server.total, "startIndex": start, "data": data}).encode()
+        else:
+            body = json.dumps({"uuid": self.path.strip("/")}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    def _stub_server(delay=0.0, failures=0, total=0):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        server.delay, server.failures, server.total = delay, failures, total
+        server.calls, server.lock = {}, threading.Lock()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}"
+
+    servers = []
+    yield _stub_server
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def fetch(uuid, fetcher, base_url):
+    return fetcher.get_json(f"{base_url}/{uuid}")
+
+
+def test_fetcher_retries_failed_requests(stub_server):
+    """
+    ARRANGE: A server that answers 503 twice before succeeding
+    ACT: Fetch one document with three retries, then one with a single retry
+    ASSERT: The first succeeds on the third call, the second raises
+    """
+    server, base_url = stub_server(failures=2)
+
+    with EPDFetcher(retries=3, backoff=0.01) as fetcher:
+        assert fetcher.get_json(f"{base_url}/a") == {"uuid": "a"}
+    assert server.calls["/a"] == 3
+
+    with EPDFetcher(retries=1, backoff=0.01) as fetcher:
+        with pytest.raises(requests.HTTPError):
+            fetcher.get_json(f"{base_url}/b")
+
+
+def test_fetcher_scales_with_concurrency(stub_server):
+    """
+    ARRANGE: A server taking 0.1s per response
+    ACT: Fetch 16 documents with 1 and with 8 workers
+    ASSERT: All documents arrive and 8 workers are much faster
+    """
+    _, base_url = stub_server(delay=0.1)
+    uuids = [str(i) for i in range(16)]
+
+    timings = {}
+    for workers in (1, 8):
+        start = time.monotonic()
+        with EPDFetcher(max_workers=workers, rate=1000) as fetcher:
+            results = list(fetcher.map(partial(fetch, fetcher=fetcher, base_url=base_url), uuids))
+        timings[workers] = time.monotonic() - start
+
+        assert sorted(item for item, _, _ in results) == sorted(uuids)
+        assert all(data == {"uuid": item} and error is None for item, data, error in results)
+
+    assert timings[8] < timings[1] / 3
+
+
+def test_fetcher_reports_errors_per_item(stub_server):
+    """
+    ARRANGE: A server that always fails
+    ACT: Map over two documents
+    ASSERT: Each item is yielded with its error instead of stopping the loop
+    """
+    _, base_url = stub_server(failures=100)
+
+    with EPDFetcher(retries=0) as fetcher:
+        results = list(fetcher.map(partial(fetch, fetcher=fetcher, base_url=base_url), ["a", "b"]))
+
+    assert len(results) == 2
+    assert all(data is None and isinstance(error, requests.HTTPError) for _, data, error in results)
+
+
+def test_listing_is_streamed_page_by_page(stub_server):
+    """
+    ARRANGE: A listing of 25 records
+    ACT: Iterate it with pages of 10, stopping after the first record
+    ASSERT: Only the first page was requested, a full iteration gets all records in 3 pages
+    """
+    server, base_url = stub_server(total=25)
+
+    with EPDFetcher() as fetcher:
+        pages = fetcher.iter_pages(f"{base_url}/processes?format=json", page_size=10)
+        assert next(pages) == {"uuid": "0"}
+        assert len(server.calls) == 1
+
+        records = list(fetcher.iter_pages(f"{base_url}/processes?format=json", page_size=10))
+
+    assert [r["uuid"] for r in records] == [str(i) for i in range(25)]
+    assert len(server.calls) == 3
+
+
+def test_token_bucket_limits_rate():
+    """
+    ARRANGE: A bucket of 20 requests per second with a burst of 1
+    ACT: Acquire 11 tokens
+    ASSERT: It takes at least half a second
+    """
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.45
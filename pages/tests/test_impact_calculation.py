@@ -22,7 +22,7 @@ from pages.models.epd import (
     MaterialCategory,
     Unit,
 )
-from pages.views.building.impact_calculation import calculate_impacts
+from pages.views.building.impact_calculation import calculate_impacts, calculate_impacts_batch
 
 
 # Fixtures for reusable components
@@ -369,3 +369,77 @@ def test_calculate_impacts_errors(
     
     with pytest.raises(ValidationError):
         create_product(assembly, epd, product_quantity, product_unit)
+
+
+@pytest.mark.django_db
+def test_calculate_impacts_batch_matches_decimal_formulas(
+    create_impact,
+    create_epd,
+    create_epd_impact,
+    create_assembly,
+    create_product,
+):
+    """Test if the batch engine gives the results of the per-product Decimal formulas.
+
+    ARRANGE: Create products for several dimension/declared_unit combinations.
+    ACT: Calculate impacts for all products in one batch.
+    ASSERT: Values equal the formulas evaluated by hand, in the order of the products.
+    """
+    assembly_quantity, floor_area = Decimal("12.5"), Decimal("250")
+    value = Decimal("0.183550838458225")
+    cases = [
+        (
+            (Unit.KG, [{"unit": "kg/m^3", "value": "2200"}], AssemblyDimension.AREA, Decimal("3.5"), Unit.CM),
+            # total_m2 * thickness_in_cm / 100 * kg_per_m3 * impact
+            assembly_quantity * Decimal("3.5") / 100 * 2200 * value,
+        ),
+        (
+            (Unit.M3, [], AssemblyDimension.LENGTH, Decimal("4"), Unit.CM2),
+            # total_length * cross-section_in_cm2 / 100^2 * impact
+            assembly_quantity * 4 / 10000 * value * 2,
+        ),
+        (
+            (Unit.M3, [{"unit": "kg/m^3", "value": "2"}], AssemblyDimension.MASS, Decimal("4"), Unit.PERCENT),
+            # total_kg * percentage / kg_per_m3 * impact
+            assembly_quantity * Decimal("0.04") / 2 * value * 3,
+        ),
+        (
+            (Unit.PCS, [], AssemblyDimension.VOLUME, Decimal("7"), Unit.PCS),
+            # pieces * impact, independent of the assembly quantity
+            7 * value * 4,
+        ),
+    ]
+    items = []
+    for count, ((declared_unit, conversions, dimension, quantity, unit), _) in enumerate(cases):
+        epd = create_epd(f"Batch EPD {count}", declared_unit, conversions)
+        create_epd_impact(epd, value * (count + 1))
+        assembly = create_assembly(dimension=dimension)
+        product = create_product(assembly, epd, quantity, unit)
+        items.append((assembly.dimension, assembly_quantity, floor_area, product))
+
+    batch = calculate_impacts_batch(items)
+
+    assert [b["assembly_id"] for b in batch] == [item[3].assembly.pk for item in items]
+    for b, (_, expected) in zip(batch, cases):
+        # Values are evaluated in float64, not Decimal arithmetic
+        assert float(b["impact_value"]) == pytest.approx(float(expected / floor_area), rel=1e-12)
+    assert calculate_impacts(*items[0])[0]["impact_value"] == batch[0]["impact_value"]
+
+
+@pytest.mark.django_db
+def test_calculate_impacts_batch_unsupported_combination(
+    create_epd, create_epd_impact, create_assembly
+):
+    """Test if the batch engine rejects (dimension, declared_unit) pairs without a rule.
+
+    ARRANGE: Create an M2 EPD in a volume assembly without validating the product.
+    ACT: Calculate impacts in a batch.
+    ASSERT: Raises ValueError.
+    """
+    epd = create_epd("Unsupported", Unit.M2, [])
+    create_epd_impact(epd, Decimal("1"))
+    assembly = create_assembly(dimension=AssemblyDimension.VOLUME)
+    product = StructuralProduct(assembly=assembly, epd=epd, quantity=1, input_unit=Unit.M2)
+
+    with pytest.raises(ValueError):
+        calculate_impacts_batch([(assembly.dimension, 1, 1, product)])
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+from cities_light.models import Country
+
+from pages.models.epd import EPD, EPDLabel, EPDType, MaterialCategory
+from pages.scripts.Label_mapping.GCCA_mapping import GCCA_LABELS
+from pages.scripts.Label_mapping.engine import assign_labels
+
+
+def mapping_rows(category, scores=("A", "B", "C", "D")):
+    return pd.DataFrame(
+        {
+            "level_2_text": [category.name_en] * 3 + ["Unknown category"],
+            "source": ["https://example.org/1", "https://example.org/2", "https://example.org/3", "x"],
+            "type": [EPDType.OFFICIAL] * 4,
+            "comment": [None] * 4,
+            "country": ["Germany"] * 4,
+            "name": ["Concrete C20/25", "Concrete C25/30", "Concrete C30/37", "Concrete C35/45"],
+            "declared_unit": ["m3"] * 4,
+            "label_score": list(scores),
+        }
+    )
+
+
+@pytest.fixture
+def concrete_epds():
+    germany = Country.objects.create(name="Germany", code2="DE", code3="DEU", geoname_id=1)
+    category = MaterialCategory.objects.filter(level=3).first()
+    for i, name in enumerate(["Concrete C20/25", "Concrete C25/30"], start=1):
+        EPD.objects.create(
+            name=name,
+            names=[{"lang": "en", "value": name}],
+            source=f"https://example.org/{i}",
+            type=EPDType.OFFICIAL,
+            country=germany,
+            category=category,
+            declared_unit="m3",
+            declared_amount=1,
+            conversions=[],
+            public=True,
+        )
+    return category
+
+
+@pytest.mark.django_db
+def test_assign_labels_reports_unmatched_rows(concrete_epds):
+    """
+    ARRANGE: Two stored EPDs and a mapping with two matching rows, one without EPD and one unknown category
+    ACT: Assign the labels, then assign them again with a new score and one off the scale
+    ASSERT: Matching EPDs are labelled and updated in place, the rest is reported
+    """
+    report = assign_labels(GCCA_LABELS, df=mapping_rows(concrete_epds))
+
+    assert report.assigned == 2
+    assert report.unmatched == {2: "No matching EPD", 3: "No matching EPD"}
+    assert dict(EPDLabel.objects.values_list("epd__name", "score")) == {
+        "Concrete C20/25": "A",
+        "Concrete C25/30": "B",
+    }
+
+    report = assign_labels(GCCA_LABELS, df=mapping_rows(concrete_epds, scores=("E", "Z", "C", "D")))
+
+    assert report.assigned == 1
+    assert report.unmatched[1] == (
+        "Score 'Z' is not on the scale of "
+        "'GCCA Global Reference Threshold Low Carbon and Near Zero Emissions Concrete'"
+    )
+    assert dict(EPDLabel.objects.values_list("epd__name", "score")) == {
+        "Concrete C20/25": "E",
+        "Concrete C25/30": "B",
+    }
+
+
+@pytest.mark.django_db
+def test_assign_labels_dry_run_writes_nothing(concrete_epds):
+    """
+    ARRANGE: Two stored EPDs and a matching mapping
+    ACT: Assign the labels as a dry run
+    ASSERT: The matches are reported but no label is stored
+    """
+    report = assign_labels(GCCA_LABELS, dry_run=True, df=mapping_rows(concrete_epds))
+
+    assert report.assigned == 2
+    assert not EPDLabel.objects.exists()
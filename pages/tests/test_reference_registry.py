@@ -0,0 +1,83 @@
+import pytest
+
+from pages.models.assembly import AssemblyCategoryTechnique
+from pages.models.epd import Impact, MaterialCategory
+from pages.views import cache_versions
+from pages.views import reference_registry as registry_module
+from pages.views.reference_registry import reference_registry
+
+
+@pytest.mark.django_db
+def test_reference_registry_lookups_hit_memory(django_assert_num_queries):
+    """
+    ARRANGE: A loaded registry
+    ACT: Look up impacts, categories and classifications repeatedly
+    ASSERT: Each table and the shared version are queried once, later lookups are dictionary hits
+    """
+    impact = Impact.objects.create(impact_category="gwp", life_cycle_stage="a1a3")
+    category = MaterialCategory.objects.get(category_id="1.1")
+    classification = AssemblyCategoryTechnique.objects.filter(technique__isnull=False).first()
+
+    registry_module.get_reference_registry_version()
+
+    # The shared version once, then one query per table
+    with django_assert_num_queries(4):
+        for _ in range(10):
+            registry = reference_registry()
+            assert registry.impact("gwp", "a1a3") == impact
+            assert registry.category(category_id="1.1") == category
+            assert registry.category(name_en=category.name_en, level=category.level) == category
+            assert (
+                registry.classification(
+                    str(classification.category_id), str(classification.technique_id)
+                )
+                == classification
+            )
+
+    assert registry.impact_unit("gwp") == "kgco2e"
+    assert registry.category(category_id="does-not-exist") is None
+
+
+@pytest.mark.django_db
+def test_reference_registry_reloads_after_changes(django_capture_on_commit_callbacks, monkeypatch):
+    """
+    ARRANGE: A loaded registry
+    ACT: Save and commit a category, then bump the shared version as another process would
+    ASSERT: The registry is kept until the commit, then reloaded with the change both times
+    """
+    registry = reference_registry()
+    assert registry.category(category_id="9.9.99") is None
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        MaterialCategory.objects.create(category_id="9.9.99", name_en="Test", level=3)
+    assert reference_registry() is registry
+    for callback in callbacks:
+        callback()
+
+    assert reference_registry() is not registry
+    assert reference_registry().category(category_id="9.9.99").name_en == "Test"
+
+    registry = reference_registry()
+    registry_module.cache.set(registry_module.VERSION_KEY, 0, None)
+    monkeypatch.setattr(registry_module, "VERSION_CHECK_INTERVAL", -1)
+    assert reference_registry() is not registry
+
+
+@pytest.mark.django_db
+def test_reference_registry_not_bumped_while_migrating(django_capture_on_commit_callbacks):
+    """
+    ARRANGE: A loaded registry and a started migrate run
+    ACT: Save a category, then finish the run
+    ASSERT: Nothing is written to the cache until migrate is done, then the registry reloads
+    """
+    registry = reference_registry()
+    cache_versions.start_migrating(sender=None)
+    try:
+        with django_capture_on_commit_callbacks() as callbacks:
+            MaterialCategory.objects.create(category_id="9.9.98", name_en="Migrated", level=3)
+    finally:
+        cache_versions.finish_migrating(sender=None)
+
+    assert not callbacks
+    assert reference_registry() is not registry
+    assert reference_registry().category(category_id="9.9.98").name_en == "Migrated"
@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+import pytest
+
+from pages.models.assembly import StructuralProduct
+from pages.models.epd import EPD, Unit
+from pages.models.scenario import Scenario, ScenarioAssembly
+from pages.views.building.impact_results import get_structural_impact_records, refresh_building_results
+from pages.views.building.scenario_sweep import Substitution, category_sweep, parse_substitutions, sweep_scenarios
+from pages.tests.test_impact_calculation import (
+    create_assembly,
+    create_epd,
+    create_epd_impact,
+    create_impact,
+    create_product,
+)
+from pages.tests.test_scenarios import baseline
+
+
+@pytest.mark.django_db
+def test_sweep_ranks_substitutions(baseline, create_epd, create_epd_impact):
+    """
+    ARRANGE: A building with a screed floor and a timber wall, and EPDs to try in the floor
+    ACT: Sweep the substitutions
+    ASSERT: Variants are ranked by GWP, unusable EPDs are reported and nothing is written
+    """
+    building, (floor, wall), floor_product, timber = baseline
+    refresh_building_results(building.pk)
+    foil = create_epd("Foil", Unit.KG, [])
+    create_epd_impact(foil, Decimal("1"))
+    products = StructuralProduct.objects.count()
+
+    results = sweep_scenarios(
+        building.pk,
+        [
+            Substitution(epd_id=timber.pk, name="Timber floor", assembly_id=floor.assembly_id),
+            Substitution(epd_id=foil.pk, name="Foil floor", assembly_id=floor.assembly_id),
+            Substitution(epd_id=floor_product.epd_id, name="Screed wall", assembly_id=wall.assembly_id),
+        ],
+    )
+
+    assert [(r["rank"], r["name"]) for r in results] == [
+        (1, "Timber floor"),
+        (2, "Baseline"),
+        (3, "Screed wall"),
+        (None, "Foil floor"),
+    ]
+    timber_floor, base, screed_wall, foil_floor = results
+    # 10 m2 * 5 cm * 100 / 100 / 10 m2 + the wall
+    assert timber_floor["gwp_a1a3"] == pytest.approx(25)
+    assert timber_floor["gwp_delta"] == pytest.approx(-45)
+    assert timber_floor["products"] == 1
+    # The unchanged building equals its stored results
+    assert base["gwp_a1a3"] == pytest.approx(
+        sum(
+            r["impact_value"]
+            for r in get_structural_impact_records(building.pk)
+            if r["impact_type"] == "gwp a1a3"
+        )
+    )
+    # 20 m2 * 10 cm * 2000 kg/m3 / 100 * 0.5 / 10 m2 + the floor
+    assert screed_wall["gwp_a1a3"] == pytest.approx(250)
+    assert foil_floor["gwp_a1a3"] is None
+    assert foil_floor["error"]
+    assert StructuralProduct.objects.count() == products
+    floor_product.refresh_from_db()
+    assert floor_product.epd_id != timber.pk
+
+
+@pytest.mark.django_db
+def test_sweep_of_scenario_and_category(baseline, create_epd, create_epd_impact, django_assert_max_num_queries):
+    """
+    ARRANGE: A scenario halving the floor, and many EPDs in the category of the screed
+    ACT: Sweep every EPD of the category into the floor of the scenario
+    ASSERT: One variant per EPD, in a number of queries independent of the variants
+    """
+    building, (floor, wall), floor_product, timber = baseline
+    scenario = Scenario.objects.create(building=building, name="Small floor")
+    ScenarioAssembly.objects.create(scenario=scenario, building_assembly=floor, quantity=Decimal("5"))
+    screeds = [create_epd(f"Screed {i}", Unit.M3, []) for i in range(10)]
+    for i, screed in enumerate(screeds):
+        create_epd_impact(screed, Decimal(i))
+    category_id = floor_product.epd.category_id
+    substitutions = category_sweep(category_id, assembly_id=floor.assembly_id)
+
+    with django_assert_max_num_queries(15):
+        results = sweep_scenarios(building.pk, substitutions, scenario)
+
+    assert len(results) == EPD.objects.filter(category_id=category_id).count() + 1
+    base = next(r for r in results if r["name"] == "Baseline")
+    # Half the floor plus the wall
+    assert base["gwp_a1a3"] == pytest.approx(45)
+    best = results[0]
+    # 5 m2 * 5 cm * 0 / 100 / 10 m2 + the wall
+    assert best["epd_id"] == screeds[0].pk
+    assert best["gwp_a1a3"] == pytest.approx(20)
+
+
+@pytest.mark.django_db
+def test_sweep_refuses_unusable_input(baseline):
+    """
+    ARRANGE: The building without a floor area
+    ACT: Parse a request body that is not an object, and sweep the building
+    ASSERT: Both are refused with a ValueError, the view answers 400 for those
+    """
+    building, _, _, timber = baseline
+    building.total_floor_area = 0
+    building.save()
+
+    with pytest.raises(ValueError):
+        parse_substitutions([{"epd": str(timber.pk)}])
+    with pytest.raises(ValueError):
+        sweep_scenarios(building.pk, [Substitution(epd_id=timber.pk)])
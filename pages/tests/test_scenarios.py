@@ -0,0 +1,195 @@
+from decimal import Decimal
+
+import pytest
+
+from pages.models.assembly import Assembly, AssemblyDimension
+from pages.models.building import Building, BuildingAssembly, ClimateZone, OperationalProduct
+from pages.models.epd import Unit
+from pages.models.scenario import Scenario, ScenarioAssembly, ScenarioProduct
+from pages.scripts.assembly_cloning import clone_assemblies
+from pages.views.building.impact_results import refresh_building_results
+from pages.views.building.impact_snapshot import build_building_snapshot, snapshot_cache_key
+from pages.views.building.scenarios import (
+    reset_scenario,
+    resolve_building,
+    save_operational_products,
+    set_component,
+)
+from pages.tests.test_impact_calculation import (
+    create_assembly,
+    create_epd,
+    create_epd_impact,
+    create_impact,
+    create_product,
+)
+
+
+@pytest.fixture
+def baseline(create_impact, create_epd, create_epd_impact, create_assembly, create_product):
+    """A 10 m2 building with a screed floor and a timber wall, 50 and 20 kg CO2e per m2."""
+    building = Building.objects.create(
+        name="Scenario Building",
+        climate_zone=ClimateZone.COLD,
+        total_floor_area=Decimal("10"),
+    )
+    screed = create_epd("Screed", Unit.KG, [{"unit": "kg/m^3", "value": "2000"}])
+    create_epd_impact(screed, Decimal("0.5"))
+    timber = create_epd("Timber", Unit.M3, [])
+    create_epd_impact(timber, Decimal("100"))
+    floor = create_assembly(AssemblyDimension.AREA)
+    floor_product = create_product(floor, screed, Decimal("5"), Unit.CM)
+    wall = create_assembly(AssemblyDimension.AREA)
+    create_product(wall, timber, Decimal("10"), Unit.CM)
+    links = [
+        BuildingAssembly.objects.create(
+            building=building, assembly=assembly, quantity=Decimal(quantity), reporting_life_cycle=50
+        )
+        for assembly, quantity in ((floor, "10"), (wall, "20"))
+    ]
+    return building, links, floor_product, timber
+
+
+@pytest.mark.django_db
+def test_scenario_overlays_overrides(baseline):
+    """
+    ARRANGE: A scenario that halves the floor, swaps its screed for timber, removes the wall and adds a copy of it
+    ACT: Resolve the building with and without the scenario
+    ASSERT: Only the resolved scenario changes, nothing of the building is written
+    """
+    building, (floor, wall), floor_product, timber = baseline
+    scenario = Scenario.objects.create(building=building, name="Timber floor")
+    ScenarioAssembly.objects.create(scenario=scenario, building_assembly=floor, quantity=Decimal("5"))
+    ScenarioProduct.objects.create(scenario=scenario, product=floor_product, epd=timber, quantity=Decimal("2"))
+    ScenarioAssembly.objects.create(scenario=scenario, building_assembly=wall, removed=True)
+    ScenarioAssembly.objects.create(scenario=scenario, assembly=wall.assembly, quantity=Decimal("4"))
+
+    resolved = resolve_building(building.pk, scenario)
+
+    assert [(b.assembly_id, b.quantity) for b in resolved.building_assemblies] == [
+        (floor.assembly_id, Decimal("5")),
+        (wall.assembly_id, Decimal("4")),
+    ]
+    (product,) = resolved.building_assemblies[0].assembly.prefetched_products
+    assert (product.epd_id, product.quantity) == (timber.pk, Decimal("2"))
+    assert [(b.assembly_id, b.quantity) for b in resolve_building(building.pk).building_assemblies] == [
+        (floor.assembly_id, Decimal("10")),
+        (wall.assembly_id, Decimal("20")),
+    ]
+    floor_product.refresh_from_db()
+    assert floor_product.epd_id != timber.pk
+
+
+@pytest.mark.django_db
+def test_resolve_queries_independent_of_overrides(baseline, django_assert_max_num_queries):
+    """
+    ARRANGE: Two scenarios, one without and one with overrides
+    ACT: Resolve both
+    ASSERT: Overrides add a fixed number of queries
+    """
+    building, (floor, wall), floor_product, timber = baseline
+    plain = Scenario.objects.create(building=building, name="Plain")
+    changed = Scenario.objects.create(building=building, name="Changed")
+    ScenarioAssembly.objects.create(scenario=changed, building_assembly=floor, quantity=Decimal("5"))
+    ScenarioAssembly.objects.create(scenario=changed, building_assembly=wall, quantity=Decimal("5"))
+    ScenarioProduct.objects.create(scenario=changed, product=floor_product, epd=timber)
+
+    with django_assert_max_num_queries(20) as plain_queries:
+        resolve_building(building.pk, plain)
+    with django_assert_max_num_queries(len(plain_queries) + 2):
+        resolve_building(building.pk, changed)
+
+
+@pytest.mark.django_db
+def test_snapshot_overlays_scenario(baseline):
+    """
+    ARRANGE: A building with stored results and a scenario halving the floor and removing the wall
+    ACT: Build the snapshot of the building with and without the scenario
+    ASSERT: The scenario recalculates what it changes only, the building keeps its results
+    """
+    building, (floor, wall), floor_product, timber = baseline
+    refresh_building_results(building.pk)
+    building.refresh_from_db()
+    scenario = Scenario.objects.create(building=building, name="Half floor")
+    key = snapshot_cache_key(building, scenario)
+    set_component(scenario, floor.assembly, Decimal("5"), floor)
+    ScenarioAssembly.objects.create(scenario=scenario, building_assembly=wall, removed=True)
+
+    base = build_building_snapshot(building)
+    changed = build_building_snapshot(building, scenario)
+
+    assert base.assembly_gwp == pytest.approx({floor.assembly_id: 50, wall.assembly_id: 20})
+    assert changed.assembly_gwp == pytest.approx({floor.assembly_id: 25})
+    assert {r["assembly_id"] for r in changed.structural_records} == {floor.assembly_id}
+    scenario.refresh_from_db()
+    assert snapshot_cache_key(building, scenario) != key
+
+
+@pytest.mark.django_db
+def test_edit_copies_one_assembly_and_reset_drops_it(baseline):
+    """
+    ARRANGE: A scenario with a copy of the floor whose screed is swapped for timber
+    ACT: Resolve the scenario, then reset it
+    ASSERT: Only the floor is copied, the building keeps its own and the reset deletes the copy
+    """
+    building, (floor, wall), floor_product, timber = baseline
+    scenario = Scenario.objects.create(building=building, name="Timber floor")
+    copy = clone_assemblies([floor.assembly])[floor.assembly_id]
+    copy.structuralproduct_set.update(epd=timber, quantity=Decimal("2"))
+    set_component(scenario, copy, floor.quantity, floor)
+
+    resolved = resolve_building(building.pk, scenario)
+
+    assert [b.assembly_id for b in resolved.building_assemblies] == [copy.pk, wall.assembly_id]
+    assert resolved.changed_assembly_ids == {floor.assembly_id, copy.pk}
+    assert ScenarioAssembly.objects.get(scenario=scenario).quantity is None
+    floor_product.refresh_from_db()
+    assert floor_product.epd_id != timber.pk
+
+    reset_scenario(scenario)
+
+    assert not Assembly.objects.filter(pk=copy.pk).exists()
+    assert [b.assembly_id for b in resolve_building(building.pk, scenario).building_assemblies] == [
+        floor.assembly_id,
+        wall.assembly_id,
+    ]
+
+
+@pytest.mark.django_db
+def test_operational_products_saved_as_overrides(baseline):
+    """
+    ARRANGE: A building burning 3 kg of screed and 1 m3 of timber
+    ACT: Save changed rows in a scenario, then save again with only the screed changed
+    ASSERT: The scenario shows the last rows and stores only their changes, the building keeps its products
+    """
+    building, links, floor_product, timber = baseline
+    screed = floor_product.epd
+    for epd, quantity, unit in ((screed, "3", Unit.KG), (timber, "1", Unit.M3)):
+        OperationalProduct.objects.create(building=building, epd=epd, quantity=Decimal(quantity), input_unit=unit)
+    scenario = Scenario.objects.create(building=building, name="Less timber")
+
+    save_operational_products(
+        scenario,
+        [
+            {"id": str(screed.pk), "quantity": "4", "unit": Unit.KG, "description": None},
+            {"id": str(timber.pk), "quantity": "0.5", "unit": Unit.M3, "description": "New"},
+        ],
+    )
+    save_operational_products(
+        scenario,
+        [
+            {"id": str(screed.pk), "quantity": "5", "unit": Unit.KG, "description": None},
+            {"id": str(timber.pk), "quantity": "1", "unit": Unit.M3, "description": None},
+        ],
+    )
+
+    resolved = resolve_building(building, scenario, structural=False, operational=True)
+    assert [(p.epd_id, p.quantity) for p in resolved.operational_products] == [
+        (screed.pk, Decimal("5")),
+        (timber.pk, Decimal("1")),
+    ]
+    # The timber row equals the building's, only the screed is overridden
+    assert scenario.operational_overrides.count() == 1
+    assert list(building.operational_products.order_by("pk").values_list("quantity", flat=True)) == [
+        Decimal("3"),
+        Decimal("1"),
+    ]
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pages.models.epd import MaterialCategory
+from pages.views.select_lists import select_lists
+
+
+@pytest.fixture
+def get_select_list(rf):
+    def _get_select_list(url, **headers):
+        request = rf.get(url, **headers)
+        # Stand-in for a logged-in user, the lists are the same for everyone
+        request.user = SimpleNamespace(is_authenticated=True)
+        return select_lists(request)
+
+    return _get_select_list
+
+
+@pytest.mark.django_db
+def test_select_lists_revalidation(django_capture_on_commit_callbacks, get_select_list):
+    """Test if dropdown fragments are revalidated with ETags and invalidated on change.
+
+    ARRANGE: Request the subcategories of a material category.
+    ACT: Repeat with the ETag, then rename a subcategory and repeat again.
+    ASSERT: 304 while unchanged, fresh content after the change.
+    """
+    category = MaterialCategory.objects.get(category_id="1")
+    url = f"/select_lists/?category={category.pk}"
+
+    response = get_select_list(url)
+    assert response.status_code == 200
+    assert "Binder" in response.content.decode()
+    etag = response["ETag"]
+
+    response = get_select_list(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    binder = MaterialCategory.objects.get(category_id="1.1")
+    with django_capture_on_commit_callbacks() as callbacks:
+        binder.name_en = "Binders"
+        binder.save()
+    # Not visible before the change commits
+    assert get_select_list(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    for callback in callbacks:
+        callback()
+
+    response = get_select_list(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "Binders" in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_select_lists_read_version_once(django_assert_num_queries, get_select_list):
+    """Test if a revalidated dropdown costs one lookup of the shared version.
+
+    ARRANGE: Request the subcategories of a material category.
+    ACT: Repeat with the ETag.
+    ASSERT: 304 after a single query.
+    """
+    category = MaterialCategory.objects.get(category_id="1")
+    url = f"/select_lists/?category={category.pk}"
+    etag = get_select_list(url)["ETag"]
+
+    with django_assert_num_queries(1):
+        assert get_select_list(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
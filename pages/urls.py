@@ -11,6 +11,7 @@ from .views.resources import resources
 from .views.home import buildings_list
 from .views.building.building import building
 from .views.building.building_simulation import building_simulation
+from .views.building.scenario_sweep import building_scenario_sweep
 from .views.assembly.assembly import component_edit
 from .views.assembly.assembly_templates import assembly_templates_list, copy_template
 from .views.assembly.assembly_template_management import (
@@ -48,6 +49,11 @@ urlpatterns = [
         building_simulation,
         name="building_simulation",
     ),
+    path(
+        "building/<uuid:building_id>/scenario-sweep",
+        building_scenario_sweep,
+        name="building_scenario_sweep",
+    ),
     path("component/<uuid:building_id>/_new", component_edit, name="component"),
     path(
         "component/<uuid:assembly_id>/<uuid:building_id>/",
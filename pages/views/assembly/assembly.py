@@ -1,7 +1,7 @@
 from datetime import datetime
 import logging
 
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
@@ -9,7 +9,7 @@ from django.views.decorators.http import require_http_methods
 
 from pages.forms.epds_filter_form import EPDsFilterForm
 from pages.models.assembly import Assembly, AssemblyDimension, StructuralProduct
-from pages.models.building import Building, BuildingAssembly, BuildingAssemblySimulated
+from pages.models.building import Building, BuildingAssembly
 from pages.forms.assembly_form import AssemblyForm
 
 from pages.models.epd import EPD
@@ -17,6 +17,11 @@ from pages.models.epd import EPD
 
 from pages.views.assembly.epd_processing import SelectedEPD, get_epd_list
 from pages.views.assembly.save_to_assembly import save_assembly
+from pages.views.building.scenarios import (
+    apply_scenario_products,
+    current_scenario,
+    find_component,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -67,7 +72,7 @@ def component_edit(request, assembly_id=None, building_id=None):
 
     if request.method == "POST" and request.POST.get("action") == "form_submission":
         return handle_assembly_submission(
-            request, assembly, building, context["simulation"], is_template_edit
+            request, assembly, building, context.get("scenario"), is_template_edit
         )
 
     elif (
@@ -114,7 +119,7 @@ def set_up_template_edit_view(request, building_id, assembly_id):
     # For template editing, we don't need a real building
     building = None
     
-    epd_list, dimension = get_epd_list(request, assembly.dimension if assembly else AssemblyDimension.AREA, operational=False)
+    epd_list, dimension = get_epd_list(request, assembly.dimension if assembly else AssemblyDimension.AREA, operational=False, keyset=True)
     
     req = request.POST if request.method == "POST" else request.GET
     context = {
@@ -134,14 +139,21 @@ def set_up_view(request, building_id, assembly_id):
     """Fetch objects and create baseline context."""
     simulation = request.GET.get("simulation") == "True"
     template_id = request.GET.get("template_id")
-    if simulation:
-        BuildingAssemblyModel = BuildingAssemblySimulated
-    else:
-        BuildingAssemblyModel = BuildingAssembly
+    scenario = None
 
-    if assembly_id:
+    if simulation:
+        # The assembly as the selected scenario shows it
+        building = get_object_or_404(Building, pk=building_id)
+        scenario = current_scenario(building, create=True)
+        assembly = None
+        if assembly_id:
+            component = find_component(scenario, assembly_id)
+            if component is None:
+                raise Http404("The scenario has no such assembly")
+            assembly = component.assembly
+    elif assembly_id:
         building_assembly = get_object_or_404(
-            BuildingAssemblyModel.objects.select_related(),
+            BuildingAssembly.objects.select_related(),
             assembly_id=assembly_id,
             building_id=building_id,
         )
@@ -159,7 +171,7 @@ def set_up_view(request, building_id, assembly_id):
         except Assembly.DoesNotExist:
             logger.warning(f"Template {template_id} not found or not a template")
 
-    epd_list, dimension = get_epd_list(request, assembly.dimension if assembly else (template_assembly.dimension if template_assembly else AssemblyDimension.AREA), operational=False)
+    epd_list, dimension = get_epd_list(request, assembly.dimension if assembly else (template_assembly.dimension if template_assembly else AssemblyDimension.AREA), operational=False, keyset=True)
 
     req = request.POST if request.method == "POST" else request.GET
     context = {
@@ -170,23 +182,24 @@ def set_up_view(request, building_id, assembly_id):
         "epd_filters_form": EPDsFilterForm(req),
         "dimension": dimension,
         "simulation": simulation,
+        "scenario": scenario,
         "template_assembly": template_assembly,  # Add template data to context
     }
     return assembly, building, context
 
 
-def handle_assembly_submission(request, assembly, building, simulation, is_template_edit=False):
+def handle_assembly_submission(request, assembly, building, scenario, is_template_edit=False):
     # Get template_id if this is a new assembly created from template
     # Check POST data for template_id from hidden form field
     template_id = None if assembly else request.POST.get("template_id")
-    save_assembly(request, assembly, building, simulation, is_template_edit=is_template_edit, template_id=template_id)
+    save_assembly(request, assembly, building, scenario, is_template_edit=is_template_edit, template_id=template_id)
 
     response = JsonResponse({"message": "Redirecting"})
 
     if is_template_edit:
         # Redirect to template management page after editing template
         response["HX-Redirect"] = reverse("assembly_template_management")
-    elif simulation:
+    elif scenario is not None:
         response["HX-Redirect"] = reverse(
             "building_simulation", kwargs={"building_id": building.pk}
         )
@@ -214,6 +227,8 @@ def handle_assembly_load(building_id, assembly, context):
             )
         )
 
+        if assembly and context.get("scenario"):
+            products = apply_scenario_products(context["scenario"], list(products))
         selected_epds = [SelectedEPD.parse_product(p) for p in products]
         context["selected_epds"] = selected_epds
         context["selected_epds_ids"] = [
@@ -225,14 +240,14 @@ def handle_assembly_load(building_id, assembly, context):
         context["form"] = AssemblyForm(
             instance=template_assembly,
             building_id=building_id,
-            simulation=context.get("simulation")
+            scenario=context.get("scenario"),
         )
         context["form"].initial["name"] = f"{template_assembly.name} (Copy)"
         context["form"].initial["is_template"] = False
         context["using_template"] = True
     else:
         context["form"] = AssemblyForm(
-            instance=assembly, building_id=building_id, simulation=context.get("simulation")
+            instance=assembly, building_id=building_id, scenario=context.get("scenario")
         )
 
     context["dimension"] = source_assembly.dimension if source_assembly else AssemblyDimension.AREA
@@ -263,7 +278,6 @@ def handle_template_assembly_load(assembly, context):
     context["form"] = AssemblyForm(
         instance=assembly,
         building_id='00000000-0000-0000-0000-000000000000',
-        simulation=context.get("simulation"),
         template_edit=True
     )
     context["dimension"] = assembly.dimension if assembly else AssemblyDimension.AREA
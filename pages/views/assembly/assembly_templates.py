@@ -10,7 +10,7 @@ from django.urls import reverse
 from django.views.decorators.http import require_http_methods
 
 from pages.models.assembly import Assembly
-from pages.models.building import Building, BuildingAssembly, BuildingAssemblySimulated
+from pages.models.building import Building, BuildingAssembly
 from pages.forms.assembly_template_filter_form import AssemblyTemplateFilterForm
 from pages.views.assembly.assembly_template_filtering import get_filtered_assembly_templates
 from pages.views.assembly.assembly_template_processing import get_paginated_templates, AssemblyTemplateLazyProcessor
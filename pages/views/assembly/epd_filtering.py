@@ -1,9 +1,11 @@
-from django.db.models import Q
+from django.db.models import F, Q
 from django.db.models.manager import BaseManager
-from django.shortcuts import get_object_or_404
+from django.http import Http404
 
 from pages.models.assembly import AssemblyDimension
 from pages.models.epd import EPD, EPDType, MaterialCategory, Unit
+from pages.views.assembly.epd_search import search_epds
+from pages.views.material_category_tree import material_category_tree
 
 
 def filter_by_dimension(epds: BaseManager[EPD], dimension: AssemblyDimension):
@@ -19,31 +21,30 @@ def filter_by_dimension(epds: BaseManager[EPD], dimension: AssemblyDimension):
     |     pieces               |     Set a quantity       |     Set a quantity         |     Set a quantity       |     Set a quantity         |
 
     """
-    # Requires postgres backend
     additional_filters = Q()  # Equals no filter
     match dimension:
         case AssemblyDimension.AREA:
             declared_units = [Unit.M3, Unit.M2, Unit.KG, Unit.PCS]
             # Limit to KG EPDs that have gross density
             additional_filters = (
-                Q(declared_unit=Unit.KG) & Q(conversions__contains=[{"unit": "kg/m^3"}])
+                Q(declared_unit=Unit.KG) & Q(has_volume_density=True)
             ) | ~Q(declared_unit=Unit.KG)
         case AssemblyDimension.VOLUME:
             declared_units = [Unit.M3, Unit.KG, Unit.PCS]
             # Limit to KG EPDs that have gross density
             additional_filters = (
-                Q(declared_unit=Unit.KG) & Q(conversions__contains=[{"unit": "kg/m^3"}])
+                Q(declared_unit=Unit.KG) & Q(has_volume_density=True)
             ) | ~Q(declared_unit=Unit.KG)
         case AssemblyDimension.MASS:
             declared_units = [Unit.M3, Unit.KG, Unit.PCS]
             additional_filters = (
-                Q(declared_unit=Unit.M3) & Q(conversions__contains=[{"unit": "kg/m^3"}])
+                Q(declared_unit=Unit.M3) & Q(has_volume_density=True)
             ) | ~Q(declared_unit=Unit.M3)
         case AssemblyDimension.LENGTH:
             declared_units = [Unit.M3, Unit.M, Unit.KG, Unit.PCS]
             # Limit to KG EPDs that have gross density
             additional_filters = (
-                Q(declared_unit=Unit.KG) & Q(conversions__contains=[{"unit": "kg/m^3"}])
+                Q(declared_unit=Unit.KG) & Q(has_volume_density=True)
             ) | ~Q(declared_unit=Unit.KG)
         case _:
             raise ValueError(f"Unsupported dimension '{dimension}'")
@@ -51,19 +52,32 @@ def filter_by_dimension(epds: BaseManager[EPD], dimension: AssemblyDimension):
     return epds.filter(declared_unit__in=declared_units).filter(additional_filters)
 
 
+def get_category_or_404(pk) -> MaterialCategory:
+    if category := material_category_tree().get(int(pk)):
+        return category
+    raise Http404("No MaterialCategory matches the given query.")
+
+
+def get_energy_carrier_category_ids() -> list[int]:
+    """Categories below "9.2 Energy carrier - delivery free user"."""
+    tree = material_category_tree()
+    energy_carriers = tree.by_category_id.get("9.2")
+    return [c.pk for c in tree.children(energy_carriers.pk)] if energy_carriers else []
+
+
 def get_filtered_epd_list(request, dimension=None, operational=False):
     # Start with the base queryset
     filtered_epds = EPD.objects.exclude(declared_unit=Unit.UNKNOWN).order_by("id")
     if operational:
         # TODO: Adapt with Ökobaudat operational EPDs are added
         filtered_epds = filtered_epds.filter(
-            category__parent__category_id="9.2",
+            category__in=get_energy_carrier_category_ids(),
             declared_unit=Unit.KWH,
             type=EPDType.GENERIC,
         )
     else:
         filtered_epds = filtered_epds.filter(
-            ~(Q(category__parent__category_id="9.2") | Q(declared_unit=Unit.KWH))
+            ~(Q(category__in=get_energy_carrier_category_ids()) | Q(declared_unit=Unit.KWH))
         )
 
     if (
@@ -79,31 +93,21 @@ def get_filtered_epd_list(request, dimension=None, operational=False):
             filtered_epds = filter_by_dimension(filtered_epds, dimension)
 
         if childcategory := req.get("childcategory"):
-            childcategory_object = get_object_or_404(
-                MaterialCategory, pk=int(childcategory)
-            )
+            childcategory_object = get_category_or_404(childcategory)
             filtered_epds = filtered_epds.filter(category=childcategory_object)
         elif subcategory := req.get("subcategory"):
-            subcategory_object = get_object_or_404(
-                MaterialCategory, pk=int(subcategory)
-            )
+            subcategory_object = get_category_or_404(subcategory)
             filtered_epds = filtered_epds.filter(
-                category__category_id__istartswith=subcategory_object.category_id
+                category__in=material_category_tree().subtree_ids(subcategory_object.pk)
             )
         elif category := req.get("category"):
-            category_object = get_object_or_404(MaterialCategory, pk=int(category))
+            category_object = get_category_or_404(category)
             filtered_epds = filtered_epds.filter(
-                category__category_id__istartswith=category_object.category_id
+                category__in=material_category_tree().subtree_ids(category_object.pk)
             )
 
         if search_query := req.get("search_query"):
-            search_terms = search_query.split()
-            query = Q()
-            # Add a case-insensitive filter for each search term
-            for term in search_terms:
-                query &= Q(name__icontains=term)
-
-            filtered_epds = filtered_epds.filter(query)
+            filtered_epds = search_epds(filtered_epds, search_query)
 
         if country := req.get("country"):
             filtered_epds = filtered_epds.filter(
@@ -112,6 +116,26 @@ def get_filtered_epd_list(request, dimension=None, operational=False):
 
         if type := req.get("type"):
             filtered_epds = filtered_epds.filter(type=type)
+
+        if sort := req.get("sort"):
+            filtered_epds = sort_by_impact(filtered_epds, sort, operational)
     elif dimension:
         filtered_epds = filter_by_dimension(filtered_epds, dimension)
     return filtered_epds, dimension
+
+
+def get_impact_sort(sort: str, operational: bool) -> tuple[str | None, bool]:
+    """Maps `sort` ("gwp" or "-gwp") to the summary column and its direction."""
+    if sort not in ("gwp", "-gwp"):
+        return None, False
+    return ("gwp_b6" if operational else "gwp_a1a3"), sort.startswith("-")
+
+
+def sort_by_impact(epds: BaseManager[EPD], sort: str, operational: bool):
+    """Order EPDs by their GWP summary column, `sort` is "gwp" or "-gwp"."""
+    field, descending = get_impact_sort(sort, operational)
+    if field is None:
+        return epds
+    if descending:
+        return epds.order_by(F(field).desc(nulls_last=True), "id")
+    return epds.order_by(F(field).asc(nulls_last=True), "id")
@@ -0,0 +1,140 @@
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from django.core.cache import cache
+from django.db.models import F, Q, QuerySet
+
+COUNT_CACHE_TIMEOUT = 5 * 60  # seconds
+
+
+@dataclass
+class KeysetPage:
+    """One page of a keyset paginated list.
+
+    Iterates like a Django `Page`; the cursors point at the first and last item
+    and are passed back as `cursor` with `direction` "prev" or "next".
+    """
+
+    object_list: list
+    has_next: bool
+    has_previous: bool
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+    count: int
+    is_keyset = True
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+
+class KeysetPaginator:
+    """Paginates a queryset by seeking past the last seen row instead of OFFSET.
+
+    Rows are ordered by `sort_field` (nulls last) and then by primary key, which
+    keeps the order total even when the sort values repeat.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, sort_field=None, descending=False, parse=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.sort_field = sort_field
+        self.descending = descending
+        self.parse = parse or (lambda obj: obj)
+
+    def get_page(self, cursor: Optional[str] = None, direction: str = "next") -> KeysetPage:
+        key = decode_cursor(cursor)
+        backwards = direction == "prev"
+
+        queryset = self.queryset
+        if key is not None:
+            queryset = queryset.filter(self._seek(key, backwards))
+        rows = list(queryset.order_by(*self._ordering(backwards))[: self.per_page + 1])
+
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+            # Going back from the end of the list (no cursor) there is nothing after
+            has_next, has_previous = key is not None, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+
+        return KeysetPage(
+            object_list=[self.parse(row) for row in rows],
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=self._cursor(rows[-1]) if rows else None,
+            previous_cursor=self._cursor(rows[0]) if rows else None,
+            count=cached_count(self.queryset),
+        )
+
+    def _ordering(self, backwards: bool):
+        pk_order = "-pk" if backwards else "pk"
+        if self.sort_field is None:
+            return [pk_order]
+        field = F(self.sort_field)
+        # Reversing "asc nulls last" gives "desc nulls first" and vice versa
+        nulls = {"nulls_first": True} if backwards else {"nulls_last": True}
+        if self.descending != backwards:
+            return [field.desc(**nulls), pk_order]
+        return [field.asc(**nulls), pk_order]
+
+    def _seek(self, key, backwards: bool) -> Q:
+        value, pk = key
+        pk_lookup = "pk__lt" if backwards else "pk__gt"
+        if self.sort_field is None:
+            return Q(**{pk_lookup: pk})
+
+        field = self.sort_field
+        # Strictly past the cursor value in the requested direction
+        past = "lt" if self.descending != backwards else "gt"
+        same_value = Q(**{field: value, pk_lookup: pk})
+        if value is None:
+            same_value = Q(**{f"{field}__isnull": True, pk_lookup: pk})
+            # Nulls sort last, so only other nulls follow; going back every value precedes
+            return same_value | Q(**{f"{field}__isnull": False}) if backwards else same_value
+        seek = Q(**{f"{field}__{past}": value}) | same_value
+        return seek if backwards else seek | Q(**{f"{field}__isnull": True})
+
+    def _cursor(self, obj) -> str:
+        value = getattr(obj, self.sort_field) if self.sort_field else None
+        return encode_cursor((value, str(obj.pk)))
+
+
+def encode_cursor(key) -> str:
+    # Decimal sort values (e.g. the search rank) are kept exact as strings
+    return base64.urlsafe_b64encode(json.dumps(key, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]):
+    """Returns (sort value, pk) or None for a missing or malformed cursor."""
+    if not cursor:
+        return None
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    return value, pk
+
+
+def cached_count(queryset: QuerySet) -> int:
+    """COUNT(*) of a queryset, cached per SQL statement for a few minutes.
+
+    The total is only shown as an indication, so it may lag behind new EPDs.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = "epd-count:" + hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
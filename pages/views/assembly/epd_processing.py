@@ -7,10 +7,13 @@ from django.db.models import Prefetch
 from django.db.models.manager import BaseManager
 
 from pages.models.assembly import AssemblyDimension, StructuralProduct
-from pages.models.epd import EPD, EPDImpact, EPDLabel
+from pages.models.epd import EPD, EPDLabel
 from pages.views.assembly.epd_filtering import (
     get_filtered_epd_list,
+    get_impact_sort,
 )
+from pages.views.assembly.epd_pagination import KeysetPage, KeysetPaginator
+from pages.views.assembly.epd_search import SEARCH_RANK
 
 
 @dataclass
@@ -124,10 +127,8 @@ class LazyProcessor:
             type=epd.type,
             country=epd.country.name if epd.country else "",
             category=epd.category.name_en if epd.category else None,
-            impact_gwp=epd.get_gwp_impact_sum(life_cycle_stage=self.life_cycle_stage),
-            impact_penrt=epd.get_penrt_impact_sum(
-                life_cycle_stage=self.life_cycle_stage
-            ),
+            impact_gwp=getattr(epd, f"gwp_{self.life_cycle_stage}") or 0,
+            impact_penrt=getattr(epd, f"penrt_{self.life_cycle_stage}") or 0,
             conversions=[],
             declared_unit=epd.declared_unit,
             selection_text=sel_text,
@@ -138,13 +139,15 @@ class LazyProcessor:
 
 
 def get_epd_list(
-    request, dimension, operational: bool
-) -> tuple[Page, AssemblyDimension]:
+    request, dimension, operational: bool, keyset: bool = False
+) -> tuple[Page | KeysetPage, AssemblyDimension]:
     # Dimension can never be None, since we need dimension info to parse epds
     filtered_list, dimension = get_filtered_epd_list(
         request, dimension, operational=operational
     )
     fetched_list = prefetch_epds(filtered_list)
+    if keyset:
+        return get_keyset_page(request, fetched_list, dimension, operational), dimension
     # Pagination setup for EPD list
     lazy_queryset = LazyProcessor(fetched_list, dimension, operational)
     paginator = Paginator(lazy_queryset, 5)  # Show 10 items per page
@@ -152,6 +155,20 @@ def get_epd_list(
     return paginator.get_page(page_number), dimension
 
 
+def get_keyset_page(request, epds, dimension, operational: bool) -> KeysetPage:
+    """Seeks to the page after/before `cursor` instead of counting and offsetting."""
+    req = request.POST if request.method == "POST" else request.GET
+    sort_field, descending = get_impact_sort(req.get("sort"), operational)
+    if sort_field is None and SEARCH_RANK in epds.query.annotations:
+        # Most relevant search results first
+        sort_field, descending = SEARCH_RANK, True
+    processor = LazyProcessor(epds, dimension, operational)
+    paginator = KeysetPaginator(
+        epds, 5, sort_field=sort_field, descending=descending, parse=processor.epd_parsing
+    )
+    return paginator.get_page(req.get("cursor"), req.get("direction", "next"))
+
+
 def prefetch_epds(epds: BaseManager[EPD]):
     return (
             epds
@@ -161,16 +178,11 @@ def prefetch_epds(epds: BaseManager[EPD]):
                 "category",
             )
             .prefetch_related(
-            # impacts are through the EPDImpact intermediary; prefetch both sides
+            # impacts are read from the summary columns on EPD, only labels are prefetched
             Prefetch(
                 "epdlabel_set",
                 queryset=EPDLabel.objects.select_related("label"),
                 to_attr="prefetched_epdlabels",
             ),
-           Prefetch(
-               "epdimpact_set",
-               queryset=EPDImpact.objects.select_related("impact"),
-               to_attr="all_impacts",
-           ),
         )
     )
\ No newline at end of file
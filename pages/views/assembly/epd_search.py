@@ -0,0 +1,65 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import DecimalField, Func, Q, TextField, Value
+from django.db.models.functions import Cast
+from django.db.models.manager import BaseManager
+
+from pages.models.epd import EPD, SEARCH_CONFIG
+
+# Annotation holding the relevance of an EPD for the search query
+SEARCH_RANK = "search_rank"
+
+
+class PrefixTerms(Func):
+    """Every word of a search query, split by the parser of `SEARCH_CONFIG`
+    (e.g. "C30/37" is one word), as prefix terms of a raw tsquery.
+
+    Evaluated once per statement, not per row, since it does not refer to the
+    table.
+    """
+
+    template = (
+        "(SELECT string_agg(quote_literal(lexeme) || ':*', ' & ') "
+        f"FROM unnest(to_tsvector('{SEARCH_CONFIG}'::regconfig, %(expressions)s)))"
+    )
+    output_field = TextField()
+
+
+def search_epds(epds: BaseManager[EPD], search_query: str):
+    """Limit EPDs to those whose name or any translation matches every term.
+
+    On PostgreSQL each word, as split by the parser of `SEARCH_CONFIG`, is
+    matched as a prefix against the GIN indexed `EPD.search_text` vector and
+    results are ranked by relevance. Other backends fall back to a substring
+    match without ranking.
+    """
+    if not re.search(r"\w", search_query):
+        return epds
+
+    if connection.vendor != "postgresql":
+        substring_query = Q()
+        for term in search_query.split():
+            substring_query &= Q(search_text__icontains=term)
+        return epds.filter(substring_query)
+
+    # Same expression as the index on EPD, so the planner can use it
+    vector = SearchVector("search_text", config=SEARCH_CONFIG)
+    prefix_query = SearchQuery(
+        PrefixTerms(Value(search_query)), config=SEARCH_CONFIG, search_type="raw"
+    )
+    # Whole word matches rank above matches on a word prefix only
+    word_query = SearchQuery(search_query, config=SEARCH_CONFIG, search_type="plain")
+    # ts_rank is a float4, which does not survive the trip through a page cursor.
+    # Rounded to a numeric it compares exactly.
+    rank = Cast(
+        SearchRank(vector, prefix_query) + SearchRank(vector, word_query),
+        DecimalField(max_digits=15, decimal_places=9),
+    )
+    return (
+        epds.annotate(search_vector=vector)
+        .filter(search_vector=prefix_query)
+        .annotate(**{SEARCH_RANK: rank})
+        .order_by(f"-{SEARCH_RANK}", "id")
+    )
@@ -0,0 +1,136 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from pages.models.assembly import Assembly, AssemblyCategoryTechnique, StructuralProduct
+from pages.models.epd import EPD
+from pages.views.reference_registry import reference_registry
+
+logger = logging.getLogger(__name__)
+
+# Fields a submitted row can change on a stored product
+PRODUCT_FIELDS = ["classification", "input_unit", "quantity", "description"]
+
+
+def build_products(assembly: Assembly, selected_epds: dict) -> list[StructuralProduct]:
+    """Unsaved products for the rows of `parse_selected_epds`, validated in memory.
+
+    EPDs are fetched in one query and classifications come from the reference
+    registry. Raises the same ValidationError as `StructuralProduct.clean` for
+    units the EPD does not support.
+    """
+    rows = list(selected_epds.values())
+    pks = {row["epd_id"]: _as_pk(row["epd_id"]) for row in rows}
+    epds = EPD.objects.only("id", "name", "declared_unit", "conversions").in_bulk(
+        {pk for pk in pks.values() if pk is not None}
+    )
+    registry = reference_registry()
+    dimension = None if assembly.is_boq else assembly.dimension
+
+    products = []
+    for row in rows:
+        epd = epds.get(pks[row["epd_id"]])
+        if epd is None:
+            raise EPD.DoesNotExist(f"EPD {row['epd_id']} does not exist")
+        classification = registry.classification(row.get("category"), row.get("technique"))
+        if classification is None:
+            raise AssemblyCategoryTechnique.DoesNotExist(
+                f"No classification for category {row.get('category')} and technique {row.get('technique')}"
+            )
+        product = StructuralProduct(
+            epd=epd,
+            assembly=assembly,
+            # Rounded like the column, so unchanged rows compare equal
+            quantity=Decimal(str(row["quantity"])).quantize(Decimal("0.01")),
+            input_unit=row["unit"],
+            description=row["description"],
+            classification=classification,
+        )
+        _, expected_units = epd.get_epd_info(dimension)
+        if product.input_unit not in expected_units:
+            raise ValidationError(
+                {
+                    "input_unit": (
+                        f"The unit '{product.input_unit}' is not valid for the epd '{epd.name}'. "
+                        f"Expected unit: '{expected_units}'."
+                    )
+                }
+            )
+        products.append(product)
+    return products
+
+
+def diff_products(assembly: Assembly, products: list[StructuralProduct]) -> tuple[list, list, list]:
+    """The products to create, the stored ones to update and the pks to delete
+    to make `products` the products of the assembly. Nothing is written.
+
+    Stored products are paired with the new ones by EPD, in order.
+    """
+    stored = defaultdict(list)
+    for product in assembly.structuralproduct_set.order_by("pk"):
+        stored[product.epd_id].append(product)
+
+    to_create, to_update = [], []
+    for product in products:
+        if stored[product.epd_id]:
+            current = stored[product.epd_id].pop(0)
+            if any(_value(current, f) != _value(product, f) for f in PRODUCT_FIELDS):
+                for f in PRODUCT_FIELDS:
+                    setattr(current, f, getattr(product, f))
+                to_update.append(current)
+        else:
+            to_create.append(product)
+    to_delete = [p.pk for remaining in stored.values() for p in remaining]
+    return to_create, to_update, to_delete
+
+
+@transaction.atomic
+def sync_products(assembly: Assembly, products: list[StructuralProduct]) -> None:
+    """Makes `products` the products of the assembly, touching only what changed.
+
+    Pairs of `diff_products` that differ are updated, the rest is created or
+    deleted, each in one statement.
+    """
+    to_create, to_update, to_delete = diff_products(assembly, products)
+
+    if to_delete:
+        StructuralProduct.objects.filter(pk__in=to_delete).delete()
+    if to_update:
+        StructuralProduct.objects.bulk_update(to_update, PRODUCT_FIELDS)
+    if to_create:
+        StructuralProduct.objects.bulk_create(to_create)
+    logger.info(
+        "Products of assembly %s: %s created, %s updated, %s deleted",
+        assembly.pk,
+        len(to_create),
+        len(to_update),
+        len(to_delete),
+    )
+
+    if (to_create or to_update) and not to_delete:
+        # Bulk writes skip the signals keeping the building results in sync,
+        # the delete above already sent them
+        from pages.views.building.impact_results import schedule_assembly_refresh
+
+        schedule_assembly_refresh(assembly.pk)
+
+
+def save_products(assembly: Assembly, selected_epds: dict) -> None:
+    sync_products(assembly, build_products(assembly, selected_epds))
+
+
+def _value(product: StructuralProduct, field: str):
+    if field == "classification":
+        return product.classification_id
+    return getattr(product, field)
+
+
+def _as_pk(epd_id):
+    # EPD ids arrive as strings from the form, `in_bulk` keys are UUIDs
+    try:
+        return EPD._meta.pk.to_python(epd_id)
+    except ValidationError:
+        return None
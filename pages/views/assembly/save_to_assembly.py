@@ -1,24 +1,30 @@
 import logging
 
 from django.db import transaction
-from django.db.models import Prefetch
 from django.http import HttpResponseServerError
 
 from pages.forms.assembly_form import AssemblyForm
 from pages.forms.boq_assembly_form import BOQAssemblyForm
-from pages.models.assembly import Assembly, AssemblyCategoryTechnique, StructuralProduct
-from pages.models.building import Building, BuildingAssembly, BuildingAssemblySimulated
-from pages.models.epd import EPD, EPDImpact
+from pages.models.assembly import Assembly
+from pages.models.building import Building, BuildingAssembly
+from pages.models.epd import EPD
+from pages.models.scenario import Scenario
+from pages.scripts.assembly_cloning import clone_assembly
+from pages.views.assembly.product_sync import build_products, diff_products, save_products
+from pages.views.building.scenarios import find_component, set_component
 
 logger = logging.getLogger(__name__)
 
+# Fields of the assembly forms that do not belong to the assembly itself
+LINK_FIELDS = {"quantity", "mode", "is_template"}
+
 
 @transaction.atomic
 def save_assembly(
         request,
         assembly: Assembly,
         building_instance: Building,
-        simulation=False,
+        scenario: Scenario | None = None,
         is_boq=False,
         is_template_edit=False,
         template_id=None,
@@ -28,24 +34,32 @@ def save_assembly(
         save_template(request, assembly, is_boq)
         return None
 
-    # Save to BuildingAssembly or -Simulated, depending on Mode
-    if simulation:
-        BuildingAssemblyModel = BuildingAssemblySimulated
-    else:
-        BuildingAssemblyModel = BuildingAssembly
     assembly_form = BOQAssemblyForm if is_boq else AssemblyForm
     # Bind the form to the existing Assembly instance
     form = assembly_form(
         request.POST,
         instance=assembly,
         building_id=building_instance.pk,
-        simulation=simulation,
+        scenario=scenario,
     )
 
     try:
         if form.is_valid():
             selected_epds = parse_selected_epds(request)
 
+            # In a scenario the assembly of the building is copied on write
+            component = None
+            if scenario is not None and assembly is not None:
+                component = find_component(scenario, assembly.pk)
+                if not component.owned:
+                    if not changes_assembly(form, assembly, selected_epds):
+                        set_component(
+                            scenario, assembly, request.POST.get("quantity", 1), component.link
+                        )
+                        return None
+                    # The form already wrote its values to the instance
+                    form.instance = clone_assembly(assembly)
+
             # DB OPERATIONS
             assembly = form.save()  # Save the updated Assembly instance
             assembly.is_boq = is_boq
@@ -67,38 +81,31 @@ def save_assembly(
 
             assembly.save()
 
-            StructuralProduct.objects.filter(
-                assembly=assembly
-            ).delete()  # create a clean slate
+            # Only the products that changed are written
+            save_products(assembly, selected_epds)
 
-            # Save to products
-            for _, v in selected_epds.items():
-                classification = AssemblyCategoryTechnique.objects.get(
-                    category_id=v.get("category"),
-                    technique_id=v.get("technique") or None,
+            if scenario is not None:
+                set_component(
+                    scenario,
+                    assembly,
+                    request.POST.get("quantity", 1),
+                    component.link if component else None,
+                    reporting_life_cycle=request.POST.get("reporting_life_cycle"),
                 )
-                StructuralProduct.objects.create(
-                    epd_id=v.get("epd_id"),
+            else:
+                BuildingAssembly.objects.update_or_create(
+                    building=building_instance,
                     assembly=assembly,
-                    quantity=v.get("quantity"),
-                    input_unit=v.get("unit"),
-                    description=v.get("description"),
-                    classification=classification,
+                    defaults={
+                        "quantity": request.POST.get(
+                            "quantity", 1
+                        ),  # Get quantity from POST data
+                        "reporting_life_cycle": request.POST.get(
+                            "reporting_life_cycle", 50
+                        ),  # Get reporting_life_cycle from POST data, default to 50
+                    },
                 )
 
-            BuildingAssemblyModel.objects.update_or_create(
-                building=building_instance,
-                assembly=assembly,
-                defaults={
-                    "quantity": request.POST.get(
-                        "quantity", 1
-                    ),  # Get quantity from POST data
-                    "reporting_life_cycle": request.POST.get(
-                        "reporting_life_cycle", 50
-                    ),  # Get reporting_life_cycle from POST data, default to 50
-                },
-            )
-
             # Create template if user enabled save as template
             if create_template:
                 template = assembly.create_template_copy(
@@ -136,7 +143,6 @@ def save_template(request, assembly: Assembly, is_boq=False) -> None:
         request.POST,
         instance=assembly,
         building_id='00000000-0000-0000-0000-000000000000',
-        simulation=False,
         template_edit=True
     )
 
@@ -151,24 +157,7 @@ def save_template(request, assembly: Assembly, is_boq=False) -> None:
             assembly.is_template = True
             assembly.save()
 
-            StructuralProduct.objects.filter(
-                assembly=assembly
-            ).delete()
-
-            # Save to products
-            for _, v in selected_epds.items():
-                classification = AssemblyCategoryTechnique.objects.get(
-                    category_id=v.get("category"),
-                    technique_id=v.get("technique") or None,
-                )
-                StructuralProduct.objects.create(
-                    epd_id=v.get("epd_id"),
-                    assembly=assembly,
-                    quantity=v.get("quantity"),
-                    input_unit=v.get("unit"),
-                    description=v.get("description"),
-                    classification=classification,
-                )
+            save_products(assembly, selected_epds)
 
             # NO BuildingAssembly operations for templates
             logger.info(f"Template {assembly.name} saved successfully by user {request.user}")
@@ -187,6 +176,13 @@ def save_template(request, assembly: Assembly, is_boq=False) -> None:
         raise HttpResponseServerError()
 
 
+def changes_assembly(form, assembly: Assembly, selected_epds: dict) -> bool:
+    """Whether the submitted form changes the assembly itself, not only its quantity."""
+    if any(name not in LINK_FIELDS for name in form.changed_data):
+        return True
+    return any(diff_products(assembly, build_products(assembly, selected_epds)))
+
+
 def parse_selected_epds(request) -> tuple[dict, dict[str, EPD]]:
     """Get user input and db info for selected EPDs."""
     # Identify selected EPDs
@@ -1,7 +1,7 @@
 from datetime import datetime
 import logging
 
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.urls import reverse
 from django.views.decorators.http import require_http_methods
@@ -10,11 +10,16 @@ from django.contrib.auth.decorators import login_required
 from pages.forms.boq_assembly_form import BOQAssemblyForm
 from pages.forms.epds_filter_form import EPDsFilterForm
 from pages.models.assembly import AssemblyCategory, AssemblyDimension, StructuralProduct
-from pages.models.building import Building, BuildingAssembly, BuildingAssemblySimulated
+from pages.models.building import Building, BuildingAssembly
 
 from pages.models.epd import EPD
 from pages.views.assembly.epd_processing import SelectedEPD, get_epd_list
 from pages.views.assembly.save_to_assembly import save_assembly
+from pages.views.building.scenarios import (
+    apply_scenario_products,
+    current_scenario,
+    find_component,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +42,7 @@ def boq_edit(request, building_id, assembly_id=None):
 
     if request.method == "POST" and request.POST.get("action") == "form_submission":
         return handle_assembly_submission(
-            request, assembly, building, context["simulation"]
+            request, assembly, building, context["scenario"]
         )
 
     # Update EPD List
@@ -85,14 +90,22 @@ def boq_edit(request, building_id, assembly_id=None):
 def set_up_view(request, building_id, assembly_id):
     """Fetch objects and create baseline context."""
     simulation = request.GET.get("simulation") == "True"
-    if simulation:
-        BuildingAssemblyModel = BuildingAssemblySimulated
-    else:
-        BuildingAssemblyModel = BuildingAssembly
+    scenario = None
 
-    if assembly_id:
+    if simulation:
+        # The assembly as the selected scenario shows it
+        building = get_object_or_404(Building, pk=building_id)
+        scenario = current_scenario(building, create=True)
+        assembly = None
+        if assembly_id:
+            component = find_component(scenario, assembly_id)
+            if component is None:
+                raise Http404("The scenario has no such assembly")
+            assembly = component.assembly
+            assert assembly.is_boq
+    elif assembly_id:
         building_assembly = get_object_or_404(
-            BuildingAssemblyModel.objects.select_related(),
+            BuildingAssembly.objects.select_related(),
             assembly_id=assembly_id,
             building_id=building_id,
         )
@@ -103,7 +116,7 @@ def set_up_view(request, building_id, assembly_id):
         building = get_object_or_404(Building, pk=building_id)
         assembly = None
 
-    epd_list, _ = get_epd_list(request, None, operational=False)
+    epd_list, _ = get_epd_list(request, None, operational=False, keyset=True)
 
     req = request.POST if request.method == "POST" else request.GET
     context = {
@@ -114,18 +127,19 @@ def set_up_view(request, building_id, assembly_id):
         "epd_filters_form": EPDsFilterForm(request.POST),
         "dimension": None,
         "simulation": simulation,
+        "scenario": scenario,
         "is_boq": True,
     }
     return assembly, building, context
 
 
-def handle_assembly_submission(request, assembly, building, simulation):
-    save_assembly(request, assembly, building, simulation, is_boq=True)
+def handle_assembly_submission(request, assembly, building, scenario):
+    save_assembly(request, assembly, building, scenario, is_boq=True)
     # The redirect shortcut is not working properly with HTMX
     # return redirect("building", building_id=building_instance.id)
     # instead use the following:
     response = JsonResponse({"message": "Redirecting"})
-    if simulation:
+    if scenario is not None:
         response["HX-Redirect"] = reverse(
             "building_simulation", kwargs={"building_id": building.pk}
         )
@@ -149,6 +163,8 @@ def handle_assembly_load(building_id, assembly, context):
                 "classification",
             )    
         )
+        if context.get("scenario"):
+            products = apply_scenario_products(context["scenario"], list(products))
         selected_epds = [SelectedEPD.parse_product(p, True) for p in products]
         context["selected_epds"] = selected_epds
         context["selected_epds_ids"] = [
@@ -156,7 +172,7 @@ def handle_assembly_load(building_id, assembly, context):
         ]
     context["categories"] = AssemblyCategory.objects.all()
     context["form"] = BOQAssemblyForm(
-        instance=assembly, building_id=building_id, simulation=context.get("simulation")
+        instance=assembly, building_id=building_id, scenario=context.get("scenario")
     )
 
     return context
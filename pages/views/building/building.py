@@ -9,19 +9,16 @@ from django.contrib.auth.decorators import login_required
 
 from pages.forms.building_detailed_info import BuildingDetailedInformation
 from pages.forms.building_general_info import BuildingGeneralInformation
-from pages.forms.epds_filter_form import EPDsFilterForm
 from pages.forms.operational_info_form import OperationalInfoForm
 from pages.models.assembly import DIMENSION_UNIT_MAPPING, StructuralProduct
-from pages.models.building import (
-    Building,
-    BuildingAssembly,
-    BuildingAssemblySimulated,
-    OperationalProduct,
-    SimulatedOperationalProduct,
+from pages.models.building import Building, BuildingAssembly, OperationalProduct
+from pages.models.scenario import ScenarioAssembly
+from pages.views.building.impact_snapshot import get_building_snapshot
+from pages.views.building.scenarios import (
+    current_scenario,
+    remove_component,
+    resolve_building,
 )
-from pages.models.epd import EPDImpact, MaterialCategory
-from pages.views.assembly.epd_processing import get_epd_list
-from pages.views.building.impact_calculation import calculate_impacts
 
 from pages.views.building.operational_products.operational_products import (
     get_op_product,
@@ -49,31 +46,15 @@ def building(request, building_id=None):
             case "operational_info":
                 return handle_information_submit(request, building_id, "operational")
             case "filter":
-                return get_op_product_list(request, building_id)
+                return get_op_product_list(request, building_id, simulation=False)
             case "select_op_product":
                 return get_op_product(request, building_id)
             case "save_op_products":
                 handle_op_products_save(request, building_id)
-                context, form, detailedForm, _ = handle_building_load(
-                    request, building_id, simulation=False
-                )
-                context["edit_mode"] = False
-                response = render(
-                    request,
-                    "pages/building/operational_info/operational_product_list.html",
-                    context,
-                )
-                response["HX-Refresh"] = "true"  # Add the HX-Refresh header
-                return response
+                return op_products_saved_response()
             case "edit_products":
-                context, _, _, _ = handle_building_load(
-                    request, building_id, simulation=False
-                )
-                context["edit_mode"] = True
-                return render(
-                    request,
-                    "pages/building/operational_info/operational_products.html",
-                    context,
+                return render_operational_products(
+                    request, building_id, simulation=False, edit_mode=True
                 )
             case _:
                 logger.info("No action defined for the POST request")
@@ -87,7 +68,9 @@ def building(request, building_id=None):
             return handle_assembly_delete(request, building_id, simulation=False)
     elif request.method == "GET":
         if request.GET.get("page"):
-            return get_op_product_list(request, building_id)
+            return get_op_product_list(
+                request, building_id, simulation=request.GET.get("simulation") == "True"
+            )
         # Full reload
         if building_id:
             context, form, detailedForm, operationalInfoForm = handle_building_load(
@@ -116,108 +99,145 @@ def building(request, building_id=None):
 
 
 def handle_building_load(request, building_id, simulation):
+    """Context and forms of the full building page.
+
+    The operational EPD picker is not part of it, its modal loads it from
+    `get_op_product_list` when opened.
+    """
+    building = get_building(request, building_id, simulation)
+    context = {
+        "building_id": building.id,
+        "building": building,
+        **get_structural_context(building),
+        **get_operational_context(building),
+        "edit_mode": False,
+        "simulation": simulation,
+    }
     if simulation:
-        BuildingAssemblyModel = BuildingAssemblySimulated
-        relation_name = "buildingassemblysimulated_set"
-        BuildingProductModel = SimulatedOperationalProduct
-        op_relation_name = "simulated_operational_products"
-    else:
-        BuildingAssemblyModel = BuildingAssembly
-        relation_name = "buildingassembly_set"
-        BuildingProductModel = OperationalProduct
-        op_relation_name = "operational_products"
+        context["scenario"] = building.scenario
+        context["scenarios"] = building.scenarios.all()
+    form, detailedForm, operationalInfoForm = get_building_forms(building)
 
-    building = get_object_or_404(
-        Building.objects
-            .filter(created_by=request.user)
-            .prefetch_related(
-                # 1) grab each BuildingAssemblyModel …
-                Prefetch(
-                    relation_name,
-                    queryset=BuildingAssemblyModel.objects
-                        .filter(building__created_by=request.user)
-                        .select_related("assembly")                           # pull in the Assembly in same query
-                        .order_by("-assembly__created_at")
-                        .prefetch_related(
-                            # 2) … and on *each* BuildingAssemblyModel, pull its assembly's products …
-                            Prefetch(
-                                "assembly__structuralproduct_set",
-                                queryset=StructuralProduct.objects
-                                    .select_related("epd", "classification")
-                                    .prefetch_related(
-                                        # 3) … and on each product’s EPD, grab its impacts …
-                                        Prefetch(
-                                            "epd__epdimpact_set",
-                                            queryset=EPDImpact.objects.select_related("impact"),
-                                            to_attr="all_impacts",
-                                        ),
-                                        # 4) … and also fetch the categories to avoid extra queries
-                                        "epd__category",
-                                        "classification__category",
-                                    ),
-                                to_attr="prefetched_products",       # <–– now Assembly.products is that list
-                            ),
+    logger.info(
+        "Found building: %s with %d structural components",
+        building.name,
+        len(context["structural_components"]),
+    )
+
+    return context, form, detailedForm, operationalInfoForm
+
+
+def get_building(request, building_id, simulation, structural=True, operational=True) -> Building:
+    """The user's building with the components of the requested fragments prefetched.
+
+    In a simulation they are those of the scenario selected for the building,
+    as `building.scenario`.
+    """
+    if simulation:
+        building = get_object_or_404(Building, created_by=request.user, pk=building_id)
+        building.scenario = current_scenario(building, create=True)
+        resolved = resolve_building(
+            building, building.scenario, structural=structural, operational=operational
+        )
+        building.prefetched_components = sorted(
+            resolved.building_assemblies, key=lambda b: b.assembly.created_at, reverse=True
+        )
+        building.prefetched_operational_products = resolved.operational_products
+        return building
+
+    prefetches = []
+    if structural:
+        prefetches.append(
+            # 1) grab each BuildingAssembly …
+            Prefetch(
+                "buildingassembly_set",
+                queryset=BuildingAssembly.objects
+                    .filter(building__created_by=request.user)
+                    .select_related("assembly")                           # pull in the Assembly in same query
+                    .order_by("-assembly__created_at")
+                    .prefetch_related(
+                        # 2) … and on *each* BuildingAssembly, pull its assembly's products for the classification …
+                        Prefetch(
+                            "assembly__structuralproduct_set",
+                            queryset=StructuralProduct.objects
+                                .select_related("classification__category"),
+                            to_attr="prefetched_products",       # <–– now Assembly.products is that list
                         ),
-                    to_attr="prefetched_components",  # <–– Building.prefetched_components is list of BuildingAssemblyModel
-                ),
-                # 5) plus grab any BuildingProductModel in one go
-                Prefetch(
-                    op_relation_name,
-                    queryset=BuildingProductModel.objects.all(),
-                    to_attr="prefetched_operational_products",
+                    ),
+                to_attr="prefetched_components",  # <–– Building.prefetched_components is list of BuildingAssembly
+            )
+        )
+    if operational:
+        prefetches.append(
+            # 3) plus grab any OperationalProduct in one go, with the EPD fields they show
+            Prefetch(
+                "operational_products",
+                queryset=OperationalProduct.objects.select_related(
+                    "epd__country", "epd__category"
                 ),
-            ),
+                to_attr="prefetched_operational_products",
+            )
+        )
+    building = get_object_or_404(
+        Building.objects.filter(created_by=request.user).prefetch_related(*prefetches),
         pk=building_id,
     )
+    building.scenario = None
+    return building
+
+
+def get_structural_context(building: Building) -> dict:
+    # Build structural components with their materialized impacts
+    snapshot = get_building_snapshot(building, building.scenario)
+    structural_components = get_assemblies(
+        building.prefetched_components, snapshot.assembly_gwp, snapshot.errors
+    )
+    return {
+        "structural_components": structural_components,
+        "has_structural": bool(structural_components),
+    }
 
-    # Build structural components and impacts in one step
-    structural_components, _ = get_assemblies(building.prefetched_components)
 
+def get_operational_context(building: Building) -> dict:
     # Get Operational Products and impacts
     operational_products = serialize_operational_products(
         building.prefetched_operational_products
     )
-
-    # Get Operational Products and impacts
-    epd_list, _ = get_epd_list(request, None, operational=True)
-    form = EPDsFilterForm(request.POST)
-    op_field_fix = {
-        "category": "Others",
-        "subcategory": "Energy carrier - delivery free user",
+    return {
+        "operational_products": operational_products,
+        "has_operational": bool(operational_products),
     }
-    for field, value in op_field_fix.items():
-        form.fields[field].queryset = MaterialCategory.objects
-        initial = MaterialCategory.objects.get(name_en=value)
-        form.fields[field].initial = initial
-        form.fields[field].disabled = True
-
-    form.fields["childcategory"].queryset = MaterialCategory.objects.filter(
-        parent=initial
+
+
+def get_building_forms(building: Building):
+    return (
+        BuildingGeneralInformation(instance=building),
+        BuildingDetailedInformation(instance=building),
+        OperationalInfoForm(instance=building),
     )
+
+
+def render_operational_products(request, building_id, simulation, edit_mode):
+    """The operational products fragment, without touching the structure of the building."""
+    building = get_building(request, building_id, simulation, structural=False)
     context = {
         "building_id": building.id,
-        "building": building,
-        "structural_components": structural_components,
-        "operational_products": operational_products,
-        "has_structural": bool(structural_components),
-        "has_operational": bool(operational_products),
-        "epd_list": epd_list,
-        "epd_filters_form": form,
-        "edit_mode": False,
+        **get_operational_context(building),
+        "edit_mode": edit_mode,
         "simulation": simulation,
     }
-
-    form = BuildingGeneralInformation(instance=building)
-    detailedForm = BuildingDetailedInformation(instance=building)
-    operationalInfoForm = OperationalInfoForm(instance=building)
-
-    logger.info(
-        "Found building: %s with %d structural components",
-        building.name,
-        len(context["structural_components"]),
+    return render(
+        request,
+        "pages/building/operational_info/operational_products.html",
+        context,
     )
 
-    return context, form, detailedForm, operationalInfoForm
+
+def op_products_saved_response() -> HttpResponse:
+    # The page reloads, anything rendered here would never be shown
+    response = HttpResponse()
+    response["HX-Refresh"] = "true"
+    return response
 
 
 @transaction.atomic
@@ -272,70 +292,41 @@ def handle_information_submit(request, building_id, form):
 
 @transaction.atomic
 def handle_assembly_delete(request, building_id, simulation):
-    if simulation:
-        BuildingAssemblyModel = BuildingAssemblySimulated
-    else:
-        BuildingAssemblyModel = BuildingAssembly
-
     component_id = request.GET.get("component")
     try:
-        # Get the component and delete it
-        component = get_object_or_404(
-            BuildingAssemblyModel, assembly__id=component_id, building__id=building_id
-        )
-        assembly = component.assembly
-        component.delete()
-        
-        # If the assembly is not a template and has no other building relationships,
-        # delete the assembly itself to avoid orphaned assemblies
-        if not assembly.is_template:
-            building_assembly_count = BuildingAssembly.objects.filter(assembly=assembly).count()
-            building_assembly_sim_count = BuildingAssemblySimulated.objects.filter(assembly=assembly).count()
-            
-            if building_assembly_count == 0 and building_assembly_sim_count == 0:
-                logger.info("Deleting orphaned non-template assembly: %s", assembly)
-                assembly.delete()
-                
+        if simulation:
+            # Only the scenario loses it, the building keeps the assembly
+            building = get_object_or_404(Building, created_by=request.user, pk=building_id)
+            remove_component(current_scenario(building, create=True), component_id)
+        else:
+            # Get the component and delete it
+            component = get_object_or_404(
+                BuildingAssembly, assembly__id=component_id, building__id=building_id
+            )
+            assembly = component.assembly
+            component.delete()
+
+            # If the assembly is not a template and has no other building or
+            # scenario relationships, delete the assembly itself to avoid orphaned assemblies
+            if not assembly.is_template:
+                building_assembly_count = BuildingAssembly.objects.filter(assembly=assembly).count()
+                scenario_assembly_count = ScenarioAssembly.objects.filter(assembly=assembly).count()
+
+                if building_assembly_count == 0 and scenario_assembly_count == 0:
+                    logger.info("Deleting orphaned non-template assembly: %s", assembly)
+                    assembly.delete()
+
     except Exception:
         logger.exception(
             "Deletion of assembly %s for building %s failed.", component_id, building_id
         )
 
     # Fetch the updated list of assemblies for the building
-    updated_list = (
-        BuildingAssemblyModel.objects
-            .filter(
-                building__created_by=request.user,
-                assembly__created_by=request.user,
-                building_id=building_id,
-            )
-            .select_related("assembly", "building")
-            .order_by("-assembly__created_at")
-            .prefetch_related(
-                # 1: Grab each StructuralProduct on assembly
-                Prefetch(
-                    "assembly__structuralproduct_set",
-                    queryset=StructuralProduct.objects
-                        .select_related("epd", "classification")
-                        .prefetch_related(
-                            # 2: Within each EPD, grab its impacts
-                            Prefetch(
-                                "epd__epdimpact_set",
-                                queryset=EPDImpact.objects.select_related("impact"),
-                                to_attr="all_impacts",
-                            ),
-                            # 3: Also fetch the categories to avoid extra queries
-                            "epd__category",
-                            "classification__category",
-                        ),
-                    to_attr="prefetched_products",  # <-- this will be assembly.products
-                ),
-            )
-    )
-    structural_components, _ = get_assemblies(updated_list)
+    building = get_building(request, building_id, simulation, operational=False)
     context = {
         "building_id": building_id,
-        "structural_components": list(structural_components),
+        **get_structural_context(building),
+        "simulation": simulation,
     }
     logger.info(
         "User %s successfully deleted assembly %s - simulation %s",
@@ -350,28 +341,13 @@ def handle_assembly_delete(request, building_id, simulation):
     
     return response
 
-def get_assemblies(assembly_list: list[BuildingAssembly]):
-    impact_list = []
+def get_assemblies(assembly_list: list[BuildingAssembly], gwpa1a3: dict, errors=None):
+    # gwpa1a3 holds the GWP impact for each assembly to display in list,
+    # errors the message of those whose impacts could not be calculated
+    errors = errors or {}
+
     structural_components = []
     for b_assembly in assembly_list:
-        assembly_impact_list = []
-        for p in getattr(b_assembly.assembly, "prefetched_products", []):
-            assembly_impact_list.extend(
-                calculate_impacts(
-                    b_assembly.assembly.dimension,
-                    b_assembly.quantity,
-                    b_assembly.building.total_floor_area,
-                    p,
-                )
-            )
-
-        # get GWP impact for each assembly to display in list
-        gwpa1a3 = [
-            i["impact_value"]
-            for i in assembly_impact_list
-            if i["impact_type"].impact_category == "gwp"
-            and i["impact_type"].life_cycle_stage == "a1a3"
-        ]
         structural_components.append(
             {
                 "assembly_id": b_assembly.assembly.pk,
@@ -382,11 +358,11 @@ def get_assemblies(assembly_list: list[BuildingAssembly]):
                     else ""
                 ),
                 "quantity": b_assembly.quantity,
-                "impacts": sum(gwpa1a3),
+                "impacts": gwpa1a3.get(b_assembly.assembly.pk, 0),
+                "error": errors.get(b_assembly.assembly.pk),
                 "unit": DIMENSION_UNIT_MAPPING.get(b_assembly.assembly.dimension),
                 "is_boq": b_assembly.assembly.is_boq,
             }
         )
-        impact_list.extend(assembly_impact_list)
 
-    return structural_components, impact_list
+    return structural_components
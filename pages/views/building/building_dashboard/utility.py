@@ -1,97 +1,33 @@
 import logging
 
-from django.db.models import Prefetch
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 import pandas as pd
 
-from pages.models.assembly import StructuralProduct
-from pages.models.building import Building, BuildingAssembly, BuildingAssemblySimulated, OperationalProduct, SimulatedOperationalProduct
-from pages.models.epd import EPDImpact
-from pages.views.building.building import get_assemblies
-from pages.views.building.operational_products.operational_products import serialize_operational_products
+from pages.models.building import Building
+from pages.views.building.impact_snapshot import get_building_snapshot
+from pages.views.building.scenarios import current_scenario
 
 logger = logging.getLogger(__name__)
 
 
 def prep_building_dashboard_df(user, building_id, simulation):
-    if simulation:
-        BuildingAssemblyModel = BuildingAssemblySimulated
-        relation_name = "buildingassemblysimulated_set"
-        BuildingProductModel = SimulatedOperationalProduct
-        op_relation_name = "simulated_operational_products"
-    else:
-        BuildingAssemblyModel = BuildingAssembly
-        relation_name = "buildingassembly_set"
-        BuildingProductModel = OperationalProduct
-        op_relation_name = "operational_products"
-
-
-    building = get_object_or_404(
-        Building.objects
-            .filter(created_by=user)
-            .prefetch_related(
-                # 1) grab each BuildingAssemblyModel …
-                Prefetch(
-                    relation_name,
-                    queryset=BuildingAssemblyModel.objects
-                        .filter(building__created_by=user)
-                        .select_related("assembly")     # pull in the Assembly
-                        .prefetch_related(
-                            # 2) … and on *each* BuildingAssemblyModel, pull its assembly's products …
-                            Prefetch(
-                                "assembly__structuralproduct_set",
-                                queryset=StructuralProduct.objects
-                                    .select_related("epd", "classification")
-                                    .prefetch_related(
-                                        # 3) fetch EPD impacts…
-                                        Prefetch(
-                                            "epd__epdimpact_set",
-                                            queryset=EPDImpact.objects.select_related("impact"),
-                                            to_attr="all_impacts",
-                                        ),
-                                        # 4) and EPD/category, classification/category
-                                        "epd__category",
-                                        "classification__category",
-                                    ),
-                                to_attr="prefetched_products",
-                            ),
-                        ),
-                    to_attr="prefetched_components",
-                ),
-                # 5) plus any operational products
-                Prefetch(
-                    op_relation_name,
-                    queryset=BuildingProductModel.objects
-                        .filter(building__created_by=user)
-                        .select_related("epd")     # pull in the Assembly
-                        .prefetch_related(
-                            Prefetch(
-                                "epd__epdimpact_set",
-                                queryset=EPDImpact.objects.select_related("impact"),
-                                to_attr="all_impacts",
-                            ),
-                            # 4) and EPD/category, classification/category
-                            "epd__category",
-                        ),
-                    to_attr="prefetched_operational_products",
-                ),
-            ),
-        pk=building_id,
-    )
-
-    # Build structural and operational components and impacts in one step
-    structural_components, impact_list = get_assemblies(building.prefetched_components)
-    operational_impact_list = serialize_operational_products(building.prefetched_operational_products)
-    reference_period = building.reference_period
-
-    if not structural_components and not operational_impact_list:
+    building = get_object_or_404(Building, created_by=user, pk=building_id)
+
+    # Shared with the building page and the export, computed once per building version
+    scenario = current_scenario(building) if simulation else None
+    snapshot = get_building_snapshot(building, scenario)
+    impact_list = snapshot.structural_records
+    operational_impact_list = snapshot.operational_records
+    reference_period = snapshot.reference_period
+
+    if not impact_list and not operational_impact_list:
         return HttpResponse()
-    elif not structural_components:
+    elif not impact_list:
         df = prep_operational_df(operational_impact_list, reference_period)
     elif not operational_impact_list:
         df = prep_structural_df(impact_list)
-    elif operational_impact_list and structural_components:
+    elif operational_impact_list and impact_list:
         
         df = prep_structural_df(impact_list)
     
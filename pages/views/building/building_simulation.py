@@ -1,25 +1,26 @@
 import logging
 
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.http import HttpResponse
-from django.shortcuts import render, redirect
+from django.shortcuts import get_object_or_404, render, redirect
+from django.utils import timezone
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 
-from pages.models.assembly import AssemblyMode, Assembly, StructuralProduct
-from pages.models.building import (
-    BuildingAssembly,
-    BuildingAssemblySimulated,
-    OperationalProduct,
-    SimulatedOperationalProduct,
+from pages.models.building import Building
+from pages.models.scenario import Scenario
+from pages.views.building.building import (
+    handle_assembly_delete,
+    handle_building_load,
+    op_products_saved_response,
+    render_operational_products,
 )
-from pages.views.building.building import handle_building_load
-from pages.views.building.building import handle_assembly_delete
 from pages.views.building.operational_products.operational_products import (
     get_op_product,
     get_op_product_list,
     handle_op_products_save,
 )
+from pages.views.building.scenarios import current_scenario, reset_scenario
 
 
 logger = logging.getLogger(__name__)
@@ -44,33 +45,23 @@ def building_simulation(request, building_id):
     elif request.method == "POST":
         match request.POST.get("action"):
             case "reset":
-                return handle_simulation_reset(building_id)
+                return handle_simulation_reset(request, building_id)
+            case "select_scenario":
+                return handle_scenario_select(request, building_id)
+            case "add_scenario":
+                return handle_scenario_add(request, building_id)
+            case "delete_scenario":
+                return handle_scenario_delete(request, building_id)
             case "select_op_product":
                 return get_op_product(request, building_id)
             case "filter":
-                return get_op_product_list(request, building_id)
+                return get_op_product_list(request, building_id, simulation=True)
             case "save_op_products":
                 handle_op_products_save(request, building_id, simulation=True)
-                context, form, detailedForm, _ = handle_building_load(
-                    request, building_id, simulation=True
-                )
-                context["edit_mode"] = False
-                response = render(
-                    request,
-                    "pages/building/operational_info/operational_product_list.html",
-                    context,
-                )
-                response["HX-Refresh"] = "true"  # Add the HX-Refresh header
-                return response
+                return op_products_saved_response()
             case "edit_products":
-                context, _, _, _ = handle_building_load(
-                    request, building_id, simulation=True
-                )
-                context["edit_mode"] = True
-                return render(
-                    request,
-                    "pages/building/operational_info/operational_products.html",
-                    context,
+                return render_operational_products(
+                    request, building_id, simulation=True, edit_mode=True
                 )
 
     # Full reload
@@ -79,8 +70,15 @@ def building_simulation(request, building_id):
             request, building_id, simulation=True
         )
 
-        if not context["structural_components"] and not context["operational_products"]:
-            return handle_simulation_reset(building_id)
+        building = context["building"]
+        if (
+            not context["structural_components"]
+            and not context["operational_products"]
+            and not building.buildingassembly_set.exists()
+            and not building.operational_products.exists()
+        ):
+            # simulation is not possible if there is no normal set-up
+            return redirect("building", building_id=building_id)
 
         # disable the form fields and button
         for field in form.fields:
@@ -108,77 +106,52 @@ def building_simulation(request, building_id):
     return render(request, "pages/building/building_simulation.html", context)
 
 
-@transaction.atomic
-def handle_simulation_reset(building_id):
-    ##### create clean slate
-    # Fetch the simulated assemblies for the given building
-    simulated_buildingassemblies = BuildingAssemblySimulated.objects.filter(
-        building__id=building_id
-    )
-
-    # Find and delete associated assemblies with AssemblyMode.CUSTOM
-    sim_custom_assemblies = Assembly.objects.filter(
-        id__in=simulated_buildingassemblies.values_list("assembly_id", flat=True),
-        mode=AssemblyMode.CUSTOM,
-    )
-
+def handle_simulation_reset(request, building_id):
+    # Only the overrides of the scenario are dropped, nothing is copied
+    building = get_object_or_404(Building, created_by=request.user, pk=building_id)
+    scenario = current_scenario(building)
     try:
-        sim_custom_assemblies.delete()
-
-        # Clear existing simulated assemblies
-        simulated_buildingassemblies.delete()
+        if scenario is not None:
+            reset_scenario(scenario)
+    except Exception:
+        logger.exception(
+            "Resetting the simulation failed for building %s", building_id
+        )
 
-        # Clear existing simulated operational products
-        SimulatedOperationalProduct.objects.filter(building__id=building_id).delete()
+    # Do a full page reload
+    return redirect("building_simulation", building_id=building_id)
 
-        ###### Create from Building Assembly
-        normal_assemblies = BuildingAssembly.objects.filter(building__id=building_id)
 
-        ###### Create from Building Assembly
-        normal_op_products = OperationalProduct.objects.filter(building__id=building_id)
+def handle_scenario_select(request, building_id):
+    Scenario.objects.filter(
+        building__created_by=request.user,
+        building_id=building_id,
+        pk=request.POST.get("scenario_id"),
+    ).update(selected_at=timezone.now())
+    return redirect("building_simulation", building_id=building_id)
 
-        if not normal_assemblies and not normal_op_products:
-            # simulation is not possible if there is no normal set-up
-            return redirect("building", building_id=building_id)
 
-        for a in normal_assemblies:
-            # For custom assemblies, clone the original
-            if a.assembly.mode == AssemblyMode.CUSTOM:
-                # https://docs.djangoproject.com/en/5.1/topics/db/queries/#copying-model-instances
-                original_assembly_id = a.assembly.pk
-                a.assembly.pk = None
-                a.assembly._state.adding = True
-                a.assembly.save()
-
-                # Clone associated Products
-                for product in StructuralProduct.objects.filter(
-                    assembly__id=original_assembly_id
-                ):
-                    StructuralProduct.objects.create(
-                        description=product.description,
-                        epd=product.epd,
-                        input_unit=product.input_unit,
-                        assembly=a.assembly,  # Use the new cloned assembly
-                        quantity=product.quantity,
-                        classification=product.classification
-                    )
-
-            BuildingAssemblySimulated.objects.create(
-                assembly=a.assembly, building=a.building, quantity=a.quantity
+def handle_scenario_add(request, building_id):
+    building = get_object_or_404(Building, created_by=request.user, pk=building_id)
+    name = request.POST.get("name", "").strip()
+    if name:
+        try:
+            with transaction.atomic():
+                Scenario.objects.create(building=building, name=name, created_by=request.user)
+        except IntegrityError:
+            # The name is taken, the existing scenario is selected instead
+            Scenario.objects.filter(building=building, name=name).update(
+                selected_at=timezone.now()
             )
+    return redirect("building_simulation", building_id=building_id)
 
-        for p in normal_op_products:
-            SimulatedOperationalProduct.objects.create(
-                epd=p.epd,
-                building=p.building,
-                quantity=p.quantity,
-                description=p.description,
-                input_unit=p.input_unit,
-            )
-    except Exception:
-        logger.exception(
-            "Resetting the simulation failed for building %s failed", building_id
-        )
 
-    # Do a full page reload
+@transaction.atomic
+def handle_scenario_delete(request, building_id):
+    building = get_object_or_404(Building, created_by=request.user, pk=building_id)
+    scenario = current_scenario(building)
+    if scenario is not None:
+        # Drops the assemblies only the scenario used along with it
+        reset_scenario(scenario)
+        scenario.delete()
     return redirect("building_simulation", building_id=building_id)
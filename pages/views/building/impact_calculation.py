@@ -1,5 +1,8 @@
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Literal, TYPE_CHECKING
+from typing import Iterable, Literal, TYPE_CHECKING
+
+import numpy as np
 
 from pages.models.assembly import AssemblyDimension, StructuralProduct
 from pages.models.epd import Unit
@@ -9,7 +12,169 @@ if TYPE_CHECKING:
     from pages.models.building import OperationalProduct
 
 
-# TODO: Add Try/Catch when trying to fetch a non-existing conversion and handle and display error
+CM_TO_M = 100
+
+# Scaling rules for each (dimension, declared_unit) pair supported by `calculate_impacts`.
+# Every row is `(uses_assembly_quantity, scale, conversion_exponent)` so that
+#   factor = assembly_quantity * quantity * scale * kg_per_m3 ** conversion_exponent
+# The row index is the dimension code used by the batch engine.
+IMPACT_FACTOR_RULES = [
+    # (_, pcs): impact_per_unit * number of pieces / epd_base_amount
+    (None, Unit.PCS, False, 1, 0),
+    # impact_per_unit * total_m2 * num_layers / epd_base_amount
+    (AssemblyDimension.AREA, Unit.M2, True, 1, 0),
+    # impact_per_unit * total_m2 * thickness_in_cm * unit_conversion_cm_to_m / epd_base_amount
+    (AssemblyDimension.AREA, Unit.M3, True, 1 / CM_TO_M, 0),
+    # impact_per_unit * conversion_kg_per_m2 * total_m2 * thickness_in_cm * unit_conversion_cm_to_m / epd_base_amount
+    (AssemblyDimension.AREA, Unit.KG, True, 1 / CM_TO_M, 1),
+    # impact_per_unit * total_m3 / epd_base_amount
+    (AssemblyDimension.VOLUME, Unit.M3, True, 1, 0),
+    # impact_per_unit * conversion_kg_per_m3 * total_m3 * percentage / epd_base_amount
+    (AssemblyDimension.VOLUME, Unit.KG, True, 1, 1),
+    # impact_per_unit * total_kg / epd_base_amount
+    (AssemblyDimension.MASS, Unit.KG, True, 1, 0),
+    # impact_per_unit / conversion_kg_per_m3 * total_kg * percentage / epd_base_amount
+    (AssemblyDimension.MASS, Unit.M3, True, 1, -1),
+    # impact_per_unit * total_length * num_elements / epd_base_amount
+    (AssemblyDimension.LENGTH, Unit.M, True, 1, 0),
+    # impact_per_unit * total_length * surface_cross-section_to_m2 / unit_conversion_cm2_to_m2 / epd_base_amount
+    (AssemblyDimension.LENGTH, Unit.M3, True, 1 / CM_TO_M**2, 0),
+    # impact_per_unit * conversion_kg_per_m * total_length * surface_cross-section_to_m2 / unit_conversion_cm2_to_m2 / epd_base_amount
+    (AssemblyDimension.LENGTH, Unit.KG, True, 1 / CM_TO_M**2, 1),
+]
+DIMENSION_CODES = {
+    (dimension, declared_unit): code
+    for code, (dimension, declared_unit, *_) in enumerate(IMPACT_FACTOR_RULES)
+}
+_USES_ASSEMBLY_QUANTITY = np.array([r[2] for r in IMPACT_FACTOR_RULES], dtype=bool)
+_SCALE = np.array([r[3] for r in IMPACT_FACTOR_RULES], dtype=np.float64)
+_CONVERSION_EXPONENT = np.array([r[4] for r in IMPACT_FACTOR_RULES], dtype=np.float64)
+
+BOQ_DIMENSION_MAP = {
+    Unit.PCS: None,  # pieces doesn't rely on dimension
+    Unit.M: AssemblyDimension.LENGTH,
+    Unit.M2: AssemblyDimension.AREA,
+    Unit.M3: AssemblyDimension.VOLUME,
+    Unit.KG: AssemblyDimension.MASS,
+}
+
+
+@dataclass
+class ImpactColumns:
+    """Columnar input of the batch engine, one entry per EPDImpact row."""
+
+    dimension_code: np.ndarray
+    assembly_quantity: np.ndarray
+    quantity: np.ndarray
+    conversion: np.ndarray
+    declared_amount: np.ndarray
+    total_floor_area: np.ndarray
+    value: np.ndarray
+
+
+def compute_impact_values(columns: ImpactColumns) -> np.ndarray:
+    """Compute all impact values in a single vectorized pass."""
+    code = columns.dimension_code
+    assembly_quantity = np.where(
+        _USES_ASSEMBLY_QUANTITY[code], columns.assembly_quantity, 1.0
+    )
+    exponent = _CONVERSION_EXPONENT[code]
+    # Conversion is only read where the rule needs it, so missing ones stay neutral elsewhere
+    conversion = np.where(exponent != 0, columns.conversion, 1.0)
+    factor = assembly_quantity * columns.quantity * _SCALE[code] * conversion**exponent
+    return (
+        factor
+        * columns.value
+        / columns.declared_amount  # Normalise by base amount
+        / columns.total_floor_area  # Normalise by total floor area
+    )
+
+
+def get_dimension_code(dimension, p: StructuralProduct) -> int:
+    """Match (dimension, declared_unit) of a product to its row in `IMPACT_FACTOR_RULES`."""
+    declared_unit = p.epd.declared_unit
+    if p.assembly.is_boq:
+        # For BoQs assembly-level dimension is irrelevant as assembly quantity is fixed to 1.
+        dimension = BOQ_DIMENSION_MAP[p.input_unit]
+    if declared_unit == Unit.PCS:
+        return DIMENSION_CODES[(None, Unit.PCS)]
+    try:
+        return DIMENSION_CODES[(dimension, declared_unit)]
+    except KeyError:
+        raise ValueError(
+            f"Unsupported combination: dimension '{dimension}', declared_unit '{declared_unit}'"
+        )
+
+
+def fetch_conversion(p: StructuralProduct, unit: str) -> float:
+    """Fetch conversion factor based on the unit, NaN if the EPD does not provide it."""
+    if unit == "kg/m^3":
+        value = p.epd.volume_density
+    else:
+        value = p.epd.get_conversion(unit)
+    return np.nan if value is None else value
+
+
+def get_product_impacts(p: StructuralProduct):
+    impacts_list = getattr(p.epd, "all_impacts", None)
+    if not impacts_list:
+        impacts_list = p.epd.epdimpact_set.all()
+    return impacts_list
+
+
+def calculate_impacts_batch(
+    items: Iterable[tuple[AssemblyDimension, float, float, StructuralProduct]],
+) -> list[dict]:
+    """Calculate impacts of many products at once.
+
+    Takes `(dimension, assembly_quantity, total_floor_area, product)` tuples, flattens
+    them into `ImpactColumns` and evaluates all EPDImpact rows with `compute_impact_values`.
+    The result has the same shape as `calculate_impacts`.
+    """
+    rows = []
+    columns = {field: [] for field in ImpactColumns.__dataclass_fields__}
+    for dimension, assembly_quantity, total_floor_area, p in items:
+        code = get_dimension_code(dimension, p)
+        conversion = fetch_conversion(p, "kg/m^3") if _CONVERSION_EXPONENT[code] else 1.0
+        if np.isnan(conversion):
+            raise ValueError(
+                f"EPD '{p.epd.pk}' has no 'kg/m^3' conversion required for declared_unit '{p.epd.declared_unit}'"
+            )
+        quantity = p.quantity / 100 if p.input_unit == Unit.PERCENT else p.quantity
+        for epdimpact in get_product_impacts(p):
+            rows.append((p, epdimpact))
+            columns["dimension_code"].append(code)
+            columns["assembly_quantity"].append(assembly_quantity)
+            columns["quantity"].append(quantity)
+            columns["conversion"].append(conversion)
+            columns["declared_amount"].append(p.epd.declared_amount)
+            columns["total_floor_area"].append(total_floor_area)
+            columns["value"].append(epdimpact.value)
+
+    if not rows:
+        return []
+
+    values = compute_impact_values(
+        ImpactColumns(
+            dimension_code=np.array(columns.pop("dimension_code"), dtype=np.intp),
+            **{k: np.array(v, dtype=np.float64) for k, v in columns.items()},
+        )
+    )
+    return [
+        {
+            "assembly_id": p.assembly.pk,
+            "epd_id": p.epd.pk,
+            "assembly_category": (
+                p.classification.category if p.classification else ""
+            ),
+            "material_category": p.epd.category,
+            "impact_type": epdimpact.impact,
+            "impact_value": Decimal(value),
+        }
+        for (p, epdimpact), value in zip(rows, values.tolist())
+    ]
+
+
 def calculate_impacts(
     dimension: AssemblyDimension,
     assembly_quantity: int,
@@ -30,131 +195,13 @@ def calculate_impacts(
 
     # Notes
      - Some EPDs do not have a base unit of 1 (e.g. 1 kg). That is why we normalize by 'declared_amount'
+     - The scaling per combination is defined in `IMPACT_FACTOR_RULES`, use `calculate_impacts_batch`
+       when evaluating many products.
 
     """
-
-    def fetch_conversion(unit: str) -> str | None:
-        """Fetch conversion factor based on the unit."""
-        try:
-            return next(
-                (c["value"] for c in p.epd.conversions if c["unit"] == unit), None
-            )
-        except:
-            return None
-
-    def fetch_dimension_for_boq(input_unit):
-        """Assign dimension based on 'input_unit'."""
-        boq_dim_map = {
-            Unit.PCS: None,  # pieces doesn't rely on dimension
-            Unit.M: AssemblyDimension.LENGTH,
-            Unit.M2: AssemblyDimension.AREA,
-            Unit.M3: AssemblyDimension.VOLUME,
-            Unit.KG: AssemblyDimension.MASS,
-        }
-        return boq_dim_map[input_unit]
-
-    def calculate_impact(factor=1):
-        """Calculate impacts using a given factor and normalized by EPD base amount and reporting life_cycle."""
-        impacts_list = getattr(p.epd, "all_impacts", None)
-        if not impacts_list:
-            impacts_list = p.epd.epdimpact_set.all()
-        
-        container = []
-        for epdimpact in impacts_list:
-            container.append(
-                {
-                    "assembly_id": p.assembly.pk,
-                    "epd_id": p.epd.pk,
-                    "assembly_category": (
-                        p.classification.category if p.classification else ""
-                    ),
-                    "material_category": p.epd.category,
-                    "impact_type": epdimpact.impact,
-                    "impact_value": Decimal(factor)
-                    * Decimal(epdimpact.value)
-                    / Decimal(p.epd.declared_amount)  # Normalise by base amount
-                    / Decimal(total_floor_area),  # Normalise by total floor area
-                }
-            )
-        return container
-
-    declared_unit = p.epd.declared_unit
-
-    if p.assembly.is_boq:
-        # For BoQs assembly-level dimension is irrelevant as assembly quantity is fixed to 1.
-        dimension = fetch_dimension_for_boq(p.input_unit)
-
-    quantity = p.quantity / 100 if p.input_unit == Unit.PERCENT else p.quantity
-
-    cm_to_m = 100
-
-    match (dimension, declared_unit):
-        case (_, Unit.PCS):
-            # impact = impact_per_unit * number of pieces / epd_base_amount
-            impacts = calculate_impact(quantity)
-
-        case (AssemblyDimension.AREA, Unit.M2):
-            # impact = impact_per_unit * total_m2 * num_layers / epd_base_amount
-            impacts = calculate_impact(Decimal(assembly_quantity) * Decimal(quantity))
-        case (AssemblyDimension.AREA, Unit.M3):
-            # impact = impact_per_unit * total_m2 * thickness_in_cm * unit_conversion_cm_to_m / epd_base_amount
-            impacts = calculate_impact(
-                Decimal(assembly_quantity) * Decimal(quantity) / Decimal(cm_to_m)
-            )
-        case (AssemblyDimension.AREA, Unit.KG):
-            # impact = impact_per_unit * conversion_kg_per_m2 * total_m2 * thickness_in_cm * unit_conversion_cm_to_m / epd_base_amount
-            conversion_f = fetch_conversion("kg/m^3")
-            impacts = calculate_impact(
-                Decimal(assembly_quantity)
-                * Decimal(quantity)
-                * Decimal(conversion_f)
-                / Decimal(cm_to_m)
-            )
-
-        case (AssemblyDimension.VOLUME, Unit.M3):
-            # impact = impact_per_unit * total_m3 / epd_base_amount
-            impacts = calculate_impact(Decimal(assembly_quantity) * Decimal(quantity))
-        case (AssemblyDimension.VOLUME, Unit.KG):
-            # impact = impact_per_unit * conversion_kg_per_m3 * total_m3 * percentage / epd_base_amount
-            conversion_f = fetch_conversion("kg/m^3")
-            impacts = calculate_impact(
-                Decimal(assembly_quantity) * Decimal(quantity) * Decimal(conversion_f)
-            )
-
-        case (AssemblyDimension.MASS, Unit.KG):
-            # impact = impact_per_unit * total_kg / epd_base_amount
-            impacts = calculate_impact(Decimal(assembly_quantity) * Decimal(quantity))
-        case (AssemblyDimension.MASS, Unit.M3):
-            # impact = impact_per_unit / conversion_kg_per_m3 * total_kg * percentage / epd_base_amount
-            conversion_f = fetch_conversion("kg/m^3")
-            impacts = calculate_impact(
-                Decimal(assembly_quantity) * Decimal(quantity) / Decimal(conversion_f)
-            )
-
-        case (AssemblyDimension.LENGTH, Unit.M):
-            # impact = impact_per_unit * total_length * num_elements / epd_base_amount
-            impacts = calculate_impact(Decimal(assembly_quantity) * Decimal(quantity))
-        case (AssemblyDimension.LENGTH, Unit.M3):
-            # impact = impact_per_unit * total_length * surface_cross-section_to_m2 / unit_conversion_cm2_to_m2 / epd_base_amount
-            impacts = calculate_impact(
-                Decimal(assembly_quantity) * Decimal(quantity) / Decimal(cm_to_m**2)
-            )
-        case (AssemblyDimension.LENGTH, Unit.KG):
-            # impact = impact_per_unit * conversion_kg_per_m * total_length * surface_cross-section_to_m2 / unit_conversion_cm2_to_m2 / epd_base_amount
-            conversion_f = fetch_conversion("kg/m^3")
-            impacts = calculate_impact(
-                Decimal(assembly_quantity)
-                * Decimal(quantity)
-                * Decimal(conversion_f)
-                / Decimal(cm_to_m**2)
-            )
-
-        case _:
-            raise ValueError(
-                f"Unsupported combination: dimension '{dimension}', declared_unit '{declared_unit}'"
-            )
-
-    return impacts
+    return calculate_impacts_batch(
+        [(dimension, assembly_quantity, total_floor_area, p)]
+    )
 
 
 def calculate_impact_operational(
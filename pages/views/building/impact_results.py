@@ -0,0 +1,373 @@
+import logging
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Prefetch, Sum
+from django.utils import timezone
+
+from pages.models.assembly import StructuralProduct
+from pages.models.building import Building, BuildingAssembly, OperationalProduct
+from pages.models.building_impact import BuildingImpact, BuildingImpactError
+from pages.models.epd import EPDImpact
+from pages.models.scenario import Scenario
+from pages.views.building.impact_calculation import (
+    calculate_impact_operational,
+    calculate_impacts_batch,
+)
+from pages.views.reference_registry import reference_registry
+
+logger = logging.getLogger(__name__)
+
+# Refreshes requested in the current transaction, flushed once on commit
+_pending = threading.local()
+
+
+def schedule_results_refresh(building_id, assembly_id=None) -> None:
+    """Recompute the results of one assembly (or the operational products if
+    `assembly_id` is None) of a building once the transaction commits."""
+    keys = _pending.__dict__.setdefault("keys", set())
+    keys.add((building_id, assembly_id))
+    transaction.on_commit(flush_results_refresh, robust=True)
+
+
+def schedule_assembly_refresh(assembly_id) -> None:
+    """Recompute the results of every building that uses the assembly."""
+    for building_id in BuildingAssembly.objects.filter(
+        assembly_id=assembly_id
+    ).values_list("building_id", flat=True):
+        schedule_results_refresh(building_id, assembly_id)
+    # Scenarios are not materialized, their cached impacts only need a new key
+    touch_scenarios(assembly_overrides__assembly_id=assembly_id)
+
+
+def schedule_epd_refresh(epd_ids) -> None:
+    """Recompute the results of every building that uses one of the EPDs."""
+    assembly_ids = set(
+        StructuralProduct.objects.filter(epd_id__in=epd_ids).values_list(
+            "assembly_id", flat=True
+        )
+    )
+    for assembly_id in assembly_ids:
+        schedule_assembly_refresh(assembly_id)
+
+    for building_id in set(
+        OperationalProduct.objects.filter(epd_id__in=epd_ids).values_list(
+            "building_id", flat=True
+        )
+    ):
+        schedule_results_refresh(building_id)
+    touch_scenarios(product_overrides__epd_id__in=epd_ids)
+    touch_scenarios(operational_overrides__epd_id__in=epd_ids)
+
+
+def touch_scenarios(**lookups) -> None:
+    """Gives the scenarios matching `lookups` a new `updated_at`."""
+    Scenario.objects.filter(**lookups).update(updated_at=timezone.now())
+
+
+def flush_results_refresh() -> None:
+    keys = _pending.__dict__.pop("keys", set())
+    grouped = defaultdict(set)
+    for building_id, assembly_id in keys:
+        grouped[building_id].add(assembly_id)
+
+    for building_id, assembly_ids in grouped.items():
+        refresh_building_results(
+            building_id,
+            assembly_ids=assembly_ids - {None},
+            operational=None in assembly_ids,
+        )
+
+
+@transaction.atomic
+def refresh_building_results(building_id, assembly_ids=None, operational=True) -> None:
+    """Rewrite the `BuildingImpact` rows of a building.
+
+    Only the given assemblies are recomputed, all of them if `assembly_ids` is None.
+    Assemblies that are no longer linked to the building lose their rows. Parts
+    that cannot be calculated get a `BuildingImpactError` instead of rows.
+    """
+    # Refreshes of one building run one after the other, an overlapping one
+    # would otherwise insert its rows next to ours
+    Building.objects.select_for_update().filter(pk=building_id).exists()
+    if assembly_ids is None or assembly_ids:
+        _refresh_structural_results(building_id, assembly_ids)
+    if operational:
+        _refresh_operational_results(building_id)
+
+    # Stamp the building, so cached views of it are invalidated
+    Building.objects.filter(pk=building_id).update(updated_at=timezone.now())
+
+
+def refresh_all_results(building_ids=None) -> None:
+    buildings = Building.objects.all()
+    if building_ids is not None:
+        buildings = buildings.filter(pk__in=building_ids)
+    for building_id in buildings.values_list("pk", flat=True):
+        refresh_building_results(building_id)
+
+
+def products_prefetch(lookup="assembly__structuralproduct_set") -> Prefetch:
+    """Products of assemblies with everything the impact calculation reads, as `prefetched_products`."""
+    return Prefetch(
+        lookup,
+        queryset=StructuralProduct.objects.select_related(
+            "epd__category", "classification__category"
+        ).prefetch_related(
+            Prefetch(
+                "epd__epdimpact_set",
+                queryset=EPDImpact.objects.select_related("impact"),
+                to_attr="all_impacts",
+            ),
+        ),
+        to_attr="prefetched_products",
+    )
+
+
+def calculate_building_assemblies(building_assemblies, building_id, errors=None) -> list[dict]:
+    """Impacts of the prefetched products of building assemblies, see `calculate_impacts`.
+
+    Assemblies that cannot be calculated are logged and left out, with their
+    error message in `errors` by assembly id if given.
+    """
+    impact_list = []
+    for b_assembly in building_assemblies:
+        try:
+            impact_list.extend(
+                calculate_impacts_batch(
+                    (
+                        b_assembly.assembly.dimension,
+                        b_assembly.quantity,
+                        b_assembly.building.total_floor_area,
+                        p,
+                    )
+                    for p in b_assembly.assembly.prefetched_products
+                )
+            )
+        except (ValueError, KeyError) as e:
+            logger.exception(
+                "Impacts of assembly %s in building %s could not be calculated",
+                b_assembly.assembly_id,
+                building_id,
+            )
+            if errors is not None:
+                errors[b_assembly.assembly_id] = str(e)
+    return impact_list
+
+
+def _refresh_structural_results(building_id, assembly_ids) -> None:
+    building_assemblies = (
+        BuildingAssembly.objects.filter(building_id=building_id)
+        .select_related("assembly", "building")
+        .prefetch_related(products_prefetch())
+    )
+    stale_results = BuildingImpact.objects.filter(
+        building_id=building_id, assembly__isnull=False
+    )
+    stale_errors = BuildingImpactError.objects.filter(
+        building_id=building_id, assembly__isnull=False
+    )
+    if assembly_ids is not None:
+        building_assemblies = building_assemblies.filter(assembly_id__in=assembly_ids)
+        stale_results = stale_results.filter(assembly_id__in=assembly_ids)
+        stale_errors = stale_errors.filter(assembly_id__in=assembly_ids)
+    stale_results.delete()
+    stale_errors.delete()
+
+    errors = {}
+    impact_list = calculate_building_assemblies(building_assemblies, building_id, errors)
+    BuildingImpactError.objects.bulk_create(
+        BuildingImpactError(
+            building_id=building_id,
+            assembly_id=assembly_id,
+            message=message,
+        )
+        for assembly_id, message in errors.items()
+    )
+
+    # Products of an assembly can share EPD and classification, sum them up
+    values = defaultdict(Decimal)
+    for i in impact_list:
+        category = i["assembly_category"]
+        key = (i["assembly_id"], category.pk if category else None, i["epd_id"], i["impact_type"].pk)
+        values[key] += i["impact_value"]
+
+    BuildingImpact.objects.bulk_create(
+        BuildingImpact(
+            building_id=building_id,
+            assembly_id=assembly_id,
+            assembly_category_id=category_id,
+            epd_id=epd_id,
+            impact_id=impact_id,
+            value=value,
+        )
+        for (assembly_id, category_id, epd_id, impact_id), value in values.items()
+    )
+
+
+def calculate_operational_products(products, building_id, errors: list) -> list[tuple]:
+    """Pairs of operational products and their yearly impacts, see `calculate_impact_operational`.
+
+    Products that cannot be calculated are logged and left out, with their
+    error message appended to `errors`.
+    """
+    results = []
+    for p in products:
+        try:
+            results.append((p, calculate_impact_operational(p)))
+        except (ValueError, TypeError) as e:
+            logger.exception(
+                "Impacts of operational product %s in building %s could not be calculated",
+                p.pk,
+                building_id,
+            )
+            errors.append(f"{p.epd}: {e}")
+    return results
+
+
+def _refresh_operational_results(building_id) -> None:
+    BuildingImpact.objects.filter(building_id=building_id, assembly__isnull=True).delete()
+    BuildingImpactError.objects.filter(building_id=building_id, assembly__isnull=True).delete()
+
+    registry = reference_registry()
+    b6_impacts = {
+        category: impact
+        for category in ["gwp", "penrt"]
+        if (impact := registry.impact(category, "b6")) is not None
+    }
+    values = defaultdict(Decimal)
+    errors = []
+    products = OperationalProduct.objects.filter(building_id=building_id).select_related(
+        "epd", "building"
+    )
+    for p, impacts in calculate_operational_products(products, building_id, errors):
+        for key, impact_category in (("gwp_b6", "gwp"), ("penrt_b6", "penrt")):
+            if impact_category in b6_impacts:
+                values[(p.epd_id, b6_impacts[impact_category].pk)] += impacts[key]
+
+    BuildingImpact.objects.bulk_create(
+        BuildingImpact(
+            building_id=building_id,
+            epd_id=epd_id,
+            impact_id=impact_id,
+            value=value,
+        )
+        for (epd_id, impact_id), value in values.items()
+    )
+    if errors:
+        BuildingImpactError.objects.create(building_id=building_id, message="\n".join(errors))
+
+
+def schedule_building_refresh(building_id) -> None:
+    schedule_results_refresh(building_id)
+    for assembly_id in BuildingAssembly.objects.filter(
+        building_id=building_id
+    ).values_list("assembly_id", flat=True):
+        schedule_results_refresh(building_id, assembly_id)
+
+
+def get_assembly_gwp(building_id) -> dict:
+    """GWP A1-A3 per assembly of a building."""
+    return dict(
+        BuildingImpact.objects.filter(
+            building_id=building_id,
+            assembly__isnull=False,
+            impact__impact_category="gwp",
+            impact__life_cycle_stage="a1a3",
+        )
+        .values("assembly_id")
+        .annotate(total=Sum("value"))
+        .values_list("assembly_id", "total")
+    )
+
+
+def get_impact_errors(building_id) -> dict:
+    """Error messages of the parts of a building missing from its results, by
+    assembly id, operational products under None."""
+    return dict(
+        BuildingImpactError.objects.filter(building_id=building_id).values_list(
+            "assembly_id", "message"
+        )
+    )
+
+
+def get_structural_impact_records(building_id) -> list[dict]:
+    """GWP and PENRT A1-A3 rows of a building in the shape of `calculate_impacts`."""
+    rows = BuildingImpact.objects.filter(
+        building_id=building_id,
+        assembly__isnull=False,
+        impact__impact_category__in=["gwp", "penrt"],
+        impact__life_cycle_stage="a1a3",
+    ).values_list(
+        "assembly_id",
+        "epd_id",
+        "assembly_category__tag",
+        "assembly_category__name",
+        "epd__category__name_en",
+        "impact__impact_category",
+        "impact__life_cycle_stage",
+        "value",
+    )
+    return [
+        {
+            "assembly_id": assembly_id,
+            "epd_id": epd_id,
+            "assembly_category": f"{tag} - {name}" if name is not None else "",
+            "material_category": str(material_category),
+            "impact_type": f"{impact_category} {life_cycle_stage}",
+            "impact_value": value,
+        }
+        for assembly_id, epd_id, tag, name, material_category, impact_category, life_cycle_stage, value in rows
+    ]
+
+
+def get_operational_impact_records(building_id) -> list[dict]:
+    """Yearly GWP and PENRT B6 per operational EPD of a building."""
+    records = {}
+    for epd_id, category, impact_category, value in BuildingImpact.objects.filter(
+        building_id=building_id,
+        assembly__isnull=True,
+        impact__impact_category__in=["gwp", "penrt"],
+        impact__life_cycle_stage="b6",
+    ).values_list("epd_id", "epd__category__name_en", "impact__impact_category", "value"):
+        record = records.setdefault(
+            epd_id, {"epd_id": epd_id, "category": str(category), "gwp_b6": 0, "penrt_b6": 0}
+        )
+        record[f"{impact_category}_b6"] = value
+    return list(records.values())
+
+
+def structural_impact_records(impact_list) -> list[dict]:
+    """Rows of `calculate_impacts` in the shape of `get_structural_impact_records`,
+    for impacts that are not materialized."""
+    records = []
+    for i in impact_list:
+        impact = i["impact_type"]
+        if impact.impact_category not in ("gwp", "penrt") or impact.life_cycle_stage != "a1a3":
+            continue
+        records.append(
+            {
+                "assembly_id": i["assembly_id"],
+                "epd_id": i["epd_id"],
+                "assembly_category": str(i["assembly_category"]),
+                "material_category": str(i["material_category"]),
+                "impact_type": f"{impact.impact_category} {impact.life_cycle_stage}",
+                "impact_value": float(i["impact_value"]),
+            }
+        )
+    return records
+
+
+def operational_impact_records(results) -> list[dict]:
+    """Pairs of `calculate_operational_products` in the shape of
+    `get_operational_impact_records`, for impacts that are not materialized."""
+    records = {}
+    for p, impacts in results:
+        record = records.setdefault(
+            p.epd_id, {"epd_id": p.epd_id, "category": str(p.epd.category), "gwp_b6": 0, "penrt_b6": 0}
+        )
+        for key in ("gwp_b6", "penrt_b6"):
+            record[key] += float(impacts[key])
+    return list(records.values())
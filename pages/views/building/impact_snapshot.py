@@ -0,0 +1,114 @@
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+
+from pages.models.building import Building
+from pages.models.scenario import Scenario
+from pages.views.building.impact_results import (
+    calculate_building_assemblies,
+    calculate_operational_products,
+    get_assembly_gwp,
+    get_impact_errors,
+    get_operational_impact_records,
+    get_structural_impact_records,
+    operational_impact_records,
+    structural_impact_records,
+)
+from pages.views.building.scenarios import resolve_building
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TIMEOUT = 60 * 60  # seconds
+
+
+@dataclass
+class BuildingImpactSnapshot:
+    """Everything the building page, the dashboards and the export read about
+    the impacts of one building version."""
+
+    building_id: uuid.UUID
+    scenario_id: uuid.UUID | None
+    reference_period: int
+    assembly_gwp: dict = field(default_factory=dict)
+    structural_records: list[dict] = field(default_factory=list)
+    operational_records: list[dict] = field(default_factory=list)
+    # Parts missing from the records, see `get_impact_errors`
+    errors: dict = field(default_factory=dict)
+
+
+def snapshot_cache_key(building: Building, scenario: Scenario | None = None) -> str:
+    # Results are stamped on `updated_at` whenever they change, so every new
+    # version of the building gets its own key and old ones simply expire.
+    # Scenarios are stamped whenever their overrides change.
+    version = building.updated_at.timestamp() if building.updated_at else 0
+    if scenario is None:
+        return f"building-impacts:{building.pk}:{version}"
+    return f"building-impacts:{building.pk}:{version}:{scenario.pk}:{scenario.updated_at.timestamp()}"
+
+
+def get_building_snapshot(building: Building, scenario: Scenario | None = None) -> BuildingImpactSnapshot:
+    key = snapshot_cache_key(building, scenario)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        logger.info("Building impact snapshot cache miss for %s", key)
+        snapshot = build_building_snapshot(building, scenario)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def build_building_snapshot(building: Building, scenario: Scenario | None = None) -> BuildingImpactSnapshot:
+    snapshot = BuildingImpactSnapshot(
+        building_id=building.pk,
+        scenario_id=scenario.pk if scenario else None,
+        reference_period=building.reference_period,
+        assembly_gwp=get_assembly_gwp(building.pk),
+        structural_records=get_structural_impact_records(building.pk),
+        operational_records=get_operational_impact_records(building.pk),
+        errors=get_impact_errors(building.pk),
+    )
+    if scenario is not None:
+        overlay_scenario(snapshot, building, scenario)
+    return snapshot
+
+
+def overlay_scenario(snapshot: BuildingImpactSnapshot, building: Building, scenario: Scenario) -> None:
+    """Replaces the results of what the scenario changes with impacts calculated on the fly.
+
+    Assemblies the scenario leaves alone keep their materialized results, so
+    the work done grows with the overrides, not with the building.
+    """
+    resolved = resolve_building(building, scenario, operational=True, changed_only=True)
+    changed = resolved.changed_assembly_ids
+    if changed:
+        errors = {}
+        impact_list = calculate_building_assemblies(
+            resolved.building_assemblies, building.pk, errors
+        )
+        records = structural_impact_records(impact_list)
+        assembly_gwp = defaultdict(float)
+        for r in records:
+            if r["impact_type"] == "gwp a1a3":
+                assembly_gwp[r["assembly_id"]] += r["impact_value"]
+
+        snapshot.structural_records = [
+            r for r in snapshot.structural_records if r["assembly_id"] not in changed
+        ] + records
+        snapshot.assembly_gwp = {
+            k: v for k, v in snapshot.assembly_gwp.items() if k not in changed
+        } | assembly_gwp
+        snapshot.errors = {
+            k: v for k, v in snapshot.errors.items() if k not in changed
+        } | errors
+
+    if resolved.operational_changed:
+        errors = []
+        results = calculate_operational_products(
+            resolved.operational_products, building.pk, errors
+        )
+        snapshot.operational_records = operational_impact_records(results)
+        snapshot.errors.pop(None, None)
+        if errors:
+            snapshot.errors[None] = "\n".join(errors)
@@ -4,24 +4,44 @@ import logging
 from django.db import transaction
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.utils.cache import patch_cache_control
 
 from pages.forms.epds_filter_form import EPDsFilterForm
-from pages.models.building import OperationalProduct, SimulatedOperationalProduct
+from pages.models.building import Building, OperationalProduct
 from pages.models.epd import EPD, MaterialCategory, Unit
 from pages.views.assembly.epd_processing import get_epd_list
 from pages.views.building.impact_calculation import calculate_impact_operational
+from pages.views.building.scenarios import current_scenario, save_operational_products
+from pages.views.reference_registry import reference_registry
 
 logger = logging.getLogger(__name__)
 
+# Seconds browsers may reuse a page of the operational EPD picker
+PICKER_MAX_AGE = 5 * 60
+
 
 @transaction.atomic
 def handle_op_products_save(request, building_id, simulation=False):
+    selected_epds = parse_op_products(request)
     if simulation:
-        ProductModel = SimulatedOperationalProduct
-    else:
-        ProductModel = OperationalProduct
+        # Stored as overrides of the selected scenario, the building keeps its products
+        building = get_object_or_404(Building, created_by=request.user, pk=building_id)
+        save_operational_products(current_scenario(building, create=True), selected_epds)
+        return
+
+    OperationalProduct.objects.filter(building_id=building_id).delete()
+    for v in selected_epds:
+        OperationalProduct.objects.create(
+            epd_id=v.get("id"),
+            building_id=building_id,
+            quantity=v.get("quantity"),
+            input_unit=v.get("unit"),
+            description=v.get("description"),
+        )
+
 
-    ProductModel.objects.filter(building_id=building_id).delete()
+def parse_op_products(request) -> list[dict]:
+    """Rows of the operational products form, in the order they were posted."""
     selected_epds = {}
 
     for key, value in request.POST.items():
@@ -37,14 +57,7 @@ def handle_op_products_save(request, building_id, simulation=False):
                     f"material_{epd_id}_description_{timestamp}"
                 ],
             }
-    for _, v in selected_epds.items():
-        ProductModel.objects.create(
-            epd_id=v.get("id"),
-            building_id=building_id,
-            quantity=v.get("quantity"),
-            input_unit=v.get("unit"),
-            description=v.get("description"),
-        )
+    return list(selected_epds.values())
 
 
 def serialize_operational_products(operational_products):
@@ -71,7 +84,11 @@ def serialize_operational_products(operational_products):
     return serialised_op_products
 
 
-def get_op_product_list(request, building_id):
+def get_op_product_list(request, building_id, simulation=False):
+    """The operational EPD picker: filter form and one page of energy carriers.
+
+    Only rendered on its own, when the picker modal opens or its filters change.
+    """
     # Get Operational Products and impacts
     epd_list, _ = get_epd_list(request, None, operational=True)
     req = request.POST if request.method == "POST" else request.GET
@@ -82,24 +99,28 @@ def get_op_product_list(request, building_id):
     }
     for field, value in op_field_fix.items():
         form.fields[field].queryset = MaterialCategory.objects
-        form.fields[field].initial = MaterialCategory.objects.get(name_en=value)
+        form.fields[field].initial = reference_registry().category(name_en=value)
         form.fields[field].disabled = True
 
     form.fields["childcategory"].queryset = MaterialCategory.objects.filter(
-        parent=MaterialCategory.objects.get(name_en=value)
+        parent=reference_registry().category(name_en=value)
     )
     context = {
         "building_id": building_id,
-        "simulation": False,
+        "simulation": simulation,
         "filters": req,
         "epd_list": epd_list,
         "epd_filters_form": form,
     }
-    return render(
+    response = render(
         request,
         "pages/building/operational_info/operational_product_list.html",
         context,
     )
+    if request.method == "GET":
+        # Pages only change with the EPD data, reopening the picker can reuse them
+        patch_cache_control(response, private=True, max_age=PICKER_MAX_AGE)
+    return response
 
 
 def get_op_product(request, building_id):
@@ -0,0 +1,288 @@
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+
+import numpy as np
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_http_methods
+
+from pages.models.building import Building
+from pages.models.epd import EPD, Unit
+from pages.models.scenario import Scenario
+from pages.views.building.impact_calculation import (
+    BOQ_DIMENSION_MAP,
+    DIMENSION_CODES,
+    IMPACT_FACTOR_RULES,
+    ImpactColumns,
+    compute_impact_values,
+)
+from pages.views.building.scenarios import epds_with_impacts, resolve_building
+from pages.views.material_category_tree import material_category_tree
+
+logger = logging.getLogger(__name__)
+
+# Impacts compared by the sweep, as (impact_category, life_cycle_stage)
+SWEEP_IMPACTS = [("gwp", "a1a3"), ("penrt", "a1a3")]
+# More variants are refused, the matrix grows with variants times products
+MAX_VARIANTS = 1000
+
+# Exponent of the kg/m3 conversion per row of `IMPACT_FACTOR_RULES`
+_CONVERSION_EXPONENT = np.array([r[4] for r in IMPACT_FACTOR_RULES], dtype=np.float64)
+
+# Dimension of BoQ products with an input unit `BOQ_DIMENSION_MAP` does not know
+_NO_DIMENSION = object()
+
+
+@dataclass
+class Substitution:
+    """Puts an EPD in place of the EPD of every product it matches.
+
+    A product matches when it is in `assembly_id`, uses `from_epd_id` and has
+    an EPD in one of `from_category_ids`. Criteria left at None match all.
+    """
+
+    epd_id: uuid.UUID
+    name: str = ""
+    assembly_id: uuid.UUID | None = None
+    from_epd_id: uuid.UUID | None = None
+    from_category_ids: set[int] | None = None
+
+
+def category_sweep(category_id: int, assembly_id=None, from_category_id=None) -> list[Substitution]:
+    """One substitution per EPD in a material category and its subcategories.
+
+    They replace the products of that category, or of `from_category_id`,
+    e.g. every concrete EPD in turn in the concrete layers of a wall.
+    """
+    tree = material_category_tree()
+    from_category_ids = set(tree.subtree_ids(from_category_id or category_id))
+    return [
+        Substitution(
+            epd_id=pk,
+            name=name,
+            assembly_id=assembly_id,
+            from_category_ids=from_category_ids,
+        )
+        for pk, name in EPD.objects.filter(category_id__in=tree.subtree_ids(category_id))
+        .order_by("name")
+        .values_list("pk", "name")
+    ]
+
+
+def sweep_scenarios(
+    building_id, substitutions: list[Substitution], scenario: Scenario | None = None
+) -> list[dict]:
+    """Ranks the variants of a building given by `substitutions` by their impacts.
+
+    Every substitution is one variant of the building, or of `scenario`, and
+    all of them are evaluated in one vectorized pass over the products of the
+    building. Nothing is written. Rows hold the A1-A3 impacts per m2 like the
+    building results, and the difference to the unchanged building. Variants
+    using an EPD that does not fit a product they match get an `error` and no
+    rank.
+    """
+    if len(substitutions) > MAX_VARIANTS:
+        raise ValueError(f"At most {MAX_VARIANTS} substitutions can be evaluated at once")
+    resolved = resolve_building(building_id, scenario)
+    if not resolved.building.total_floor_area:
+        # Impacts are per m2, there is nothing to rank without an area
+        raise ValueError("The building has no total floor area")
+    rows, row_assembly = [], []
+    for a, b_assembly in enumerate(resolved.building_assemblies):
+        for p in b_assembly.assembly.prefetched_products:
+            rows.append((b_assembly, p))
+            row_assembly.append(a)
+    row_assembly = np.array(row_assembly, dtype=np.intp)
+
+    epds = {p.epd_id: p.epd for _, p in rows}
+    missing = {s.epd_id for s in substitutions} - set(epds)
+    epds.update(epds_with_impacts(missing))
+    if missing - set(epds):
+        raise EPD.DoesNotExist(f"EPDs {sorted(map(str, missing - set(epds)))} do not exist")
+    epd_index = {pk: i for i, pk in enumerate(epds)}
+    epd_list = list(epds.values())
+
+    # EPD columns
+    units = sorted({epd.declared_unit for epd in epd_list})
+    epd_unit = np.array([units.index(epd.declared_unit) for epd in epd_list], dtype=np.intp)
+    epd_conversion = np.array(
+        [np.nan if epd.volume_density is None else epd.volume_density for epd in epd_list],
+        dtype=np.float64,
+    )
+    epd_declared_amount = np.array([epd.declared_amount for epd in epd_list], dtype=np.float64)
+    epd_values = np.zeros((len(epd_list), len(SWEEP_IMPACTS)), dtype=np.float64)
+    for e, epd in enumerate(epd_list):
+        for epdimpact in getattr(epd, "all_impacts", None) or epd.epdimpact_set.all():
+            key = (epdimpact.impact.impact_category, epdimpact.impact.life_cycle_stage)
+            if key in SWEEP_IMPACTS:
+                epd_values[e, SWEEP_IMPACTS.index(key)] += float(epdimpact.value)
+
+    # Product columns
+    dimensions = []
+    product_dimension = []
+    for b_assembly, p in rows:
+        if b_assembly.assembly.is_boq:
+            dimension = BOQ_DIMENSION_MAP.get(p.input_unit, _NO_DIMENSION)
+        else:
+            dimension = b_assembly.assembly.dimension
+        if dimension not in dimensions:
+            dimensions.append(dimension)
+        product_dimension.append(dimensions.index(dimension))
+    product_dimension = np.array(product_dimension, dtype=np.intp)
+    assembly_quantity = np.array([float(b.quantity) for b, _ in rows], dtype=np.float64)
+    quantity = np.array(
+        [float(p.quantity) / 100 if p.input_unit == Unit.PERCENT else float(p.quantity) for _, p in rows],
+        dtype=np.float64,
+    )
+    baseline = np.array([epd_index[p.epd_id] for _, p in rows], dtype=np.intp)
+
+    # Row code of `IMPACT_FACTOR_RULES` per (dimension, declared unit), -1 if unsupported
+    code_table = np.full((len(dimensions), len(units)), -1, dtype=np.intp)
+    for d, dimension in enumerate(dimensions):
+        for u, unit in enumerate(units):
+            if dimension is _NO_DIMENSION:
+                continue
+            if unit == Unit.PCS:
+                code_table[d, u] = DIMENSION_CODES[(None, Unit.PCS)]
+            else:
+                code_table[d, u] = DIMENSION_CODES.get((dimension, unit), -1)
+
+    # One row per variant, the unchanged building first
+    assignment = np.tile(baseline, (len(substitutions) + 1, 1))
+    matched = np.zeros(len(substitutions) + 1, dtype=np.intp)
+    for v, substitution in enumerate(substitutions, start=1):
+        mask = np.array([_matches(substitution, b, p) for b, p in rows], dtype=bool)
+        assignment[v, mask] = epd_index[substitution.epd_id]
+        matched[v] = mask.sum()
+
+    code = code_table[product_dimension[np.newaxis, :], epd_unit[assignment]]
+    conversion = epd_conversion[assignment]
+    invalid = (code < 0) | ((_CONVERSION_EXPONENT[np.maximum(code, 0)] != 0) & np.isnan(conversion))
+
+    # Like the building results, assemblies failing without substitution are left out
+    skipped = np.isin(row_assembly, row_assembly[invalid[0]])
+    invalid &= ~skipped
+
+    values = compute_impact_values(
+        ImpactColumns(
+            dimension_code=np.where(invalid, 0, code)[..., np.newaxis],
+            assembly_quantity=assembly_quantity[np.newaxis, :, np.newaxis],
+            quantity=quantity[np.newaxis, :, np.newaxis],
+            conversion=np.where(invalid, 1.0, conversion)[..., np.newaxis],
+            declared_amount=epd_declared_amount[assignment][..., np.newaxis],
+            total_floor_area=np.float64(resolved.building.total_floor_area),
+            value=epd_values[assignment],
+        )
+    )
+    values[np.broadcast_to(skipped[np.newaxis, :], invalid.shape)] = 0.0
+    totals = values.sum(axis=1)
+
+    results = []
+    for v in range(len(substitutions) + 1):
+        substitution = substitutions[v - 1] if v else None
+        row = {
+            "rank": None,
+            "name": "Baseline" if substitution is None else substitution.name or epds[substitution.epd_id].name,
+            "epd_id": substitution.epd_id if substitution else None,
+            "products": int(matched[v]),
+            "error": None,
+        }
+        if invalid[v].any():
+            p = int(np.argmax(invalid[v]))
+            row["error"] = (
+                f"EPD '{epd_list[assignment[v, p]].name}' cannot be used in assembly "
+                f"'{rows[p][0].assembly.name}'"
+            )
+            for category, stage in SWEEP_IMPACTS:
+                row[f"{category}_{stage}"] = row[f"{category}_delta"] = None
+        else:
+            for k, (category, stage) in enumerate(SWEEP_IMPACTS):
+                row[f"{category}_{stage}"] = float(totals[v, k])
+                row[f"{category}_delta"] = float(totals[v, k] - totals[0, k])
+        results.append(row)
+
+    ranked = sorted(
+        (row for row in results if row["error"] is None),
+        key=lambda row: tuple(row[f"{c}_{s}"] for c, s in SWEEP_IMPACTS),
+    )
+    for rank, row in enumerate(ranked, start=1):
+        row["rank"] = rank
+    logger.info(
+        "Swept %s variants of %s products for building %s", len(results), len(rows), building_id
+    )
+    return ranked + [row for row in results if row["error"] is not None]
+
+
+def parse_substitutions(data: dict) -> list[Substitution]:
+    """Substitutions of a sweep request.
+
+    `substitutions` lists single EPD swaps, `category_sweeps` tries every EPD
+    of a material category, see `category_sweep`. Raises ValueError on
+    malformed input.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    substitutions = []
+    try:
+        for rule in data.get("substitutions", []):
+            substitutions.append(
+                Substitution(
+                    epd_id=uuid.UUID(rule["epd"]),
+                    name=rule.get("name", ""),
+                    assembly_id=_as_uuid(rule.get("assembly")),
+                    from_epd_id=_as_uuid(rule.get("from_epd")),
+                    from_category_ids=(
+                        set(material_category_tree().subtree_ids(int(rule["from_category"])))
+                        if rule.get("from_category") is not None
+                        else None
+                    ),
+                )
+            )
+        for rule in data.get("category_sweeps", []):
+            substitutions.extend(
+                category_sweep(
+                    int(rule["category"]),
+                    assembly_id=_as_uuid(rule.get("assembly")),
+                    from_category_id=(
+                        int(rule["from_category"]) if rule.get("from_category") is not None else None
+                    ),
+                )
+            )
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Malformed substitution: {e}")
+    return substitutions
+
+
+@login_required
+@require_http_methods(["POST"])
+def building_scenario_sweep(request, building_id):
+    """Ranks substitutions for a building, posted as JSON, see `parse_substitutions`."""
+    building = get_object_or_404(Building, created_by=request.user, pk=building_id)
+    try:
+        data = json.loads(request.body or "{}")
+        substitutions = parse_substitutions(data)
+        scenario = None
+        if data.get("scenario"):
+            scenario = get_object_or_404(Scenario, building=building, pk=_as_uuid(data["scenario"]))
+        results = sweep_scenarios(building.pk, substitutions, scenario)
+    except (ValueError, EPD.DoesNotExist) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse({"results": results})
+
+
+def _matches(substitution: Substitution, b_assembly, product) -> bool:
+    return (
+        (substitution.assembly_id is None or b_assembly.assembly_id == substitution.assembly_id)
+        and (substitution.from_epd_id is None or product.epd_id == substitution.from_epd_id)
+        and (
+            substitution.from_category_ids is None
+            or product.epd.category_id in substitution.from_category_ids
+        )
+    )
+
+
+def _as_uuid(value):
+    return None if value is None else uuid.UUID(str(value))
@@ -0,0 +1,420 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from pages.models.assembly import Assembly
+from pages.models.building import Building, BuildingAssembly, OperationalProduct
+from pages.models.epd import EPD, EPDImpact, Unit
+from pages.models.scenario import (
+    Scenario,
+    ScenarioAssembly,
+    ScenarioOperationalProduct,
+    ScenarioProduct,
+)
+from pages.views.building.impact_results import products_prefetch
+
+# Added assemblies get the reporting life-cycle of new ones, unless set
+DEFAULT_REPORTING_LIFE_CYCLE = 50
+# Scenario the simulation page opens for a building without any
+DEFAULT_SCENARIO_NAME = "Simulation"
+# Fields of an operational product a scenario can change
+OPERATIONAL_FIELDS = ["quantity", "input_unit", "description"]
+
+
+@dataclass
+class ResolvedBuilding:
+    """A building as seen by a scenario, nothing in it is saved.
+
+    Assemblies carry their overlaid products as `assembly.prefetched_products`,
+    like the querysets of `impact_results`. `changed_assembly_ids` holds the
+    assemblies of the building the scenario changes, replaces or removes, the
+    materialized results of those do not apply to the scenario.
+    """
+
+    building: Building
+    building_assemblies: list[BuildingAssembly] = field(default_factory=list)
+    changed_assembly_ids: set = field(default_factory=set)
+    operational_products: list[OperationalProduct] = field(default_factory=list)
+    operational_changed: bool = False
+
+
+@dataclass
+class ScenarioComponent:
+    """An assembly shown in a scenario, with the link of the building it
+    changes and its override, if any."""
+
+    assembly: Assembly
+    quantity: Decimal
+    link: BuildingAssembly | None = None
+    override: ScenarioAssembly | None = None
+
+    @property
+    def owned(self) -> bool:
+        """Whether the assembly is the scenario's own, added or copied, and can be edited in place."""
+        return self.link is None or self.link.assembly_id != self.assembly.pk
+
+
+def resolve_building(
+    building,
+    scenario: Scenario | None = None,
+    *,
+    structural=True,
+    operational=False,
+    changed_only=False,
+) -> ResolvedBuilding:
+    """Lays the overrides of `scenario` over the current building.
+
+    `building` is a Building or its pk. Reads the building, its assemblies and
+    products, and the overrides in a fixed number of queries. Without a
+    scenario the building is returned as is. With `changed_only` only the
+    assemblies and operational products the scenario touches are resolved,
+    the rest is what the building results already hold.
+    """
+    if not isinstance(building, Building):
+        building = Building.objects.get(pk=building)
+    resolved = ResolvedBuilding(building)
+    if structural:
+        if scenario is None:
+            assembly_overrides, product_overrides = [], []
+        else:
+            assembly_overrides = list(
+                scenario.assembly_overrides.select_related("building_assembly")
+            )
+            product_overrides = list(scenario.product_overrides.select_related("product"))
+        resolved.changed_assembly_ids = (
+            {o.building_assembly.assembly_id for o in assembly_overrides if o.building_assembly_id}
+            | {o.assembly_id for o in assembly_overrides if o.assembly_id}
+            | {o.product.assembly_id for o in product_overrides}
+        )
+        resolved.building_assemblies = _resolve_assemblies(
+            building,
+            assembly_overrides,
+            resolved.changed_assembly_ids if changed_only else None,
+        )
+        epds = epds_with_impacts({o.epd_id for o in product_overrides if o.epd_id})
+        products = {o.product_id: o for o in product_overrides}
+        for b_assembly in resolved.building_assemblies:
+            b_assembly.assembly.prefetched_products = apply_product_overrides(
+                b_assembly.assembly.prefetched_products, products, epds
+            )
+    if operational:
+        overrides = [] if scenario is None else list(scenario.operational_overrides.all())
+        resolved.operational_changed = bool(overrides)
+        if overrides or not changed_only:
+            resolved.operational_products = _resolve_operational_products(building, overrides)
+    return resolved
+
+
+def _resolve_assemblies(building: Building, overrides: list[ScenarioAssembly], assembly_ids=None) -> list[BuildingAssembly]:
+    by_link = {o.building_assembly_id: o for o in overrides if o.building_assembly_id}
+    links = (
+        BuildingAssembly.objects.filter(building=building)
+        .select_related("assembly")
+        .prefetch_related(products_prefetch())
+        .order_by("pk")
+    )
+    if assembly_ids is not None:
+        links = links.filter(assembly_id__in=assembly_ids)
+
+    building_assemblies, replaced = [], []
+    for b_assembly in links:
+        override = by_link.get(b_assembly.pk)
+        if override is not None:
+            if override.removed:
+                continue
+            if override.assembly_id is not None:
+                replaced.append((b_assembly, override))
+            if override.quantity is not None:
+                b_assembly.quantity = override.quantity
+            if override.reporting_life_cycle is not None:
+                b_assembly.reporting_life_cycle = override.reporting_life_cycle
+        b_assembly.building = building
+        building_assemblies.append(b_assembly)
+
+    added = [o for o in overrides if o.building_assembly_id is None and not o.removed]
+    if added or replaced:
+        assemblies = (
+            Assembly.objects.filter(
+                pk__in={o.assembly_id for o in added} | {o.assembly_id for _, o in replaced}
+            )
+            .prefetch_related(products_prefetch("structuralproduct_set"))
+            .in_bulk()
+        )
+        for b_assembly, o in replaced:
+            b_assembly.assembly = assemblies[o.assembly_id]
+        for o in added:
+            building_assemblies.append(
+                BuildingAssembly(
+                    building=building,
+                    assembly=assemblies[o.assembly_id],
+                    quantity=o.quantity,
+                    reporting_life_cycle=o.reporting_life_cycle or DEFAULT_REPORTING_LIFE_CYCLE,
+                )
+            )
+    return building_assemblies
+
+
+def _resolve_operational_products(building: Building, overrides: list[ScenarioOperationalProduct]) -> list[OperationalProduct]:
+    by_product = {o.operational_product_id: o for o in overrides if o.operational_product_id}
+    epds = EPD.objects.select_related("country", "category").in_bulk(
+        {o.epd_id for o in overrides if o.epd_id}
+    )
+    products = []
+    for p in (
+        OperationalProduct.objects.filter(building=building)
+        .select_related("epd__country", "epd__category")
+        .order_by("pk")
+    ):
+        override = by_product.get(p.pk)
+        if override is not None:
+            if override.removed:
+                continue
+            if override.epd_id is not None:
+                p.epd = epds[override.epd_id]
+            for f in OPERATIONAL_FIELDS:
+                if getattr(override, f) is not None:
+                    setattr(p, f, getattr(override, f))
+        p.building = building
+        products.append(p)
+
+    for o in overrides:
+        if o.operational_product_id is None and not o.removed:
+            products.append(
+                OperationalProduct(
+                    building=building,
+                    epd=epds[o.epd_id],
+                    quantity=o.quantity,
+                    input_unit=o.input_unit or Unit.UNKNOWN,
+                    description=o.description,
+                )
+            )
+    return products
+
+
+def apply_product_overrides(products, overrides: dict, epds: dict) -> list:
+    """The products left by the overrides (by product pk), changed in memory."""
+    resolved = []
+    for p in products:
+        override = overrides.get(p.pk)
+        if override is not None:
+            if override.removed:
+                continue
+            if override.epd_id is not None:
+                p.epd = epds[override.epd_id]
+            if override.quantity is not None:
+                p.quantity = override.quantity
+            if override.input_unit is not None:
+                p.input_unit = override.input_unit
+        resolved.append(p)
+    return resolved
+
+
+def epds_with_impacts(pks) -> dict:
+    """EPDs by pk with their impacts, prefetched like `products_prefetch` does."""
+    if not pks:
+        return {}
+    return (
+        EPD.objects.select_related("category", "country")
+        .prefetch_related(
+            Prefetch(
+                "epdimpact_set",
+                queryset=EPDImpact.objects.select_related("impact"),
+                to_attr="all_impacts",
+            )
+        )
+        .in_bulk(pks)
+    )
+
+
+def current_scenario(building: Building, create=False) -> Scenario | None:
+    """The scenario of the building selected last on the simulation page.
+
+    Without any, the default one is created if `create` is set.
+    """
+    scenario = building.scenarios.order_by("-selected_at").first()
+    if scenario is None and create:
+        scenario, _ = Scenario.objects.get_or_create(
+            building=building,
+            name=DEFAULT_SCENARIO_NAME,
+            defaults={"created_by": building.created_by},
+        )
+    return scenario
+
+
+def find_component(scenario: Scenario, assembly_id) -> ScenarioComponent | None:
+    """The assembly `assembly_id` as shown in the scenario, None if it does not show it."""
+    override = (
+        scenario.assembly_overrides.filter(assembly_id=assembly_id, removed=False)
+        .select_related("assembly", "building_assembly")
+        .first()
+    )
+    if override is not None:
+        link = override.building_assembly
+        quantity = override.quantity if override.quantity is not None else link.quantity
+        return ScenarioComponent(override.assembly, quantity, link, override)
+
+    link = (
+        BuildingAssembly.objects.filter(building_id=scenario.building_id, assembly_id=assembly_id)
+        .select_related("assembly")
+        .first()
+    )
+    if link is None:
+        return None
+    override = scenario.assembly_overrides.filter(building_assembly=link).first()
+    if override is None:
+        return ScenarioComponent(link.assembly, link.quantity, link)
+    if override.removed or override.assembly_id is not None:
+        return None
+    quantity = override.quantity if override.quantity is not None else link.quantity
+    return ScenarioComponent(link.assembly, quantity, link, override)
+
+
+def apply_scenario_products(scenario: Scenario, products) -> list:
+    """Products of one assembly as the scenario shows them, for its editor."""
+    overrides = {
+        o.product_id: o
+        for o in scenario.product_overrides.filter(product__in=[p.pk for p in products])
+    }
+    epds = EPD.objects.select_related("category", "country").in_bulk(
+        {o.epd_id for o in overrides.values() if o.epd_id}
+    )
+    return apply_product_overrides(products, overrides, epds)
+
+
+@transaction.atomic
+def set_component(
+    scenario: Scenario,
+    assembly: Assembly,
+    quantity,
+    link: BuildingAssembly | None = None,
+    reporting_life_cycle=None,
+) -> None:
+    """Shows `assembly` in the scenario, added or in place of the assembly of `link`.
+
+    Only what differs from the building is stored. Product overrides of a
+    replaced assembly are dropped, its copy already holds them.
+    """
+    quantity = Decimal(str(quantity))
+    if link is None:
+        defaults = {"quantity": quantity}
+        if reporting_life_cycle is not None:
+            defaults["reporting_life_cycle"] = reporting_life_cycle
+        ScenarioAssembly.objects.update_or_create(
+            scenario=scenario, building_assembly=None, assembly=assembly, defaults=defaults
+        )
+        return
+
+    replaced = assembly.pk != link.assembly_id
+    if replaced:
+        ScenarioProduct.objects.filter(
+            scenario=scenario, product__assembly_id=link.assembly_id
+        ).delete()
+    override, _ = ScenarioAssembly.objects.update_or_create(
+        scenario=scenario,
+        building_assembly=link,
+        defaults={
+            "assembly": assembly if replaced else None,
+            "quantity": None if quantity == link.quantity else quantity,
+            "removed": False,
+        },
+    )
+    if not replaced and override.quantity is None and override.reporting_life_cycle is None:
+        # Back to the building, nothing left to override
+        override.delete()
+
+
+@transaction.atomic
+def remove_component(scenario: Scenario, assembly_id) -> None:
+    """Removes an assembly from the scenario, the building keeps it."""
+    component = find_component(scenario, assembly_id)
+    if component is None:
+        return
+    if component.link is None:
+        component.override.delete()
+    else:
+        ScenarioAssembly.objects.update_or_create(
+            scenario=scenario,
+            building_assembly=component.link,
+            defaults={"assembly": None, "quantity": None, "removed": True},
+        )
+    if component.owned:
+        _delete_unused_assemblies([component.assembly.pk])
+
+
+@transaction.atomic
+def save_operational_products(scenario: Scenario, rows: list[dict]) -> None:
+    """Stores the operational products edited in a scenario as overrides.
+
+    Rows are paired with the products of the building by EPD, in order, like
+    `sync_products` does. Only the pairs that differ, the products left over
+    and the new rows are stored.
+    """
+    stored = {}
+    for p in OperationalProduct.objects.filter(building_id=scenario.building_id).order_by("pk"):
+        stored.setdefault(str(p.epd_id), []).append(p)
+
+    overrides = []
+    for row in rows:
+        values = {
+            "quantity": Decimal(str(row["quantity"])).quantize(Decimal("0.01")),
+            "input_unit": row["unit"],
+            "description": row["description"],
+        }
+        if stored.get(str(row["id"])):
+            p = stored[str(row["id"])].pop(0)
+            changes = {f: v for f, v in values.items() if getattr(p, f) != v}
+            if changes:
+                overrides.append(
+                    ScenarioOperationalProduct(scenario=scenario, operational_product=p, **changes)
+                )
+        else:
+            overrides.append(
+                ScenarioOperationalProduct(scenario=scenario, epd_id=row["id"], **values)
+            )
+    for remaining in stored.values():
+        overrides.extend(
+            ScenarioOperationalProduct(scenario=scenario, operational_product=p, removed=True)
+            for p in remaining
+        )
+
+    scenario.operational_overrides.all().delete()
+    ScenarioOperationalProduct.objects.bulk_create(overrides)
+    # Bulk writes skip the signal stamping the scenario
+    Scenario.objects.filter(pk=scenario.pk).update(updated_at=timezone.now())
+
+
+@transaction.atomic
+def reset_scenario(scenario: Scenario) -> None:
+    """Drops every override of the scenario, and the assemblies only it used.
+
+    Nothing of the building is read or copied, the scenario shows the building
+    as it is again.
+    """
+    assembly_ids = list(
+        scenario.assembly_overrides.filter(assembly__isnull=False).values_list(
+            "assembly_id", flat=True
+        )
+    )
+    scenario.assembly_overrides.all().delete()
+    scenario.product_overrides.all().delete()
+    scenario.operational_overrides.all().delete()
+    _delete_unused_assemblies(assembly_ids)
+
+
+def _delete_unused_assemblies(assembly_ids) -> None:
+    # Copies and new assemblies of a scenario, unless something else still uses them
+    used = set(
+        BuildingAssembly.objects.filter(assembly_id__in=assembly_ids).values_list(
+            "assembly_id", flat=True
+        )
+    ) | set(
+        ScenarioAssembly.objects.filter(assembly_id__in=assembly_ids).values_list(
+            "assembly_id", flat=True
+        )
+    )
+    Assembly.objects.filter(
+        pk__in=set(assembly_ids) - used, is_template=False
+    ).delete()
@@ -0,0 +1,61 @@
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.db import DatabaseCache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_migrate, pre_migrate
+from django.dispatch import receiver
+
+# Version bumps of data cached across processes, run once migrate is done
+_after_migrate = []
+_migrating = False
+
+
+def bumped_after_migrate(bump):
+    """Registers a version bump to run after migrations, which may have changed
+    the cached data without bumping it."""
+    _after_migrate.append(bump)
+    return bump
+
+
+def bump_on_commit(bump) -> None:
+    """Runs a version bump after commit, unless migrations are running.
+
+    Data migrations fire the model signals too, possibly before the table of
+    the database cache exists. Their bumps are done once by `finish_migrating`.
+    """
+    if not _migrating:
+        transaction.on_commit(bump)
+
+
+def cache_table_exists(using=DEFAULT_DB_ALIAS) -> bool:
+    backend = caches["default"]
+    if not isinstance(backend, DatabaseCache):
+        return True
+    return backend._table in connections[using].introspection.table_names()
+
+
+@receiver(pre_migrate)
+def start_migrating(sender, **kwargs):
+    global _migrating
+    _migrating = True
+
+
+@receiver(post_migrate)
+def finish_migrating(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    global _migrating
+    # Sent once per app, the first one ends the run
+    if not _migrating:
+        return
+    _migrating = False
+    if cache_table_exists(using):
+        for bump in _after_migrate:
+            bump()
+
+
+def get_version(key) -> float:
+    """Version stored under `key` in the shared cache, set on first use."""
+    if (version := cache.get(key)) is None:
+        cache.add(key, time.time(), None)
+        version = cache.get(key)
+    return version
@@ -10,7 +10,8 @@ from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 
 from pages.models.assembly import Assembly, AssemblyMode
-from pages.models.building import Building, BuildingAssembly, BuildingAssemblySimulated
+from pages.models.building import Building, BuildingAssembly
+from pages.models.scenario import ScenarioAssembly
 from pages.views.building.building_dashboard.utility import prep_building_dashboard_df
 
 
@@ -70,7 +71,7 @@ def _delete_building(building_id):
     # TODO: Change once assemblies are managed separately
     assemblies_list = (
         BuildingAssembly.objects.filter(building__id=building_id).values_list('assembly_id', flat=True).union(
-            BuildingAssemblySimulated.objects.filter(building__id=building_id).values_list('assembly_id', flat=True)
+            ScenarioAssembly.objects.filter(scenario__building__id=building_id, assembly__isnull=False).values_list('assembly_id', flat=True)
         )
     )
 
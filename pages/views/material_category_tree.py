@@ -0,0 +1,46 @@
+import threading
+from collections import defaultdict
+
+from pages.models.epd import MaterialCategory
+from pages.views.reference_registry import reference_registry
+
+_lock = threading.Lock()
+_tree = None
+_tree_registry = None
+
+
+class MaterialCategoryTree:
+    """In-memory copy of the MaterialCategory hierarchy."""
+
+    def __init__(self, categories):
+        self.by_pk = {c.pk: c for c in categories}
+        self.by_category_id = {c.category_id: c for c in categories}
+        self._children = defaultdict(list)
+        for c in sorted(categories, key=lambda c: c.name_en):
+            self._children[c.parent_id].append(c)
+
+    def get(self, pk):
+        return self.by_pk.get(pk)
+
+    def children(self, pk) -> list[MaterialCategory]:
+        """Direct children of a category (roots for None), ordered by name."""
+        return self._children.get(pk, [])
+
+    def subtree_ids(self, pk) -> list[int]:
+        """The category and all its descendants."""
+        node = self.by_pk.get(pk)
+        if node is None:
+            return []
+        return [c.pk for c in self.by_pk.values() if c.path.startswith(node.path)]
+
+
+def material_category_tree(registry=None) -> MaterialCategoryTree:
+    """The hierarchy of the categories in the reference registry (the current
+    one unless given), rebuilt whenever the registry reloads."""
+    global _tree, _tree_registry
+    registry = registry or reference_registry()
+    with _lock:
+        if _tree is None or _tree_registry is not registry:
+            _tree = MaterialCategoryTree(list(registry.categories.values()))
+            _tree_registry = registry
+        return _tree
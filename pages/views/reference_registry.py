@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+
+from cities_light.models import Country
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pages.models.assembly import AssemblyCategoryTechnique
+from pages.models.epd import INDICATOR_UNIT_MAPPING, Impact, Label, MaterialCategory
+from pages.views.cache_versions import bump_on_commit, bumped_after_migrate, get_version
+
+logger = logging.getLogger(__name__)
+
+# Bumped on every change, so all processes sharing the cache reload. `CACHES`
+# must be shared by all processes for this, see the settings.
+VERSION_KEY = "reference-registry:version"
+# How often a process compares its copy against the shared version
+VERSION_CHECK_INTERVAL = 5  # seconds
+
+_lock = threading.Lock()
+_registry = None
+_checked_at = 0.0
+
+
+class ReferenceRegistry:
+    """In-memory copy of the small reference tables, indexed by natural key.
+
+    Each table is loaded on its first lookup. The instances are shared by all
+    requests of the process, treat them as read-only.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def _table(self, name: str) -> dict:
+        if name not in self._tables:
+            with self._lock:
+                if name not in self._tables:
+                    self._tables[name] = getattr(self, f"_load_{name}")()
+                    logger.debug("Loaded reference table %s", name)
+        return self._tables[name]
+
+    def _load_impacts(self) -> dict:
+        return {(i.impact_category, i.life_cycle_stage): i for i in Impact.objects.all()}
+
+    def _load_countries(self) -> dict:
+        countries = {}
+        # Same precedence as a name OR code2 OR code3 lookup that hits one row
+        for country in Country.objects.all():
+            for key in (country.code3, country.code2, country.name):
+                countries[key] = country
+        return countries
+
+    def _load_categories(self) -> dict:
+        categories = list(MaterialCategory.objects.all())
+        return {
+            "category_id": {c.category_id: c for c in categories},
+            "name_en": {c.name_en: c for c in categories},
+            "name_level": {(c.name_en, c.level): c for c in categories},
+        }
+
+    def _load_labels(self) -> dict:
+        return {label.name: label for label in Label.objects.all()}
+
+    def _load_classifications(self) -> dict:
+        return {
+            (c.category_id, c.technique_id): c
+            for c in AssemblyCategoryTechnique.objects.select_related("category", "technique")
+        }
+
+    @property
+    def impacts(self) -> dict[tuple[str, str], Impact]:
+        return self._table("impacts")
+
+    def impact(self, impact_category: str, life_cycle_stage: str) -> Impact | None:
+        return self.impacts.get((impact_category, life_cycle_stage))
+
+    @staticmethod
+    def impact_unit(impact_category: str) -> str | None:
+        return INDICATOR_UNIT_MAPPING.get(impact_category)
+
+    @property
+    def countries(self) -> dict[str, Country]:
+        """Countries by code3, code2 and name."""
+        return self._table("countries")
+
+    def country(self, key: str) -> Country | None:
+        return self.countries.get(key)
+
+    @property
+    def categories(self) -> dict[str, MaterialCategory]:
+        """Material categories by category_id, e.g. "1.3.01"."""
+        return self._table("categories")["category_id"]
+
+    def category(self, category_id=None, name_en=None, level=None) -> MaterialCategory | None:
+        categories = self._table("categories")
+        if category_id is not None:
+            return categories["category_id"].get(category_id)
+        if level is not None:
+            return categories["name_level"].get((name_en, level))
+        return categories["name_en"].get(name_en)
+
+    @property
+    def labels(self) -> dict[str, Label]:
+        return self._table("labels")
+
+    def label(self, name: str) -> Label | None:
+        return self.labels.get(name)
+
+    def classification(self, category_id, technique_id=None) -> AssemblyCategoryTechnique | None:
+        key = (int(category_id), int(technique_id) if technique_id else None)
+        return self._table("classifications").get(key)
+
+
+def get_reference_registry_version() -> float:
+    return get_version(VERSION_KEY)
+
+
+def reference_registry() -> ReferenceRegistry:
+    """The process-wide registry, reloaded once another process changed the data."""
+    global _registry, _checked_at
+    with _lock:
+        if _registry is None or time.monotonic() - _checked_at > VERSION_CHECK_INTERVAL:
+            version = get_reference_registry_version()
+            _checked_at = time.monotonic()
+            if _registry is None or _registry.version != version:
+                _registry = ReferenceRegistry(version)
+        return _registry
+
+
+def clear_reference_registry() -> None:
+    global _registry
+    with _lock:
+        _registry = None
+
+
+@receiver(post_save, sender=Impact)
+@receiver(post_delete, sender=Impact)
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=MaterialCategory)
+@receiver(post_delete, sender=MaterialCategory)
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+@receiver(post_save, sender=AssemblyCategoryTechnique)
+@receiver(post_delete, sender=AssemblyCategoryTechnique)
+def invalidate_reference_registry(sender, **kwargs):
+    # After commit, or a reload in between would cache the old rows again
+    bump_on_commit(bump_reference_registry_version)
+
+
+@bumped_after_migrate
+def bump_reference_registry_version() -> None:
+    cache.set(VERSION_KEY, time.time(), None)
+    clear_reference_registry()
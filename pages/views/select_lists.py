@@ -1,21 +1,88 @@
+import hashlib
 import logging
+import time
+from datetime import datetime, timezone
+from functools import wraps
 
+from cities_light.models import City, Region
+from django.core.cache import cache
 from django.db.models import Q
-
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import HttpResponse
 from django.shortcuts import render
-from django.views.decorators.http import require_http_methods
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.contrib.auth.decorators import login_required
 
+from pages.models.assembly import AssemblyCategoryTechnique, AssemblyTechnique
+from pages.models.building import BuildingCategory, BuildingSubcategory, CategorySubcategory
 from pages.models.epd import MaterialCategory
-from pages.models.assembly import AssemblyTechnique
-from pages.models.building import CategorySubcategory
+from pages.views.cache_versions import bump_on_commit, bumped_after_migrate, get_version
+from pages.views.material_category_tree import material_category_tree
+from pages.views.reference_registry import reference_registry
 from accounts.models import CustomCity, CustomRegion
 
 logger = logging.getLogger(__name__)
 
+# The dropdowns only change with the reference data, which bumps this version.
+# It must live in a cache shared by all processes, see `CACHES`.
+VERSION_KEY = "select-lists:version"
+FRAGMENT_TIMEOUT = 24 * 60 * 60  # seconds
+
+
+def get_select_lists_version() -> float:
+    return get_version(VERSION_KEY)
+
+
+def select_list_state(request) -> tuple[str, float]:
+    """ETag and version of a select list, read once per request.
+
+    Material categories come from the reference registry, so its version is
+    part of the ETag and fragments are never rendered from an older tree.
+    """
+    if not hasattr(request, "select_list_state"):
+        registry = reference_registry()
+        version = max(get_select_lists_version(), registry.version)
+        key = f"{request.path}?{request.GET.urlencode()}:{version}"
+        request.select_list_registry = registry
+        request.select_list_state = (hashlib.md5(key.encode()).hexdigest(), version)
+    return request.select_list_state
+
+
+def select_list_etag(request, *args, **kwargs) -> str:
+    return select_list_state(request)[0]
+
+
+def select_list_last_modified(request, *args, **kwargs) -> datetime:
+    return datetime.fromtimestamp(select_list_state(request)[1], tz=timezone.utc)
+
+
+def cached_select_list(view):
+    """Caches the rendered fragment per endpoint and query and answers
+    conditional requests with 304 while the reference data is unchanged."""
+
+    @condition(etag_func=select_list_etag, last_modified_func=select_list_last_modified)
+    def cached_view(request, *args, **kwargs):
+        key = f"select-lists:{select_list_etag(request)}"
+        if (content := cache.get(key)) is None:
+            content = view(request, *args, **kwargs).content
+            cache.set(key, content, FRAGMENT_TIMEOUT)
+        return HttpResponse(content)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = cached_view(request, *args, **kwargs)
+        # Let browsers keep the fragment but revalidate it on every use
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    return wrapper
+
 
 @login_required
 @require_http_methods(["GET"])
+@cached_select_list
 def select_lists(request):
     if m := request.GET.get("region"):
         region_id = int(m)
@@ -27,9 +94,8 @@ def select_lists(request):
         )
     elif m := request.GET.get("category"):
         category_id = int(m)
-        subcategories = MaterialCategory.objects.filter(
-            level=2, parent=category_id
-        ).order_by("name_en")
+        tree = material_category_tree(request.select_list_registry)
+        subcategories = [c for c in tree.children(category_id) if c.level == 2]
         return render(
             request,
             "pages/utils/select_list.html",
@@ -38,9 +104,8 @@ def select_lists(request):
 
     elif m := request.GET.get("subcategory"):
         subcategory_id = int(m)
-        childcategories = MaterialCategory.objects.filter(
-            level=3, parent=subcategory_id
-        ).order_by("name_en")
+        tree = material_category_tree(request.select_list_registry)
+        childcategories = [c for c in tree.children(subcategory_id) if c.level == 3]
         return render(
             request,
             "pages/utils/select_list.html",
@@ -67,6 +132,7 @@ def select_lists(request):
 
 @login_required
 @require_http_methods(["GET"])
+@cached_select_list
 def update_categories(request):
     country_id = request.GET.get("country")
     try:
@@ -86,6 +152,7 @@ def update_categories(request):
 
 @login_required
 @require_http_methods(["GET"])
+@cached_select_list
 def update_regions(request):
     country_id = request.GET.get("country")
     try:
@@ -95,3 +162,34 @@ def update_regions(request):
 
     regions = CustomRegion.objects.filter(country=country_id).order_by("name")
     return render(request, "pages/utils/select_list.html", {"items": regions, "default_text": "Select a region"})
+
+
+@receiver(post_save, sender=MaterialCategory)
+@receiver(post_delete, sender=MaterialCategory)
+@receiver(post_save, sender=AssemblyTechnique)
+@receiver(post_delete, sender=AssemblyTechnique)
+@receiver(post_save, sender=AssemblyCategoryTechnique)
+@receiver(post_delete, sender=AssemblyCategoryTechnique)
+@receiver(post_save, sender=CategorySubcategory)
+@receiver(post_delete, sender=CategorySubcategory)
+@receiver(post_save, sender=BuildingCategory)
+@receiver(post_delete, sender=BuildingCategory)
+@receiver(post_save, sender=BuildingSubcategory)
+@receiver(post_delete, sender=BuildingSubcategory)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+@receiver(post_save, sender=CustomCity)
+@receiver(post_delete, sender=CustomCity)
+@receiver(post_save, sender=Region)
+@receiver(post_delete, sender=Region)
+@receiver(post_save, sender=CustomRegion)
+@receiver(post_delete, sender=CustomRegion)
+def invalidate_select_lists(sender, **kwargs):
+    # New version means new fragment keys and ETags, old fragments expire.
+    # Bumped after commit, so no request can cache the old rows under it.
+    bump_on_commit(bump_select_lists_version)
+
+
+@bumped_after_migrate
+def bump_select_lists_version() -> None:
+    cache.set(VERSION_KEY, time.time(), None)